@@ -1,6 +1,7 @@
-from flask import Flask, request, jsonify, render_template, send_file, redirect
+from flask import Flask, request, jsonify, render_template, send_file, redirect, g, has_app_context, Response, stream_with_context
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
+from flask_sqlalchemy.session import Session as FlaskSQLAlchemySession
 from datetime import datetime, timedelta
 from apscheduler.schedulers.background import BackgroundScheduler
 import json
@@ -13,7 +14,6 @@ from webdriver_manager.firefox import GeckoDriverManager
 from webdriver_manager.chrome import ChromeDriverManager
 from webdriver_manager.microsoft import EdgeChromiumDriverManager
 import logging
-from readability import Document
 import newspaper
 from bs4 import BeautifulSoup
 from reportlab.lib import colors
@@ -30,10 +30,12 @@ import tempfile
 from langdetect import detect
 import trafilatura
 from docx import Document as DocxDocument
-from docx.shared import Inches, Pt, RGBColor
+from docx.shared import Cm, Inches, Pt, RGBColor
 from docx.enum.text import WD_ALIGN_PARAGRAPH
 import docx
 from docx.oxml import parse_xml
+from docx.table import Table as DocxTable
+from docx.text.paragraph import Paragraph as DocxParagraph
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 import time
 import logging.handlers
@@ -46,32 +48,155 @@ from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from dotenv import load_dotenv
+import metrics
+import tracing
+import profiling
+import structured_logging
+import uuid
+import circuit_breaker
+import deadline
+import hedging
+import headline_stream
+import browser_tabs
+import browser_watchdog
+import cookie_jars
+import singleflight
+import clipping_images
+import near_duplicates
+from config import HEDGE_CONFIG, REQUEST_HEADERS, SCRAPING_CONFIG
 import requests
 from urllib.parse import urlparse
+import base64
+import zlib
+from sqlalchemy.orm import aliased, load_only
+import sqlalchemy
+import re
+import html
+import unicodedata
+import glob
+import shutil
+import inspect
+import lxml.cssselect
+import lxml.etree
+import lxml.html
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single waitress process
+    fcntl = None
 
 # Load environment variables once, before initializing the app
 load_dotenv()
 
 # Define the log_performance decorator before it's used
 def log_performance(func):
-    """Decorator to log function execution time"""
+    """Decorator to record function execution time in the metrics registry"""
     @wraps(func)
     def wrapper(*args, **kwargs):
         start_time = time.time()
-        result = func(*args, **kwargs)
-        end_time = time.time()
-        logger.info(f"{func.__name__} took {end_time - start_time:.2f} seconds")
-        return result
+        try:
+            return func(*args, **kwargs)
+        finally:
+            duration = time.time() - start_time
+            metrics.FUNCTION_DURATION.labels(function=func.__name__).observe(duration)
+            logger.debug(f"{func.__name__} took {duration:.2f} seconds")
     return wrapper
 
 # Add utility functions before Flask app initialization
-def extract_title(html_content):
-    """Extract title from HTML content"""
+# trafilatura 2 renamed no_fallback to fast
+TRAFILATURA_FAST_ARG = 'fast' if 'fast' in inspect.signature(trafilatura.bare_extraction).parameters else 'no_fallback'
+ARTICLE_PARAGRAPH_XPATH = '//article//p | //*[@itemprop="articleBody"]//p'
+MAX_PARAGRAPHS = SCRAPING_CONFIG['max_paragraphs']
+MIN_PARAGRAPH_LENGTH = SCRAPING_CONFIG['min_paragraph_length']
+
+def first_meta_content(tree, *selectors):
+    """Return the first non-empty content of the meta tags matched by the given XPaths"""
+    for selector in selectors:
+        for value in tree.xpath(selector):
+            value = ' '.join(value.split())
+            if value:
+                return value
+    return ''
+
+def quick_article_fields(tree):
+    """Read headline, byline, date and the first paragraphs straight from the markup.
+
+    Returns None unless both a headline and MAX_PARAGRAPHS article paragraphs
+    are found, so the caller can fall back to a full extraction.
+    """
+    headline = first_meta_content(
+        tree,
+        '//meta[@property="og:title"]/@content',
+        '//meta[@name="twitter:title"]/@content',
+        '//h1//text()'
+    )
+    paragraphs = []
+    for element in tree.xpath(ARTICLE_PARAGRAPH_XPATH):
+        text = ' '.join(element.text_content().split())
+        if len(text) >= MIN_PARAGRAPH_LENGTH:
+            paragraphs.append(text)
+            if len(paragraphs) == MAX_PARAGRAPHS:
+                break
+    if not headline or len(paragraphs) < MAX_PARAGRAPHS:
+        return None
+    return {
+        'headline': headline,
+        'byline': first_meta_content(
+            tree,
+            '//meta[@name="author"]/@content',
+            '//meta[@property="article:author"]/@content',
+            '//*[@rel="author"]//text()'
+        ),
+        'date': first_meta_content(
+            tree,
+            '//meta[@property="article:published_time"]/@content',
+            '//*[@itemprop="datePublished"]/@content',
+            '//time/@datetime'
+        )[:10],
+        'paragraphs': paragraphs
+    }
+
+@tracing.traced()
+def extract_article(html_content, url=None, fast=True):
+    """Extract headline, byline, date and the first paragraphs from a single parse of a page.
+
+    Fast mode returns as soon as the markup yields a headline and the first
+    paragraphs, and otherwise runs trafilatura without its fallback
+    extractors. Returns (method, fields) where method is 'markup',
+    'trafilatura' or 'failed'.
+    """
+    empty = {'headline': '', 'byline': '', 'date': '', 'paragraphs': []}
     try:
-        doc = Document(html_content)
-        return doc.title() if doc.title() else ''
-    except:
-        return ''
+        tree = lxml.html.fromstring(html_content)
+    except (lxml.etree.ParserError, ValueError):
+        return 'failed', empty
+
+    if fast:
+        fields = quick_article_fields(tree)
+        if fields:
+            return 'markup', fields
+
+    # trafilatura reuses the parsed tree, so the page is only parsed once
+    document = trafilatura.bare_extraction(
+        tree, url=url, with_metadata=True, include_comments=False, include_tables=False,
+        **{TRAFILATURA_FAST_ARG: fast}
+    )
+    if document is None:
+        return 'failed', empty
+    if not isinstance(document, dict):
+        document = document.as_dict()
+
+    lines = [line.strip() for line in (document.get('text') or '').split('\n') if line.strip()]
+    paragraphs = [line for line in lines if len(line) >= MIN_PARAGRAPH_LENGTH] or lines
+    return 'trafilatura', {
+        'headline': document.get('title') or '',
+        'byline': document.get('author') or '',
+        'date': document.get('date') or '',
+        'paragraphs': paragraphs[:MAX_PARAGRAPHS]
+    }
 
 def get_clean_source_name(domain):
     """Extract and clean source name from domain"""
@@ -81,6 +206,7 @@ def get_clean_source_name(domain):
     parts = domain.split('.')
     return parts[0].title() if parts else domain
 
+@tracing.traced()
 def convert_caps_to_small_caps(text):
     """Convert ALL CAPS words to small caps while preserving normal case words"""
     if not text:
@@ -94,6 +220,7 @@ def convert_caps_to_small_caps(text):
             converted_words.append(word)
     return ' '.join(converted_words)
 
+@tracing.traced()
 def extract_title_from_url(url):
     """Extract title from URL slug for News24 articles"""
     try:
@@ -122,12 +249,85 @@ def extract_title_from_url(url):
     
     return None
 
-@log_performance
 def scrape_url(url):
     """Basic URL scraping focused on getting title"""
     if not url or not isinstance(url, str):
         raise ValueError("Invalid URL")
+    # The deadline starts before coalescing, so a caller waiting on another
+    # caller's (or worker's) scrape gives up when its own deadline passes.
+    # Every stage checks it; a browser call stuck past it has its tab closed.
+    scrape_deadline, token = deadline.start()
+    watchdog = deadline.Watchdog(scrape_deadline, lambda: cancel_browser_work(scrape_deadline)) if token else None
+    try:
+        if watchdog:
+            watchdog.start()
+        # Identical scrapes in flight at once (double clicks, the same story pasted twice) share one run
+        return singleflight.do(url, lambda: scrape_url_uncoalesced(url, watchdog))
+    finally:
+        if watchdog:
+            watchdog.cancel()
+        deadline.finish(token)
 
+def scrape_url_uncoalesced(url, watchdog=None):
+    """Scrape a URL under its deadline and circuit breaker, recording how it went"""
+    domain = urlparse(url).netloc.replace('www.', '') or 'unknown'
+    start_time = time.time()
+    if circuit_breaker.allow(domain):
+        scrape_deadline = deadline.current()
+        path, result = _scrape_url(url)
+        duration = time.time() - start_time
+        hit_deadline = scrape_deadline.exceeded_at or scrape_deadline.expired() or (watchdog and watchdog.fired)
+        if hit_deadline:
+            reason = 'browser work cancelled' if watchdog and watchdog.fired else scrape_deadline.exceeded_at or 'timed out'
+            logger.warning(f"Scrape of {url} hit its deadline ({reason}), returning partial result")
+            result = dict(result, partial=True)
+        if hit_deadline and path in CIRCUIT_FAILURE_PATHS:
+            # Waiting for a free tab or running out of our own deadline is local
+            # load, not the host failing; it must not open a healthy site's circuit
+            cause = 'tab_lease' if scrape_deadline.exceeded_at == 'tab_lease' else 'deadline'
+            metrics.SCRAPES_STOPPED_LOCALLY.labels(domain=domain, cause=cause).inc()
+        elif path != 'url_slug':
+            # Instant URL-slug headlines never touch the host, so they say nothing about its health
+            circuit_breaker.record(domain, path not in CIRCUIT_FAILURE_PATHS, duration)
+    else:
+        path, result = 'circuit_open', degraded_scrape_result(url)
+        duration = time.time() - start_time
+    metrics.SCRAPE_DURATION.labels(domain=domain, path=path).observe(duration)
+    logger.debug(f"scrape_url {domain} via {path} took {duration:.2f} seconds")
+    return result
+
+# How generic pages are read:
+#   fast     - headline and lead paragraphs, from the markup when possible (default)
+#   full     - always run trafilatura with its fallback extractors
+#   headline - stream only the page head for the headline, no paragraphs
+GENERIC_EXTRACTION_MODE = os.getenv('GENERIC_EXTRACTION_MODE', 'fast')
+
+# Extraction paths that count as failures for the host's circuit breaker
+CIRCUIT_FAILURE_PATHS = ('empty', 'failed', 'url_slug_fallback')
+
+def degraded_scrape_result(url):
+    """Build a best-effort result from the URL alone while a host's circuit is open"""
+    domain = urlparse(url).netloc
+    headline = ''
+    if 'news24.com' in domain:
+        source = 'News24'
+        headline = extract_title_from_url(url)
+    elif 'pressreader.com' in domain:
+        # PressReader paths only name the publication, which is already the source
+        source = get_pressreader_source(url)
+    else:
+        source = get_clean_source_name(domain)
+        headline = extract_title_from_url(url)
+    return {
+        'headline': headline or '',
+        'source': source,
+        'content': '',
+        'url': url,
+        'degraded': True
+    }
+
+def _scrape_url(url):
+    """Scrape a URL, returning (extraction path, result) so the path can be recorded"""
     domain = urlparse(url).netloc
     headers = {
         'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
@@ -141,207 +341,341 @@ def scrape_url(url):
             
             # If we successfully extracted a title from the URL, use it immediately
             if url_title:
-                return {
+                return 'url_slug', {
                     'headline': url_title,
                     'source': 'News24',
                     'content': '',  # No need for content as per user request
                     'url': url
                 }
             
-            # If URL extraction failed, try other methods
-            driver = get_selenium_driver()
-            try:
-                # Use the more comprehensive get_news24_content function
-                news24_result = get_news24_content(driver, url)
-                
-                if news24_result.get('success', False):
-                    return {
-                        'headline': convert_caps_to_small_caps(news24_result['headline']),
-                        'source': 'News24',
-                        'content': '',  # No need for content as per user request
-                        'url': url
-                    }
-                
-                # Fallback to simpler extraction if get_news24_content fails
-                driver.get(url)
-                time.sleep(2)
-                
-                # Updated selectors for News24 articles
-                for selector in [
-                    'h1.article__title', 
-                    'h1.article-title', 
-                    'article h1',
-                    '.article-view__title h1',  # New selector
-                    '.article__title h1',       # New selector
-                    '.article-header h1',       # New selector
-                    'header h1',                # More generic selector
-                    'h1'                        # Most generic selector as last resort
-                ]:
-                    try:
-                        element = driver.find_element(By.CSS_SELECTOR, selector)
-                        title = element.text
-                        if title and title.strip():
-                            return {
-                                'headline': convert_caps_to_small_caps(title.strip()),
-                                'source': 'News24',
-                                'content': '',
-                                'url': url
-                            }
-                    except:
-                        continue
-                
-                # Try XPath as a last resort
+            # If URL extraction failed, read the page
+            return scrape_with_browser(
+                url, domain, 'News24',
+                lambda: scrape_news24_with_browser(url, url_title),
+                http_func=lambda: fetch_headline_http(url, 'News24')
+            )
+        
+        # Handle PressReader URLs
+        elif 'pressreader.com' in domain:
+            # Get publication name from URL
+            publication = get_pressreader_source(url)
+            
+            # Extract info from URL if possible
+            url_info = extract_info_from_pressreader_url(url)
+            
+            # The text view usually has the article as plain markup; a browser
+            # tab is only leased when it does not. Hedged, the two race instead
+            if PRESSREADER_HTTP_FIRST and not get_hedge_config(domain):
+                fetched = fetch_pressreader_http(url, publication)
+                if fetched:
+                    return fetched
+                if url_info and url_info['article_id']:
+                    logger.info(f"Falling back to the browser for PressReader article {url_info['article_id']} ({url_info['publication_date']})")
+
+            # Use Selenium for PressReader content extraction
+            return scrape_with_browser(
+                url, domain, publication,
+                lambda: scrape_pressreader_with_browser(url, publication),
+                http_func=lambda: fetch_pressreader_http(url, publication) or (
+                    'empty', {'headline': '', 'source': publication, 'content': '', 'url': url}
+                )
+            )
+        
+        # Generic handling for other URLs
+        source = get_clean_source_name(domain)
+        if GENERIC_EXTRACTION_MODE == 'headline':
+            # Only the page head is downloaded; the connection closes once the headline is known
+            with tracing.span('http_fetch'):
+                headline, _, _ = headline_stream.fetch_headline(url, headers=headers)
+            return 'generic_headline', {
+                'headline': convert_caps_to_small_caps(clean_page_title(headline, source)),
+                'source': source,
+                'content': '',
+                'url': url
+            }
+
+        with tracing.span('http_fetch'):
+            response = requests.get(url, headers=headers, cookies=cookie_jars.requests_cookies(url), timeout=deadline.cap(10))
+            response.raise_for_status()
+
+        method, article = extract_article(response.text, url, fast=GENERIC_EXTRACTION_MODE == 'fast')
+        path = 'generic_markup' if method == 'markup' else 'generic'
+
+        return path, {
+            'headline': convert_caps_to_small_caps(clean_page_title(article['headline'], source)),
+            'source': source,
+            'content': '\n\n'.join(article['paragraphs']),
+            'url': url,
+            'byline': article['byline'],
+            'date': article['date']
+        }
+
+    except Exception as e:
+        logger.warning(f"Title extraction failed: {str(e)}")
+        return 'failed', {
+            'headline': '',
+            'source': get_clean_source_name(domain),
+            'content': '',
+            'url': url
+        }
+
+def get_hedge_config(domain):
+    """Return the hedging settings for a domain, or None if it is not hedged"""
+    domain = domain.lower().split(':')[0]
+    for hedged_domain, settings in HEDGE_CONFIG.items():
+        if domain == hedged_domain or domain.endswith('.' + hedged_domain):
+            if settings.get('mode', 'off') != 'off':
+                return settings
+    return None
+
+def clean_page_title(title, source):
+    """Strip a trailing ' | Source' or ' - Source' from a page title"""
+    title = (title or '').strip()
+    for separator in (' | ', ' - ', ' – '):
+        if separator in title and source.lower() in title.rsplit(separator, 1)[1].lower():
+            title = title.rsplit(separator, 1)[0].strip()
+    return title
+
+def fetch_headline_http(url, source):
+    """Fetch a page head without a browser and read its headline from JSON-LD, OG/Twitter tags or <title>"""
+    headline, _, _ = headline_stream.fetch_headline(url, headers=REQUEST_HEADERS, cookies=cookie_jars.requests_cookies(url))
+    headline = clean_page_title(headline, source)
+    path = 'http_headline' if headline else 'empty'
+    return path, {
+        'headline': convert_caps_to_small_caps(headline),
+        'source': source,
+        'content': '',
+        'url': url
+    }
+
+# Hedged results shorter than this are usually a site name or a placeholder
+MIN_HEDGED_HEADLINE_LENGTH = 15
+
+def scrape_with_browser(url, domain, source, browser_func, http_func=None):
+    """Run browser_func, racing it against http_func when the domain is hedged"""
+    # Hedged domains race a plain HTTP fetch against the browser and take the first good headline
+    hedge = get_hedge_config(domain) if http_func else None
+    if hedge:
+        return hedged_scrape(url, domain, source, hedge, http_func, browser_func)
+    return browser_func()
+
+def hedged_scrape(url, domain, source, hedge, http_func, browser_func):
+    """Race http_func against browser_func and return the first good result"""
+    def is_good(path, result):
+        headline = result.get('headline', '').strip()
+        return (
+            path not in CIRCUIT_FAILURE_PATHS
+            and len(headline) >= MIN_HEDGED_HEADLINE_LENGTH
+            and headline.lower() != source.lower()
+        )
+
+    winner, path, result = hedging.race(
+        domain.replace('www.', ''),
+        http_func,
+        browser_func,
+        is_good,
+        mode=hedge.get('mode', 'race'),
+        browser_delay=hedge.get('browser_delay', 0.0)
+    )
+    if result is None:
+        return 'empty', {'headline': '', 'source': source, 'content': '', 'url': url}
+    return path, result
+
+def scrape_with_session(url, scrape):
+    """Run scrape(tab) in a leased tab with the site's saved session, then keep or drop the session"""
+    with browser_tab_pool.lease() as driver:
+        restored = cookie_jars.restore(driver, url)
+        path, result = scrape(driver)
+        if path not in CIRCUIT_FAILURE_PATHS:
+            cookie_jars.capture(driver, url)
+        elif restored:
+            # A stale or flagged session is a likely cause; the next visit starts afresh
+            cookie_jars.discard(url)
+        return path, result
+
+def scrape_news24_with_browser(url, url_title):
+    """Scrape a News24 article in a leased browser tab, returning (extraction path, result)"""
+    return scrape_with_session(url, lambda driver: news24_tab_scrape(driver, url, url_title))
+
+def news24_tab_scrape(driver, url, url_title):
+    """Read a News24 headline in a leased tab"""
+    try:
+        # Use the more comprehensive get_news24_content function
+        news24_result = get_news24_content(driver, url)
+
+        if news24_result.get('success', False):
+            return 'news24_content', {
+                'headline': convert_caps_to_small_caps(news24_result['headline']),
+                'source': 'News24',
+                'content': '',  # No need for content as per user request
+                'url': url
+            }
+
+        # Fallback to simpler extraction if get_news24_content fails
+        deadline.check('fallback_navigate')
+        with tracing.span('fallback_navigate'):
+            driver.set_page_load_timeout(deadline.cap(30))
+            driver.get(url)
+        with tracing.span('fallback_sleep'):
+            deadline.sleep(2)
+
+        # Updated selectors for News24 articles
+        with tracing.span('selector_cascade'):
+            for selector in [
+                'h1.article__title', 
+                'h1.article-title', 
+                'article h1',
+                '.article-view__title h1',  # New selector
+                '.article__title h1',       # New selector
+                '.article-header h1',       # New selector
+                'header h1',                # More generic selector
+                'h1'                        # Most generic selector as last resort
+            ]:
                 try:
-                    title_element = driver.find_element(By.XPATH, "//h1")
-                    title = title_element.text
+                    element = driver.find_element(By.CSS_SELECTOR, selector)
+                    title = element.text
                     if title and title.strip():
-                        return {
+                        return 'news24_selector', {
                             'headline': convert_caps_to_small_caps(title.strip()),
                             'source': 'News24',
                             'content': '',
                             'url': url
                         }
                 except:
-                    pass
-                
-                # If all else fails, use the title extracted from URL
-                if url_title:
-                    return {
-                        'headline': url_title,
-                        'source': 'News24',
-                        'content': '',
-                        'url': url
-                    }
-                
-                return {
-                    'headline': '',
-                    'source': 'News24',
-                    'content': '',
-                    'url': url
-                }
-            except Exception as e:
-                logger.warning(f"News24 Selenium scraping failed: {str(e)}")
-                
-                # If Selenium fails, use the title extracted from URL
-                if url_title:
-                    return {
-                        'headline': url_title,
+                    continue
+
+        # Try XPath as a last resort
+        with tracing.span('xpath_fallback'):
+            try:
+                title_element = driver.find_element(By.XPATH, "//h1")
+                title = title_element.text
+                if title and title.strip():
+                    return 'news24_xpath', {
+                        'headline': convert_caps_to_small_caps(title.strip()),
                         'source': 'News24',
                         'content': '',
                         'url': url
                     }
-                
-                return {
-                    'headline': '',
-                    'source': 'News24',
-                    'content': '',
-                    'url': url
-                }
-        
-        # Handle PressReader URLs
-        elif 'pressreader.com' in domain:
-            # Get publication name from URL
-            publication = get_pressreader_source(url)
-            
-            # Extract info from URL if possible
-            url_info = extract_info_from_pressreader_url(url)
-            
-            # Use Selenium for PressReader content extraction
-            driver = get_selenium_driver()
-            try:
-                # Use the enhanced PressReader content extraction function
-                pressreader_result = scrape_pressreader_content(driver, url)
-                
-                if pressreader_result.get('success', False):
-                    return {
-                        'headline': convert_caps_to_small_caps(pressreader_result['headline']),
+            except:
+                pass
+
+        # If all else fails, use the title extracted from URL
+        if url_title:
+            return 'url_slug_fallback', {
+                'headline': url_title,
+                'source': 'News24',
+                'content': '',
+                'url': url
+            }
+
+        return 'empty', {
+            'headline': '',
+            'source': 'News24',
+            'content': '',
+            'url': url
+        }
+    except Exception as e:
+        logger.warning(f"News24 Selenium scraping failed: {str(e)}")
+
+        # If Selenium fails, use the title extracted from URL
+        if url_title:
+            return 'url_slug_fallback', {
+                'headline': url_title,
+                'source': 'News24',
+                'content': '',
+                'url': url
+            }
+
+        return 'empty', {
+            'headline': '',
+            'source': 'News24',
+            'content': '',
+            'url': url
+        }
+
+def scrape_pressreader_with_browser(url, publication):
+    """Scrape a PressReader article in a leased browser tab, returning (extraction path, result)"""
+    return scrape_with_session(url, lambda driver: pressreader_tab_scrape(driver, url, publication))
+
+def pressreader_tab_scrape(driver, url, publication):
+    """Read a PressReader article in a leased tab"""
+    try:
+        # Use the enhanced PressReader content extraction function
+        pressreader_result = scrape_pressreader_content(driver, url)
+
+        if pressreader_result.get('success', False):
+            return 'pressreader_content', {
+                'headline': convert_caps_to_small_caps(pressreader_result['headline']),
+                'source': publication,
+                'content': pressreader_result.get('content', ''),  # Include content if available
+                'url': url
+            }
+
+        # If specialized extraction fails, try a more generic approach
+        deadline.check('fallback_navigate')
+        with tracing.span('fallback_navigate'):
+            driver.set_page_load_timeout(deadline.cap(15))
+            driver.get(url)
+        with tracing.span('fallback_sleep'):
+            deadline.sleep(2)
+
+        # Try to get title from page title
+        try:
+            page_title = driver.title
+            if page_title:
+                # Remove publication name if present
+                if '|' in page_title:
+                    title = page_title.split('|')[0].strip()
+                else:
+                    title = page_title.strip()
+
+                if title:
+                    return 'pressreader_title', {
+                        'headline': convert_caps_to_small_caps(title),
                         'source': publication,
-                        'content': pressreader_result.get('content', ''),  # Include content if available
+                        'content': '',
                         'url': url
                     }
-                
-                # If specialized extraction fails, try a more generic approach
-                driver.get(url)
-                time.sleep(2)
-                
-                # Try to get title from page title
+        except:
+            pass
+
+        # Try various selectors for headline
+        with tracing.span('selector_cascade'):
+            for selector in [
+                'h1.article-title', 
+                'h1:not(.publication)', 
+                '.headline', 
+                '.article-headline',
+                '.article__title',
+                'h1',
+                '.title'
+            ]:
                 try:
-                    page_title = driver.title
-                    if page_title:
-                        # Remove publication name if present
-                        if '|' in page_title:
-                            title = page_title.split('|')[0].strip()
-                        else:
-                            title = page_title.strip()
-                            
-                        if title:
-                            return {
-                                'headline': convert_caps_to_small_caps(title),
-                                'source': publication,
-                                'content': '',
-                                'url': url
-                            }
+                    element = driver.find_element(By.CSS_SELECTOR, selector)
+                    title = element.text
+                    if title and title.strip():
+                        return 'pressreader_selector', {
+                            'headline': convert_caps_to_small_caps(title.strip()),
+                            'source': publication,
+                            'content': '',
+                            'url': url
+                        }
                 except:
-                    pass
-                
-                # Try various selectors for headline
-                for selector in [
-                    'h1.article-title', 
-                    'h1:not(.publication)', 
-                    '.headline', 
-                    '.article-headline',
-                    '.article__title',
-                    'h1',
-                    '.title'
-                ]:
-                    try:
-                        element = driver.find_element(By.CSS_SELECTOR, selector)
-                        title = element.text
-                        if title and title.strip():
-                            return {
-                                'headline': convert_caps_to_small_caps(title.strip()),
-                                'source': publication,
-                                'content': '',
-                                'url': url
-                            }
-                    except:
-                        continue
-                
-                # Return with empty headline if all extraction methods fail
-                return {
-                    'headline': '',
-                    'source': publication,
-                    'content': '',
-                    'url': url
-                }
-                
-            except Exception as e:
-                logger.warning(f"PressReader Selenium scraping failed: {str(e)}")
-                return {
-                    'headline': '',
-                    'source': publication,
-                    'content': '',
-                    'url': url
-                }
-        
-        # Generic handling for other URLs
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-        
-        title = extract_title(response.text)
-        
-        return {
-            'headline': convert_caps_to_small_caps(title),
-            'source': get_clean_source_name(domain),
+                    continue
+
+        # Return with empty headline if all extraction methods fail
+        return 'empty', {
+            'headline': '',
+            'source': publication,
             'content': '',
             'url': url
         }
 
     except Exception as e:
-        logger.warning(f"Title extraction failed: {str(e)}")
-        return {
+        logger.warning(f"PressReader Selenium scraping failed: {str(e)}")
+        return 'empty', {
             'headline': '',
-            'source': get_clean_source_name(domain),
+            'source': publication,
             'content': '',
             'url': url
         }
@@ -355,21 +689,44 @@ app.config.update(
     SQLALCHEMY_TRACK_MODIFICATIONS=False
 )
 
+class DeskSession(FlaskSQLAlchemySession):
+    """Session that routes queries to the requesting desk's database"""
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None and has_app_context():
+            desk_engine = g.get('desk_engine')
+            if desk_engine is not None:
+                return desk_engine
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
 # Initialize extensions only once
-db = SQLAlchemy(app)
+db = SQLAlchemy(app, session_options={'class_': DeskSession})
 CORS(app)
 
-# Single logging configuration
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.handlers.RotatingFileHandler('logs/app.log', maxBytes=1024*1024, backupCount=5),
-        logging.StreamHandler()
-    ]
-)
+# Single logging configuration: log calls only enqueue, a listener thread
+# writes JSON lines to logs/app.log and text to the console
+structured_logging.configure_logging('logs/app.log', max_bytes=1024*1024, backup_count=5)
 logger = logging.getLogger(__name__)
 
+# Driver logs are written by geckodriver itself, so they are capped by copy-truncate
+DRIVER_LOG_FILES = ['logs/geckodriver.log', 'geckodriver.log']
+DRIVER_LOG_MAX_BYTES = int(os.getenv('DRIVER_LOG_MAX_BYTES', str(5 * 1024 * 1024)))
+
+def cap_driver_logs():
+    for path in DRIVER_LOG_FILES:
+        if structured_logging.cap_log_file(path, DRIVER_LOG_MAX_BYTES):
+            logger.info(f"Truncated driver log {path}")
+
+@app.before_request
+def assign_request_id():
+    # Reuse an upstream ID (e.g. from nginx) so log lines can be correlated
+    g.request_id = request.headers.get('X-Request-ID') or uuid.uuid4().hex
+
+@app.after_request
+def add_request_id_header(response):
+    if g.get('request_id'):
+        response.headers['X-Request-ID'] = g.request_id
+    return response
+
 class Clipping(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     headline = db.Column(db.String(200), nullable=True, default='')  # Allow empty headline
@@ -379,24 +736,330 @@ class Clipping(db.Model):
     url = db.Column(db.String(500))
     date = db.Column(db.DateTime, default=datetime.utcnow)
     order = db.Column(db.Integer)
+    image = db.Column(db.String(80), nullable=True)  # Stored derivative, see clipping_images
 
-    def to_dict(self):
-        return {
+    def to_dict(self, fields=None):
+        data = {
             'id': self.id,
             'headline': self.headline or '',  # Ensure empty string if None
             'source': self.source,
             'category': self.category,
             'content': self.content or '',  # Ensure empty string if None
             'url': self.url,
-            'date': self.date.strftime('%Y-%m-%d'),
-            'order': self.order
+            'date': self.date.strftime('%Y-%m-%d') if self.date else None,
+            'order': self.order,
+            'image': self.image
+        }
+        if fields:
+            return {k: v for k, v in data.items() if k in fields}
+        return data
+
+# Fields a client may request through ?fields= on the clippings list
+CLIPPING_FIELDS = ('id', 'headline', 'source', 'category', 'content', 'url', 'date', 'order', 'image')
+
+class CollectionVersion(db.Model):
+    """Single-row counter bumped on every write to the clippings collection"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+
+def bump_collection_version():
+    """Increment the collection version inside the current transaction"""
+    updated = CollectionVersion.query.filter_by(id=1).update(
+        {CollectionVersion.version: CollectionVersion.version + 1}
+    )
+    if not updated:
+        db.session.add(CollectionVersion(id=1, version=1))
+
+def get_collection_version():
+    """Return the current collection version"""
+    row = CollectionVersion.query.get(1)
+    return row.version if row else 0
+
+class ClippingChange(db.Model):
+    """One clipping's change, logged under the collection version that made it"""
+    id = db.Column(db.Integer, primary_key=True)
+    version = db.Column(db.Integer, nullable=False, index=True)
+    kind = db.Column(db.String(20), nullable=False)  # created, updated, moved, deleted or cleared
+    clipping_id = db.Column(db.Integer)
+    data = db.Column(db.Text)  # JSON: the clipping, its new order, or just its id
+
+CHANGE_KINDS = ('created', 'updated', 'moved', 'deleted', 'cleared')
+# The change log keeps this many versions; a marker row records where it was cut
+CHANGE_LOG_KEEP_VERSIONS = int(os.getenv('CHANGE_LOG_KEEP_VERSIONS', '5000'))
+
+def record_changes(kind, items):
+    """Bump the collection version and log one change per item under it, inside the current transaction"""
+    bump_collection_version()
+    version = db.session.query(CollectionVersion.version).filter_by(id=1).scalar()
+    rows = [
+        {'version': version, 'kind': kind, 'clipping_id': item.get('id'), 'data': json.dumps(item)}
+        for item in items
+    ]
+    if kind == 'cleared':
+        rows = [{'version': version, 'kind': kind, 'clipping_id': None, 'data': '{}'}]
+    if rows:
+        db.session.execute(ClippingChange.__table__.insert(), rows)
+    return version
+
+def changes_since(version):
+    """Return the changes committed after version as [(version, kind, items)], oldest first"""
+    rows = (
+        db.session.query(ClippingChange.version, ClippingChange.kind, ClippingChange.data)
+        .filter(ClippingChange.version > version, ClippingChange.kind.in_(CHANGE_KINDS))
+        .order_by(ClippingChange.id)
+        .all()
+    )
+    changes = []
+    for row_version, kind, data in rows:
+        if not changes or changes[-1][0] != row_version:
+            changes.append((row_version, kind, []))
+        if kind != 'cleared':
+            changes[-1][2].append(json.loads(data))
+    return changes
+
+def change_log_floor():
+    """Return the oldest version the change log can still catch a client up from"""
+    floor = db.session.query(db.func.max(ClippingChange.version)).filter(ClippingChange.kind == 'pruned').scalar()
+    return floor or 0
+
+def prune_change_log():
+    """Drop changes older than CHANGE_LOG_KEEP_VERSIONS, leaving a marker at the cut"""
+    cutoff = get_collection_version() - CHANGE_LOG_KEEP_VERSIONS
+    if cutoff <= change_log_floor():
+        return
+    ClippingChange.query.filter(ClippingChange.version <= cutoff).delete()
+    db.session.add(ClippingChange(version=cutoff, kind='pruned'))
+
+class ClippingSignature(db.Model):
+    """MinHash signature of a clipping's headline and text, see near_duplicates"""
+    clipping_id = db.Column(db.Integer, primary_key=True)
+    signature = db.Column(db.LargeBinary, nullable=False)
+
+class ClippingBucket(db.Model):
+    """One LSH bucket a clipping's signature falls in"""
+    key = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    clipping_id = db.Column(db.Integer, primary_key=True, autoincrement=False, index=True)
+
+def duplicate_text(headline, content):
+    return f"{headline or ''}\n{content or ''}"
+
+def signature_rows(items):
+    """Signature and bucket rows for (clipping_id, headline, content) items"""
+    signatures = []
+    buckets = []
+    for clipping_id, headline, content in items:
+        sig = near_duplicates.signature(duplicate_text(headline, content))
+        if sig is None:
+            continue
+        signatures.append({'clipping_id': clipping_id, 'signature': near_duplicates.pack(sig)})
+        # Bands with equal rows give equal keys; a clipping is in each bucket once
+        buckets.extend({'key': key, 'clipping_id': clipping_id} for key in set(near_duplicates.band_keys(sig)))
+    return signatures, buckets
+
+def index_near_duplicates(clippings):
+    """Store the signatures and buckets of new or edited clippings, inside the current transaction"""
+    ids = [c.id for c in clippings]
+    ClippingSignature.query.filter(ClippingSignature.clipping_id.in_(ids)).delete(synchronize_session=False)
+    ClippingBucket.query.filter(ClippingBucket.clipping_id.in_(ids)).delete(synchronize_session=False)
+    signatures, buckets = signature_rows((c.id, c.headline, c.content) for c in clippings)
+    if signatures:
+        db.session.execute(ClippingSignature.__table__.insert(), signatures)
+        db.session.execute(ClippingBucket.__table__.insert(), buckets)
+
+def find_near_duplicates(headline, content, exclude_id=None, limit=5):
+    """Return up to limit clippings that are likely the same story, most similar first"""
+    sig = near_duplicates.signature(duplicate_text(headline, content))
+    if sig is None:
+        return []
+    with metrics.DB_OPERATION_DURATION.labels(operation='near_duplicates').time():
+        candidates = db.session.query(ClippingSignature.clipping_id, ClippingSignature.signature).filter(
+            ClippingSignature.clipping_id.in_(
+                db.session.query(ClippingBucket.clipping_id).filter(ClippingBucket.key.in_(near_duplicates.band_keys(sig)))
+            )
+        ).all()
+        scored = sorted(
+            (
+                (near_duplicates.similarity(sig, near_duplicates.unpack(packed)), clipping_id)
+                for clipping_id, packed in candidates if clipping_id != exclude_id
+            ),
+            reverse=True
+        )
+        scored = [(score, clipping_id) for score, clipping_id in scored if score >= near_duplicates.THRESHOLD][:limit]
+        if not scored:
+            return []
+        twins = {
+            c.id: c for c in Clipping.query.options(
+                load_only(Clipping.headline, Clipping.source, Clipping.category, Clipping.date)
+            ).filter(Clipping.id.in_([clipping_id for _, clipping_id in scored]))
         }
+    return [
+        dict(twins[clipping_id].to_dict(('id', 'headline', 'source', 'category', 'date')), similarity=round(score, 2))
+        for score, clipping_id in scored if clipping_id in twins
+    ]
+
+# Columns added after a table was first created; create_all only creates missing tables
+ADDED_COLUMNS = {
+    'clipping': {'image': 'VARCHAR(80)'}
+}
+
+def add_missing_columns(engine):
+    """Add columns introduced since an existing database was created"""
+    inspector = sqlalchemy.inspect(engine)
+    with engine.begin() as conn:
+        for table, columns in ADDED_COLUMNS.items():
+            existing = {column['name'] for column in inspector.get_columns(table)}
+            for name, column_type in columns.items():
+                if name not in existing:
+                    conn.execute(sqlalchemy.text(f'ALTER TABLE {table} ADD COLUMN {name} {column_type}'))
+
+# Full-text index over the clippings. It is an external-content FTS5 table,
+# so it stores only the index and reads the text back from the clipping
+# table. Triggers keep it in step with every write, including bulk inserts
+# and purges that bypass the ORM. Reorders only touch "order", so they leave
+# the index alone.
+SEARCH_TABLE = 'clipping_search'
+SEARCH_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE {SEARCH_TABLE} USING fts5(
+        headline, content, source,
+        content='clipping', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS clipping_search_insert AFTER INSERT ON clipping BEGIN
+        INSERT INTO {SEARCH_TABLE}(rowid, headline, content, source)
+        VALUES (new.id, new.headline, new.content, new.source);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS clipping_search_delete AFTER DELETE ON clipping BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, headline, content, source)
+        VALUES ('delete', old.id, old.headline, old.content, old.source);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS clipping_search_update AFTER UPDATE OF headline, content, source ON clipping BEGIN
+        INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}, rowid, headline, content, source)
+        VALUES ('delete', old.id, old.headline, old.content, old.source);
+        INSERT INTO {SEARCH_TABLE}(rowid, headline, content, source)
+        VALUES (new.id, new.headline, new.content, new.source);
+    END"""
+]
+
+def create_search_index(engine):
+    """Create the full-text index and its triggers, indexing existing clippings once"""
+    if engine.dialect.name != 'sqlite':
+        return
+    try:
+        with engine.begin() as conn:
+            exists = conn.execute(
+                sqlalchemy.text("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = :name"),
+                {'name': SEARCH_TABLE}
+            ).first()
+            if exists:
+                return
+            for statement in SEARCH_SCHEMA:
+                conn.execute(sqlalchemy.text(statement))
+            conn.execute(sqlalchemy.text(f"INSERT INTO {SEARCH_TABLE}({SEARCH_TABLE}) VALUES ('rebuild')"))
+    except sqlalchemy.exc.OperationalError as e:
+        # SQLite builds without FTS5 still run everything except search
+        logger.warning(f"Full-text search unavailable: {e}")
+
+# Signatures are written by index_near_duplicates(); a deleted clipping's
+# signature and buckets go with it however it was deleted
+DUPLICATE_INDEX_TRIGGER = """CREATE TRIGGER IF NOT EXISTS clipping_duplicates_delete AFTER DELETE ON clipping BEGIN
+    DELETE FROM clipping_signature WHERE clipping_id = old.id;
+    DELETE FROM clipping_bucket WHERE clipping_id = old.id;
+END"""
+
+def create_duplicate_index(engine):
+    """Create the duplicate index's trigger and sign clippings saved before it existed"""
+    if engine.dialect.name != 'sqlite':
+        return
+    with engine.begin() as conn:
+        conn.execute(sqlalchemy.text(DUPLICATE_INDEX_TRIGGER))
+        signed = sqlalchemy.select(ClippingSignature.clipping_id)
+        signatures, buckets = signature_rows(conn.execute(
+            sqlalchemy.select(Clipping.id, Clipping.headline, Clipping.content).where(Clipping.id.not_in(signed))
+        ))
+        if signatures:
+            conn.execute(ClippingSignature.__table__.insert(), signatures)
+            conn.execute(ClippingBucket.__table__.insert(), buckets)
 
 with app.app_context():
     db.create_all()
+    add_missing_columns(db.engine)
+    create_search_index(db.engine)
+    create_duplicate_index(db.engine)
+
+# Per-desk databases: each desk (or embassy) building an edition gets its own
+# SQLite file, so desks neither see each other's rows nor share a write lock.
+# Requests without a desk keep using the main database.
+DESK_DATABASE_DIR = os.getenv('DESK_DATABASE_DIR', 'desks')
+DESK_NAME_PATTERN = re.compile(r'^[a-z0-9][a-z0-9_-]{0,63}$')
+# Desks that may be opened, e.g. DESKS=pretoria,nairobi. A desk whose database
+# already exists stays usable; any other name is refused rather than getting
+# a new file and a cached engine.
+DESKS = {name.strip().lower() for name in os.getenv('DESKS', '').split(',') if name.strip()}
+
+_desk_engines = {}
+_desk_engines_lock = threading.Lock()
+
+def get_desk_engine(desk):
+    """Get or create the cached engine for a desk's database"""
+    engine = _desk_engines.get(desk)
+    metrics.record_cache('desk_engine', engine is not None)
+    if engine is not None:
+        return engine
+    with _desk_engines_lock:
+        engine = _desk_engines.get(desk)
+        if engine is None:
+            os.makedirs(DESK_DATABASE_DIR, exist_ok=True)
+            path = os.path.abspath(os.path.join(DESK_DATABASE_DIR, f'{desk}.db'))
+            engine = sqlalchemy.create_engine(f'sqlite:///{path}')
+            db.metadata.create_all(engine)
+            add_missing_columns(engine)
+            create_search_index(engine)
+            create_duplicate_index(engine)
+            _desk_engines[desk] = engine
+    return engine
+
+def desk_allowed(desk):
+    return desk in DESKS or os.path.exists(os.path.join(DESK_DATABASE_DIR, f'{desk}.db'))
+
+def list_desks():
+    """Return the names of all desks that have a database on disk"""
+    if not os.path.isdir(DESK_DATABASE_DIR):
+        return []
+    return sorted(
+        name[:-3] for name in os.listdir(DESK_DATABASE_DIR)
+        if name.endswith('.db') and DESK_NAME_PATTERN.match(name[:-3])
+    )
+
+# The desk, and so the database, can come from either header
+DESK_VARY = 'Cookie, X-Desk'
+
+def resolve_desk():
+    """Return the desk named by the X-Desk header, ?desk= or the desk cookie"""
+    desk = (
+        request.headers.get('X-Desk')
+        or request.args.get('desk')
+        or request.cookies.get('desk')
+        or ''
+    ).strip().lower()
+    return desk or None
+
+@app.before_request
+def select_desk_database():
+    desk = resolve_desk()
+    if desk is None:
+        return None
+    if not DESK_NAME_PATTERN.match(desk):
+        return jsonify({'error': 'Invalid desk name'}), 400
+    if desk not in _desk_engines and not desk_allowed(desk):
+        return jsonify({'error': f'Unknown desk: {desk}'}), 404
+    g.desk = desk
+    g.desk_engine = get_desk_engine(desk)
+    return None
 
 # Cache for webdrivers
 _browser_drivers = {}
+# Pages each cached driver has served, for recycling
+_browser_driver_pages = {}
 _driver_paths = {
     'chrome': None,
     'edge': None,
@@ -432,37 +1095,61 @@ def save_driver_paths():
 # Call load_cached_driver_paths at startup
 load_cached_driver_paths()
 
+# Driver executables by browser; '.exe' is added on Windows
+DRIVER_EXECUTABLES = {
+    'chrome': 'chromedriver',
+    'edge': 'msedgedriver',
+    'firefox': 'geckodriver'
+}
+# Where distribution packages put drivers on Linux
+SYSTEM_DRIVER_DIRS = ['/usr/bin', '/usr/local/bin', '/usr/lib/chromium', '/usr/lib/chromium-browser', '/snap/bin']
+
+def driver_executable_name(browser_type):
+    name = DRIVER_EXECUTABLES[browser_type]
+    return name + '.exe' if platform.system().lower() == 'windows' else name
+
+def is_driver_executable(path):
+    """Reject missing files, non-executables and the notice files webdriver_manager sometimes returns"""
+    if not path or not os.path.isfile(path):
+        return False
+    if os.path.basename(path).lower().startswith(('third_party_notices', 'license')):
+        return False
+    return platform.system().lower() == 'windows' or os.access(path, os.X_OK)
+
+def find_local_driver(browser_type):
+    """Find an installed driver without touching the network"""
+    exe = driver_executable_name(browser_type)
+    env_path = os.getenv(f'{browser_type.upper()}DRIVER_PATH')
+    candidates = [env_path, os.path.join(os.getcwd(), 'drivers', exe), shutil.which(exe)]
+    candidates += [os.path.join(directory, exe) for directory in SYSTEM_DRIVER_DIRS]
+    # webdriver_manager's cache, newest version first (~/.wdm/drivers/<driver>/<platform>/<version>/...)
+    wdm_dir = os.path.join(os.path.expanduser('~'), '.wdm', 'drivers', DRIVER_EXECUTABLES[browser_type].replace('msedge', 'edge'))
+    candidates += sorted(glob.glob(os.path.join(wdm_dir, '**', exe), recursive=True), key=os.path.getmtime, reverse=True)
+    for path in candidates:
+        if is_driver_executable(path):
+            return path
+    return None
+
 def get_cached_driver_path(browser_type):
     """Get cached driver path or find existing driver"""
     global _driver_paths
     
-    if _driver_paths[browser_type] and os.path.exists(_driver_paths[browser_type]):
+    if is_driver_executable(_driver_paths[browser_type]):
+        metrics.record_cache('driver_path', True)
         return _driver_paths[browser_type]
+    metrics.record_cache('driver_path', False)
     
-    drivers_dir = os.path.join(os.getcwd(), 'drivers')
-    os.makedirs(drivers_dir, exist_ok=True)
-    
-    possible_paths = {
-        'chrome': [
-            os.path.join(drivers_dir, 'chromedriver.exe'),
-            os.path.join(os.path.expanduser('~'), '.wdm', 'drivers', 'chromedriver', 'win32', 'chromedriver.exe')
-        ],
-        'edge': [
-            os.path.join(drivers_dir, 'msedgedriver.exe'),
-            os.path.join(os.path.expanduser('~'), '.wdm', 'drivers', 'edgedriver', 'win64', 'msedgedriver.exe')
-        ],
-        'firefox': [
-            os.path.join(drivers_dir, 'geckodriver.exe'),
-            os.path.join(os.path.expanduser('~'), '.wdm', 'drivers', 'geckodriver', 'win64', 'geckodriver.exe')
-        ]
-    }
-    
-    for path in possible_paths[browser_type]:
-        if (os.path.exists(path)):
-            _driver_paths[browser_type] = path
-            save_driver_paths()
-            return path
+    path = find_local_driver(browser_type)
+    if path:
+        _driver_paths[browser_type] = path
+        save_driver_paths()
+        return path
     
+    # Nothing installed locally
+    return install_driver(browser_type)
+
+def install_driver(browser_type):
+    """Have webdriver_manager look up the installed browser's version and fetch the driver matching it"""
     try:
         if browser_type == 'chrome':
             path = ChromeDriverManager().install()
@@ -471,14 +1158,11 @@ def get_cached_driver_path(browser_type):
         else:
             path = GeckoDriverManager().install()
         
-        if os.path.exists(path):
-            dest_path = os.path.join(drivers_dir, os.path.basename(path))
-            import shutil
-            shutil.copy2(path, dest_path)
-            _driver_paths[browser_type] = dest_path
-            save_driver_paths()
-            return dest_path
-            
+        if not is_driver_executable(path):
+            # Older webdriver_manager releases return a file next to the driver
+            path = os.path.join(os.path.dirname(path), driver_executable_name(browser_type))
+        if not is_driver_executable(path):
+            raise FileNotFoundError(f"No {browser_type} driver executable at {path}")
         _driver_paths[browser_type] = path
         save_driver_paths()
         return path
@@ -495,12 +1179,30 @@ def get_webdriver():
         try:
             driver.current_url
         except:
+            metrics.BROWSER_CRASHES.labels(browser=browser_name).inc()
             try:
                 driver.quit()
             except:
                 pass
+            browser_watchdog.unregister(driver)
             _browser_drivers.pop(browser_name, None)
 
+    # Reuse the cached driver until it has served too many pages or grown too large
+    driver = _browser_drivers.get('firefox')
+    if driver is not None:
+        pages = _browser_driver_pages.get('firefox', 0)
+        reason = browser_watchdog.recycle_reason(driver, pages)
+        if not reason:
+            _browser_driver_pages['firefox'] = pages + 1
+            return driver
+        browser_watchdog.record_recycle(driver, 'firefox', reason, pages)
+        try:
+            driver.quit()
+        except:
+            pass
+        kill_driver_process_tree(driver)
+        _browser_drivers.pop('firefox', None)
+
     # Try Firefox with proper profile configuration
     try:
         options = FirefoxOptions()
@@ -517,15 +1219,22 @@ def get_webdriver():
         
         options.profile = profile
         
-        geckodriver_path = os.path.join(os.getcwd(), 'drivers', 'geckodriver.exe')
+        geckodriver_path = get_cached_driver_path('firefox')
+        if not geckodriver_path:
+            raise FileNotFoundError("No geckodriver found")
+        cap_driver_logs()
         service = Service(executable_path=geckodriver_path, log_path='logs/geckodriver.log')
         
         driver = webdriver.Firefox(service=service, options=options)
         driver.set_page_load_timeout(30)
         driver.supports_cdp = False
         _browser_drivers['firefox'] = driver
+        _browser_driver_pages['firefox'] = 1
+        metrics.BROWSER_LAUNCHES.labels(browser='firefox').inc()
+        browser_watchdog.register(driver, 'firefox')
         return driver
     except Exception as firefox_error:
+        metrics.BROWSER_CRASHES.labels(browser='firefox').inc()
         logging.warning(f"Firefox initialization failed: {str(firefox_error)}")
         raise firefox_error  # Don't fall back to Chrome since we're using Firefox
 
@@ -537,6 +1246,7 @@ def cleanup_webdriver():
             driver.quit()
         except:
             pass
+        browser_watchdog.unregister(driver)
     _browser_drivers = {}
 
 def execute_browser_script(driver, script):
@@ -639,30 +1349,38 @@ def get_pressreader_source(url):
     
     return 'Unknown Publication'
 
+@tracing.traced()
 def get_news24_content(driver, url):
     """Extract content from News24 with optimized anti-bot and paywall handling"""
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    import time, random
+    import random
     
+    # The page title, kept as the headline if the deadline passes before a better one is found
+    title_headline = ""
     try:
         # Navigate and wait for page load
-        driver.get(url)
-        time.sleep(2 + random.random())
+        deadline.check('navigate')
+        with tracing.span('navigate'):
+            driver.set_page_load_timeout(deadline.cap(30))
+            driver.get(url)
+        with tracing.span('sleep'):
+            deadline.sleep(2 + random.random())
         
         # First try to get the title directly from the page title
         try:
             page_title = driver.title
-            if page_title and 'News24' in page_title:
-                # Remove "| News24" or similar from the end
-                clean_title = page_title.split('|')[0].strip()
-                if clean_title:
-                    return {
-                        'success': True,
-                        'headline': clean_title,
-                        'content': ''
-                    }
+            # Remove "| News24" or similar from the end
+            title_headline = (page_title or '').split('|')[0].strip()
+            if title_headline and 'News24' in page_title:
+                return {
+                    'success': True,
+                    'headline': title_headline,
+                    'content': ''
+                }
+        except deadline.DeadlineExceeded:
+            raise
         except:
             pass
         
@@ -678,14 +1396,15 @@ def get_news24_content(driver, url):
             "//body"  # Last resort - use the entire body
         ]
         
-        article = None
-        for xpath in content_paths:
-            try:
-                article = driver.find_element(By.XPATH, xpath)
-                if article:
-                    break
-            except:
-                continue
+        with tracing.span('content_cascade'):
+            article = None
+            for xpath in content_paths:
+                try:
+                    article = driver.find_element(By.XPATH, xpath)
+                    if article:
+                        break
+                except:
+                    continue
         
         if not article:
             # If we can't find the article content, try to at least get the title from the page
@@ -709,14 +1428,15 @@ def get_news24_content(driver, url):
             "//title"  # Last resort - use the page title
         ]
         
-        for xpath in headline_paths:
-            try:
-                headline_elem = article.find_element(By.XPATH, xpath)
-                if headline_elem and headline_elem.text.strip():
-                    headline = headline_elem.text.strip()
-                    break
-            except:
-                continue
+        with tracing.span('headline_cascade'):
+            for xpath in headline_paths:
+                try:
+                    headline_elem = article.find_element(By.XPATH, xpath)
+                    if headline_elem and headline_elem.text.strip():
+                        headline = headline_elem.text.strip()
+                        break
+                except:
+                    continue
                 
         # If we still don't have a headline, try the page title
         if not headline:
@@ -732,15 +1452,16 @@ def get_news24_content(driver, url):
             ".//div[contains(@class, 'article-body')]//p"
         ]
         
-        paragraphs = []
-        for xpath in content_paths:
-            try:
-                elements = article.find_elements(By.XPATH, xpath)
-                paragraphs = [p.text.strip() for p in elements if p.text.strip() and len(p.text.strip()) > 50]
-                if paragraphs:
-                    break
-            except:
-                continue
+        with tracing.span('paragraph_cascade'):
+            paragraphs = []
+            for xpath in content_paths:
+                try:
+                    elements = article.find_elements(By.XPATH, xpath)
+                    paragraphs = [p.text.strip() for p in elements if p.text.strip() and len(p.text.strip()) > 50]
+                    if paragraphs:
+                        break
+                except:
+                    continue
         
         if paragraphs:
             # Filter out subscription messages
@@ -757,27 +1478,153 @@ def get_news24_content(driver, url):
         raise Exception("No valid content found")
             
     except Exception as e:
-        logging.error(f"News24 extraction failed: {str(e)}")
-        return {'success': False}
+        # The selector cascades swallow DeadlineExceeded, so also look at the deadline itself
+        active = deadline.current()
+        if isinstance(e, deadline.DeadlineExceeded) or (active is not None and active.expired()):
+            logging.warning(f"News24 extraction stopped at the deadline: {str(e)}")
+            # Keep the page-title headline found before the deadline
+            if title_headline:
+                return {'success': True, 'headline': title_headline, 'content': ''}
+        else:
+            logging.error(f"News24 extraction failed: {str(e)}")
+    return {'success': False}
+
+# What the browser's injected script and the plain HTTP path both look for on a
+# PressReader page, in order of preference
+PRESSREADER_HEADLINE_SELECTORS = (
+    'h1.article-title',
+    'h1:not(.publication)',
+    '.headline',
+    '.article-headline',
+    '.article__title',
+    'h1',
+    '.title'
+)
+PRESSREADER_CONTENT_SELECTORS = (
+    'article p',
+    '.article-text p',
+    '.article-body p',
+    '.article__content p',
+    '.article-content p',
+    '.article p',
+    '.body p',
+    'main p',
+    '.content p'
+)
+PRESSREADER_UNWANTED_PHRASES = ('cookie', 'subscribe', 'sign in', 'register')
+# Paragraphs this short are captions, bylines and buttons
+PRESSREADER_MIN_PARAGRAPH_LENGTH = 30
+# The text view is tried over plain HTTP before a browser tab is leased
+PRESSREADER_HTTP_FIRST = os.getenv('PRESSREADER_HTTP_FIRST', '1') == '1'
+PRESSREADER_HTTP_TIMEOUT = 8
+
+_pressreader_headline_xpaths = [lxml.cssselect.CSSSelector(selector) for selector in PRESSREADER_HEADLINE_SELECTORS]
+_pressreader_content_xpaths = [lxml.cssselect.CSSSelector(selector) for selector in PRESSREADER_CONTENT_SELECTORS]
+
+def pressreader_textview_url(url):
+    """Rewrite an article URL to its text view, which has the article as plain markup"""
+    if '/article/' in url:
+        return url.replace('/article/', '/textview/')
+    return url
+
+def element_text(element):
+    """An element's text with whitespace collapsed, close to the browser's innerText"""
+    return ' '.join(element.text_content().split())
+
+def extract_pressreader_markup(html_content):
+    """Read the headline and paragraphs from PressReader markup the way the browser's script does.
+
+    Returns {'headline', 'paragraphs', 'from_title'}; from_title is True when
+    the headline only came from the page <title>.
+    """
+    tree = lxml.html.fromstring(html_content)
+    headline = ''
+    for selector in _pressreader_headline_xpaths:
+        elements = selector(tree)
+        if elements and element_text(elements[0]):
+            headline = element_text(elements[0])
+            break
+    from_title = False
+    if not headline:
+        title = tree.findtext('.//title') or ''
+        headline = title.split('|')[0].strip()
+        from_title = bool(headline)
+
+    paragraphs = []
+    for selector in _pressreader_content_xpaths:
+        for element in selector(tree):
+            text = element_text(element)
+            if len(text) > PRESSREADER_MIN_PARAGRAPH_LENGTH and not any(
+                phrase in text.lower() for phrase in PRESSREADER_UNWANTED_PHRASES
+            ):
+                paragraphs.append(text)
+        if paragraphs:
+            break
+    return {'headline': headline, 'paragraphs': paragraphs, 'from_title': from_title}
+
+def pressreader_article(headline, paragraphs):
+    """Headline and content for a clipping; the first paragraph stands in for a missing headline"""
+    if not headline and paragraphs:
+        return paragraphs[0], '\n\n'.join(paragraphs[1:3])
+    return headline, '\n\n'.join(paragraphs[:2])
+
+@tracing.traced()
+def fetch_pressreader_http(url, publication):
+    """Read a PressReader article's text view over plain HTTP.
+
+    Returns (path, result), or None when the page needs a browser: the
+    fetch failed, or the markup has neither article paragraphs nor a
+    headline element (only the generic page title).
+    """
+    textview_url = pressreader_textview_url(url)
+    try:
+        deadline.check('http_fetch')
+        # Streamed, so a hedged fetch that loses to the browser can be closed mid-download
+        with tracing.span('http_fetch'):
+            with requests.get(
+                textview_url, headers=REQUEST_HEADERS, cookies=cookie_jars.requests_cookies(url),
+                timeout=deadline.cap(PRESSREADER_HTTP_TIMEOUT), stream=True
+            ) as response, deadline.closing_on_cancel(response):
+                response.raise_for_status()
+                html = response.text
+        with tracing.span('lxml_extract'):
+            fields = extract_pressreader_markup(html)
+    except (requests.RequestException, lxml.etree.ParserError, ValueError) as e:
+        logger.info(f"PressReader text view over HTTP failed for {url}, using the browser: {e}")
+        return None
+    if not fields['paragraphs'] and (fields['from_title'] or not fields['headline']):
+        logger.info(f"PressReader text view of {url} has no article markup, using the browser")
+        return None
+    headline, content = pressreader_article(fields['headline'], fields['paragraphs'])
+    return 'pressreader_http', {
+        'headline': convert_caps_to_small_caps(headline),
+        'source': publication,
+        'content': content,
+        'url': url
+    }
 
+@tracing.traced()
 def scrape_pressreader_content(driver, url):
     """Extract content from PressReader with enhanced selectors and error handling"""
     from selenium.webdriver.common.by import By
     from selenium.webdriver.support.ui import WebDriverWait
     from selenium.webdriver.support import expected_conditions as EC
-    import time, random
+    import random
     
+    headline = ""
     try:
         # Always use textview mode for better content extraction
-        if '/article/' in url:
-            url = url.replace('/article/', '/textview/')
+        url = pressreader_textview_url(url)
         
         # Set longer timeout for PressReader which can be slow to load
-        driver.set_page_load_timeout(15)
-        driver.get(url)
+        deadline.check('navigate')
+        driver.set_page_load_timeout(deadline.cap(15))
+        with tracing.span('navigate'):
+            driver.get(url)
         
         # Add a small random delay to avoid detection
-        time.sleep(1 + random.random())
+        with tracing.span('sleep'):
+            deadline.sleep(1 + random.random())
         
         # First try to get the title directly from the page title
         try:
@@ -798,15 +1645,7 @@ def scrape_pressreader_content(driver, url):
         extract_script = """
             let headline = '';
             // Try multiple headline selectors
-            const headlineSelectors = [
-                'h1.article-title', 
-                'h1:not(.publication)', 
-                '.headline', 
-                '.article-headline',
-                '.article__title',
-                'h1',
-                '.title'
-            ];
+            const headlineSelectors = arguments[0];
 
             for (const selector of headlineSelectors) {
                 const elem = document.querySelector(selector);
@@ -824,28 +1663,17 @@ def scrape_pressreader_content(driver, url):
 
             // Get paragraphs with more comprehensive selectors
             const paragraphs = [];
-            const contentSelectors = [
-                'article p', 
-                '.article-text p', 
-                '.article-body p',
-                '.article__content p',
-                '.article-content p',
-                '.article p',
-                '.body p',
-                'main p',
-                '.content p'
-            ];
+            const contentSelectors = arguments[1];
+            const unwantedPhrases = arguments[2];
+            const minLength = arguments[3];
 
             for (const selector of contentSelectors) {
                 const elements = document.querySelectorAll(selector);
                 if (elements && elements.length > 0) {
                     elements.forEach(p => {
                         const text = p.innerText.trim();
-                        if (text.length > 30 && 
-                            !text.toLowerCase().includes('cookie') && 
-                            !text.toLowerCase().includes('subscribe') &&
-                            !text.toLowerCase().includes('sign in') &&
-                            !text.toLowerCase().includes('register')) {
+                        if (text.length > minLength &&
+                            !unwantedPhrases.some(phrase => text.toLowerCase().includes(phrase))) {
                             paragraphs.push(text);
                         }
                     });
@@ -857,93 +1685,62 @@ def scrape_pressreader_content(driver, url):
             return {headline, paragraphs};
         """
         
-        result = driver.execute_script(extract_script)
+        deadline.check('js_extract')
+        with tracing.span('js_extract'):
+            result = driver.execute_script(
+                extract_script,
+                list(PRESSREADER_HEADLINE_SELECTORS), list(PRESSREADER_CONTENT_SELECTORS),
+                list(PRESSREADER_UNWANTED_PHRASES), PRESSREADER_MIN_PARAGRAPH_LENGTH
+            )
         
         # Use the headline from JavaScript or fallback to the one from page title
         final_headline = result['headline'] or headline
         
         # If we have paragraphs, return success
         if result['paragraphs'] and len(result['paragraphs']) > 0:
-            # If no headline was found but we have paragraphs, use the first paragraph as headline
-            if not final_headline and result['paragraphs'][0]:
-                final_headline = result['paragraphs'][0]
-                # If we used the first paragraph as headline, remove it from content
-                content_paragraphs = result['paragraphs'][1:3]
-            else:
-                content_paragraphs = result['paragraphs'][:2]
-            
+            final_headline, content = pressreader_article(final_headline, result['paragraphs'])
             return {
                 'success': True,
                 'headline': final_headline,
-                'content': '\n\n'.join(content_paragraphs)
+                'content': content
             }
         
         # If JavaScript extraction failed, try direct Selenium extraction
         if not final_headline or not result['paragraphs']:
             try:
-                # Try to find headline with Selenium
-                headline_selectors = [
-                    "h1.article-title", 
-                    "h1:not(.publication)", 
-                    ".headline", 
-                    ".article-headline",
-                    ".article__title",
-                    "h1",
-                    ".title"
-                ]
-                
-                for selector in headline_selectors:
-                    try:
-                        element = driver.find_element(By.CSS_SELECTOR, selector)
-                        if element and element.text.strip():
-                            final_headline = element.text.strip()
-                            break
-                    except:
-                        continue
-                
-                # Try to find paragraphs with Selenium
-                content_selectors = [
-                    "article p", 
-                    ".article-text p", 
-                    ".article-body p",
-                    ".article__content p",
-                    ".article-content p",
-                    ".article p",
-                    ".body p",
-                    "main p",
-                    ".content p"
-                ]
+                # Same selectors and filters as the injected script and the HTTP path
+                with tracing.span('headline_cascade'):
+                    for selector in PRESSREADER_HEADLINE_SELECTORS:
+                        try:
+                            element = driver.find_element(By.CSS_SELECTOR, selector)
+                            if element and element.text.strip():
+                                final_headline = element.text.strip()
+                                break
+                        except:
+                            continue
                 
-                paragraphs = []
-                for selector in content_selectors:
-                    try:
-                        elements = driver.find_elements(By.CSS_SELECTOR, selector)
-                        if elements:
-                            paragraphs = [p.text.strip() for p in elements if p.text.strip() and len(p.text.strip()) > 30]
+                with tracing.span('paragraph_cascade'):
+                    paragraphs = []
+                    for selector in PRESSREADER_CONTENT_SELECTORS:
+                        try:
+                            for element in driver.find_elements(By.CSS_SELECTOR, selector):
+                                text = element.text.strip()
+                                if len(text) > PRESSREADER_MIN_PARAGRAPH_LENGTH and not any(
+                                    phrase in text.lower() for phrase in PRESSREADER_UNWANTED_PHRASES
+                                ):
+                                    paragraphs.append(text)
                             if paragraphs:
                                 break
-                    except:
-                        continue
+                        except:
+                            continue
                 
                 if paragraphs:
-                    # Filter out unwanted content
-                    unwanted = ['cookie', 'subscribe', 'premium', 'register', 'sign in']
-                    filtered_paragraphs = [p for p in paragraphs if not any(x in p.lower() for x in unwanted)]
-                    
-                    if filtered_paragraphs:
-                        # If no headline was found but we have paragraphs, use the first paragraph as headline
-                        if not final_headline and filtered_paragraphs[0]:
-                            final_headline = filtered_paragraphs[0]
-                            # If we used the first paragraph as headline, remove it from content
-                            content_paragraphs = filtered_paragraphs[1:3]
-                        else:
-                            content_paragraphs = filtered_paragraphs[:2]
-                        
-                        return {
-                            'success': True,
-                            'headline': final_headline,
-                            'content': '\n\n'.join(content_paragraphs)
-                        }
+                    final_headline, content = pressreader_article(final_headline, paragraphs)
+                    return {
+                        'success': True,
+                        'headline': final_headline,
+                        'content': content
+                    }
             except Exception as selenium_error:
                 logging.warning(f"PressReader Selenium extraction fallback failed: {str(selenium_error)}")
         
@@ -957,6 +1754,11 @@ def scrape_pressreader_content(driver, url):
             
         raise Exception("Could not extract content from PressReader")
             
+    except deadline.DeadlineExceeded as e:
+        logging.warning(f"PressReader extraction stopped: {str(e)}")
+        # Keep the page-title headline found before the deadline
+        if headline:
+            return {'success': True, 'headline': headline, 'content': ''}
     except Exception as e:
         logging.error(f"PressReader parsing error: {str(e)}")
     
@@ -980,17 +1782,165 @@ def set_browser_headers(driver, headers):
 
 _driver = None
 
+def is_driver_process_alive(driver):
+    """Check whether a driver's chromedriver/geckodriver process is still running"""
+    try:
+        return driver.service.process.poll() is None
+    except Exception:
+        return True
+
+# undetected_chromedriver patches chromedriver before use. Keeping the patched
+# copy means later launches only check it instead of downloading and patching again
+PATCHED_CHROMEDRIVER_DIR = browser_watchdog.PATCHED_DRIVER_DIR
+# Profiles are reused across launches (warm HTTP cache, no first-run setup);
+# each running Chrome needs its own, so workers claim one with a lock
+BROWSER_PROFILE_DIR = browser_watchdog.PROFILE_DIR
+BROWSER_PROFILE_SLOTS = 64
+_claimed_profile = None
+
+def get_patched_chromedriver(refresh=False):
+    """Return the cached copy of chromedriver for undetected_chromedriver to patch in place.
+
+    refresh=True is for a driver that no longer starts Chrome (usually after a
+    Chrome upgrade). Copying the local driver again would copy the same
+    mismatched version, so the copy is rebuilt from the driver webdriver_manager
+    resolves for the installed Chrome. Without one, None lets
+    undetected_chromedriver download a matching driver itself.
+    """
+    patched_path = os.path.abspath(os.path.join(PATCHED_CHROMEDRIVER_DIR, driver_executable_name('chrome')))
+    if refresh:
+        if os.path.exists(patched_path):
+            os.remove(patched_path)
+        source = install_driver('chrome')
+        if not source:
+            return None
+    elif is_driver_executable(patched_path):
+        metrics.record_cache('patched_chromedriver', True)
+        return patched_path
+    else:
+        metrics.record_cache('patched_chromedriver', False)
+        source = get_cached_driver_path('chrome')
+        if not source:
+            return None
+    os.makedirs(PATCHED_CHROMEDRIVER_DIR, exist_ok=True)
+    # Copy then rename so a worker never runs a half-written binary
+    temp_path = f'{patched_path}.{os.getpid()}.tmp'
+    shutil.copy2(source, temp_path)
+    os.replace(temp_path, patched_path)
+    return patched_path
+
+def claim_browser_profile():
+    """Claim a profile directory for this process's Chrome; the lock is held until exit"""
+    global _claimed_profile
+    if _claimed_profile is not None:
+        return _claimed_profile[0]
+    for slot in range(BROWSER_PROFILE_SLOTS):
+        profile_dir = os.path.abspath(os.path.join(BROWSER_PROFILE_DIR, f'profile-{slot}'))
+        os.makedirs(profile_dir, exist_ok=True)
+        lock_file = open(os.path.join(BROWSER_PROFILE_DIR, f'profile-{slot}.lock'), 'a')
+        if fcntl is None:
+            _claimed_profile = (profile_dir, lock_file)
+            return profile_dir
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            lock_file.close()
+            continue
+        _claimed_profile = (profile_dir, lock_file)
+        return profile_dir
+    return None
+
+@tracing.traced('driver_acquire')
 def get_selenium_driver():
     """Get or create singleton selenium driver"""
     global _driver
+    if _driver is not None and not is_driver_process_alive(_driver):
+        logger.warning("Chrome driver process died, relaunching")
+        metrics.BROWSER_CRASHES.labels(browser='chrome').inc()
+        cleanup()
+    metrics.record_cache('selenium_driver', _driver is not None)
     if (_driver is None):
         options = uc.ChromeOptions()
         options.add_argument('--headless')
         options.add_argument('--no-sandbox')
         options.add_argument('--disable-dev-shm-usage')
-        _driver = uc.Chrome(options=options)
+        # Leased tabs wait for their own page loads so navigation never blocks the other tabs
+        options.page_load_strategy = 'none'
+        try:
+            _driver = launch_chrome(options)
+        except Exception:
+            metrics.BROWSER_CRASHES.labels(browser='chrome').inc()
+            raise
+        metrics.BROWSER_LAUNCHES.labels(browser='chrome').inc()
+        browser_watchdog.register(_driver, 'chrome')
     return _driver
 
+def launch_chrome(options):
+    """Start Chrome from the cached patched chromedriver and a reused profile"""
+    start_time = time.time()
+    profile_dir = claim_browser_profile()
+    driver_path = get_patched_chromedriver()
+    try:
+        driver = uc.Chrome(options=options, driver_executable_path=driver_path, user_data_dir=profile_dir)
+    except Exception as e:
+        if not driver_path:
+            raise
+        # Usually a cached chromedriver that no longer matches an upgraded Chrome
+        logger.warning(f"Chrome failed to start with cached chromedriver, resolving it again: {e}")
+        driver = uc.Chrome(options=options, driver_executable_path=get_patched_chromedriver(refresh=True), user_data_dir=profile_dir)
+    logger.info(f"Chrome ready in {time.time() - start_time:.2f} seconds")
+    return driver
+
+def prewarm_browser():
+    """Start this worker's Chrome in the background so the first scrape does not wait for it"""
+    def warm():
+        try:
+            browser_tab_pool.prewarm()
+        except Exception as e:
+            logger.warning(f"Browser pre-warm failed: {e}")
+    threading.Thread(target=warm, name='browser-prewarm', daemon=True).start()
+
+def retire_selenium_driver(driver, reason, pages):
+    """Quit a Chrome that has served too many pages or grown too large"""
+    browser_watchdog.record_recycle(driver, 'chrome', reason, pages)
+    if _driver is driver:
+        cleanup()
+    # quit() can leave the detached browser behind
+    browser_watchdog.kill_tree(browser_watchdog.driver_root_pids(driver))
+
+# Browser scrapes lease isolated tabs of the shared Chrome, BROWSER_MAX_TABS at a time
+browser_tab_pool = browser_tabs.TabPool(
+    get_selenium_driver,
+    recycle_reason=browser_watchdog.recycle_reason,
+    retire=retire_selenium_driver
+)
+
+def kill_driver_process_tree(driver):
+    """Kill a driver's service process and every browser process it started"""
+    browser_watchdog.kill_tree(browser_watchdog.driver_root_pids(driver))
+    browser_watchdog.unregister(driver)
+
+def kill_browser_drivers():
+    """Hard-cancel in-flight browser work by killing every cached driver"""
+    global _driver, _browser_drivers
+    logger.warning("Scrape deadline passed with browser work still running, killing drivers")
+    if _driver is not None:
+        kill_driver_process_tree(_driver)
+        _driver = None
+    for driver in _browser_drivers.values():
+        kill_driver_process_tree(driver)
+    _browser_drivers = {}
+
+def cancel_browser_work(scrape_deadline):
+    """Cut off an overrunning scrape's browser tabs; other scrapes' tabs in the same Chrome keep running"""
+    tabs = list(scrape_deadline.tabs)
+    if not tabs:
+        return
+    logger.warning(f"Scrape deadline passed with {len(tabs)} browser tab(s) still working, closing them")
+    if not all(browser_tab_pool.cancel(tab) for tab in tabs):
+        # The command lock is wedged by a call that never returns; only killing the driver frees it
+        kill_browser_drivers()
+
 # Add cleanup for Selenium driver
 def cleanup():
     global _driver
@@ -999,12 +1949,15 @@ def cleanup():
             _driver.quit()
         except:
             pass
+        browser_watchdog.unregister(_driver)
         _driver = None
 
 import atexit
 atexit.register(cleanup)
+atexit.register(structured_logging.stop_logging)
 
 @app.route('/api/scrape', methods=['POST', 'OPTIONS'])
+@profiling.profiled('scrape')
 def scrape():
     if request.method == 'OPTIONS':
         return '', 204
@@ -1021,7 +1974,18 @@ def scrape():
         if not url.startswith(('http://', 'https://')):
             url = 'https://' + url
             
-        result = scrape_url(url)
+        # ?debug=timing returns the per-stage trace; other requests are sampled
+        debug_timing = request.args.get('debug') == 'timing'
+        trace, token = tracing.start_trace('scrape', force=debug_timing)
+        try:
+            with tracing.span('scrape_url'):
+                result = scrape_url(url)
+        finally:
+            trace_data = tracing.finish_trace(trace, token, url=url)
+        if debug_timing:
+            result = dict(result, timing=trace_data)
+        # Warn before the editor saves a story the list already has from another edition or outlet
+        result = dict(result, duplicates=find_near_duplicates(result.get('headline'), result.get('content')))
         return jsonify(result)
         
     except ValueError as e:
@@ -1142,6 +2106,13 @@ def generate_pdf(clippings):
                 for clipping in sorted(articles, key=lambda x: x.order):
                     if clipping.headline.strip():
                         story.append(Paragraph(f"<b>{clipping.headline}</b>", headline_style))
+
+                    image_path = clipping_images.image_path(clipping.image)
+                    if image_path:
+                        # The stored derivative is already print-sized; JPEGs are embedded without decoding
+                        width_cm, height_cm = clipping_images.print_size_cm(clipping.image, max_width_cm=doc.width / cm)
+                        story.append(Image(image_path, width=width_cm * cm, height=height_cm * cm))
+                        story.append(Spacer(1, 6))
                     
                     if clipping.content.strip():
                         story.append(Paragraph(clipping.content.replace('\n\n', ' '), content_style))
@@ -1231,6 +2202,11 @@ def generate_docx(clippings):
                         headline.paragraph_format.space_after = Pt(0)
                         headline.paragraph_format.line_spacing = 1.0
 
+                    image_path = clipping_images.image_path(clipping.image)
+                    if image_path:
+                        width_cm, height_cm = clipping_images.print_size_cm(clipping.image)
+                        doc.add_picture(image_path, width=Cm(width_cm), height=Cm(height_cm))
+
                     if clipping.content.strip():
                         content = doc.add_paragraph()
                         content_run = content.add_run(clipping.content.replace('\n\n', ' '))
@@ -1286,18 +2262,50 @@ def generate_docx(clippings):
     return temp_file.name
 
 def purge_old_clippings():
-    with app.app_context():
-        cutoff_date = datetime.utcnow() - timedelta(hours=24)
-        Clipping.query.filter(Clipping.date < cutoff_date).delete()
-        db.session.commit()
+    # Purge the main database and then every desk database in turn
+    referenced_images = set()
+    for desk in [None] + list_desks():
+        with app.app_context():
+            if desk:
+                g.desk = desk
+                g.desk_engine = get_desk_engine(desk)
+            cutoff_date = datetime.utcnow() - timedelta(hours=24)
+            with metrics.DB_OPERATION_DURATION.labels(operation='purge').time():
+                expired = Clipping.query.filter(Clipping.date < cutoff_date)
+                purged_ids = [clipping_id for clipping_id, in expired.with_entities(Clipping.id)]
+                if purged_ids:
+                    expired.delete()
+                    record_changes('deleted', [{'id': clipping_id} for clipping_id in purged_ids])
+                prune_change_log()
+                db.session.commit()
+            referenced_images.update(
+                image for image, in db.session.query(Clipping.image).filter(Clipping.image.isnot(None))
+            )
+    # Images are shared by every desk, so only drop those no desk uses
+    removed = clipping_images.remove_unreferenced(referenced_images)
+    if removed:
+        logger.info(f"Removed {removed} unused clipping images")
+
+# Orphaned browsers are also reaped by gunicorn's child_exit hook as soon as a worker dies
+BROWSER_REAP_MINUTES = int(os.getenv('BROWSER_REAP_MINUTES', '5'))
 
 scheduler = BackgroundScheduler()
 scheduler.add_job(func=purge_old_clippings, trigger="interval", hours=1)
+scheduler.add_job(func=cap_driver_logs, trigger="interval", minutes=10)
+scheduler.add_job(func=browser_watchdog.reap_orphans, trigger="interval", minutes=BROWSER_REAP_MINUTES)
+scheduler.add_job(func=singleflight.cleanup, trigger="interval", hours=1)
 scheduler.start()
 
 @app.route('/')
 def index():
-    return render_template('index.html')
+    response = app.make_response(render_template('index.html'))
+    # Opening /?desk=<name> pins the browser to that desk for later API calls
+    if 'desk' in request.args:
+        if g.get('desk'):
+            response.set_cookie('desk', g.desk, samesite='Lax')
+        else:
+            response.delete_cookie('desk')
+    return response
 
 @app.errorhandler(404)
 def not_found_error(error):
@@ -1310,6 +2318,24 @@ def handle_error(error):
     logger.error(f"Unhandled error: {error}", exc_info=True)
     return jsonify({'error': str(error)}), 500
 
+MAX_PAGE_SIZE = 500
+
+# Rows with no order (older rows, or ones written outside the app) list as
+# order 0; the sort and the cursor filter must agree or paging skips them
+LIST_ORDER = db.func.coalesce(Clipping.order, 0)
+
+def encode_cursor(order, clipping_id):
+    """Encode the (order, id) position of the last row on a page"""
+    return base64.urlsafe_b64encode(f"{order or 0}:{clipping_id}".encode()).decode()
+
+def decode_cursor(cursor):
+    """Decode a cursor produced by encode_cursor into (order, id)"""
+    try:
+        order, clipping_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return int(order), int(clipping_id)
+    except Exception:
+        raise ValueError('Invalid cursor')
+
 @app.route('/api/clippings', methods=['GET', 'POST'])
 def handle_clippings():
     if request.method == 'POST':
@@ -1322,45 +2348,769 @@ def handle_clippings():
             source=data['source'],
             category=data['category'],
             content=data['content'],
-            url=data.get('url'),
-            order=len(Clipping.query.all())
+            url=data.get('url')
         )
+        with metrics.DB_OPERATION_DURATION.labels(operation='create').time():
+            lock_clippings_for_write()
+            clipping.order = next_clipping_order()
+            db.session.add(clipping)
+            db.session.flush()
+            index_near_duplicates([clipping])
+            record_changes('created', [clipping.to_dict()])
+            db.session.commit()
+        duplicates = find_near_duplicates(clipping.headline, clipping.content, exclude_id=clipping.id)
+        return jsonify(dict(clipping.to_dict(), duplicates=duplicates))
+    
+    # Field projection, e.g. ?fields=id,headline,source
+    fields = None
+    if request.args.get('fields'):
+        fields = [f.strip() for f in request.args['fields'].split(',') if f.strip()]
+        unknown = [f for f in fields if f not in CLIPPING_FIELDS]
+        if unknown:
+            return jsonify({'error': f"Unknown fields: {', '.join(unknown)}"}), 400
+
+    # Cursor pagination is opt-in so existing clients still get the full list
+    limit = request.args.get('limit', type=int)
+    if limit is not None and not 1 <= limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f'limit must be between 1 and {MAX_PAGE_SIZE}'}), 400
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        try:
+            cursor = decode_cursor(cursor)
+        except ValueError:
+            return jsonify({'error': 'Invalid cursor'}), 400
+
+    # Unchanged collection: answer from the version alone without touching the rows
+    version = get_collection_version()
+    # Every desk counts its own versions, so the desk is part of the tag
+    etag = f"{g.get('desk') or ''}-{version}-{zlib.crc32(request.query_string):08x}"
+    if request.if_none_match.contains_weak(etag):
+        metrics.record_cache('clippings_etag', True)
+        response = app.response_class(status=304)
+        response.set_etag(etag, weak=True)
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['Vary'] = DESK_VARY
+        response.headers['X-Collection-Version'] = str(version)
+        return response
+
+    metrics.record_cache('clippings_etag', False)
+    query = Clipping.query
+    if fields:
+        columns = set(fields) | {'order'}
+        query = query.options(load_only(*[getattr(Clipping, f) for f in columns if f != 'id']))
+    if cursor:
+        last_order, last_id = cursor
+        query = query.filter(db.or_(
+            LIST_ORDER > last_order,
+            db.and_(LIST_ORDER == last_order, Clipping.id > last_id)
+        ))
+    query = query.order_by(LIST_ORDER, Clipping.id)
+
+    with metrics.DB_OPERATION_DURATION.labels(operation='list').time():
+        if limit is not None:
+            # Fetch one extra row to know whether another page exists
+            clippings = query.limit(limit + 1).all()
+            has_more = len(clippings) > limit
+            clippings = clippings[:limit]
+        else:
+            clippings = query.all()
+            has_more = False
+
+    response = jsonify([c.to_dict(fields) for c in clippings])
+    response.set_etag(etag, weak=True)
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = DESK_VARY
+    # Clients pass this to /api/clippings/stream to hear about everything after this list
+    response.headers['X-Collection-Version'] = str(version)
+    if has_more:
+        last = clippings[-1]
+        response.headers['X-Next-Cursor'] = encode_cursor(last.order, last.id)
+    return response
+
+MAX_BULK_CLIPPINGS = 5000
+
+def next_clipping_order():
+    """Return the order value that places a new clipping at the end of the list"""
+    return db.session.query(db.func.coalesce(db.func.max(Clipping.order), -1)).scalar() + 1
+
+def validate_clipping_data(data):
+    """Return an error message for an invalid clipping payload, or None"""
+    if not isinstance(data, dict):
+        return 'Clipping must be an object'
+    for field in ('source', 'category'):
+        if not isinstance(data.get(field), str) or not data[field].strip():
+            return f"Missing required field: {field}"
+    for field in ('headline', 'content', 'url'):
+        if data.get(field) is not None and not isinstance(data[field], str):
+            return f"Field {field} must be a string"
+    return None
+
+def lock_clippings_for_write():
+    """Take the database write lock now, as SQLite's BEGIN IMMEDIATE would.
+
+    pysqlite only starts a write transaction at the first write, so reads
+    made before it (the end of the list, the last id) could be overtaken by
+    another worker's commit. A no-op UPDATE takes the lock first; other
+    writers wait on the busy timeout until this transaction commits.
+    """
+    CollectionVersion.query.filter_by(id=1).update(
+        {CollectionVersion.version: CollectionVersion.version}, synchronize_session=False
+    )
+
+def insert_clippings(items):
+    """Append validated clipping payloads to the list in one transaction; returns the new clippings"""
+    lock_clippings_for_write()
+    first_order = next_clipping_order()
+    now = datetime.utcnow()
+    created = []
+    for offset, item in enumerate(items):
+        headline = item.get('headline') or ''
+        if not item.get('isEdit', False):
+            headline = convert_caps_to_small_caps(headline)
+        created.append(Clipping(
+            headline=headline,
+            source=item['source'],
+            category=item['category'],
+            content=item.get('content') or '',
+            url=item.get('url'),
+            date=now,
+            order=first_order + offset
+        ))
+
+    # One batched INSERT ... RETURNING fills in the ids of exactly these rows
+    db.session.add_all(created)
+    db.session.flush()
+    index_near_duplicates(created)
+    record_changes('created', [c.to_dict() for c in created])
+    db.session.commit()
+    return created
+
+@app.route('/api/clippings/bulk', methods=['POST'])
+def bulk_create_clippings():
+    items = request.get_json(silent=True)
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'Expected a non-empty array of clippings'}), 400
+    if len(items) > MAX_BULK_CLIPPINGS:
+        return jsonify({'error': f'At most {MAX_BULK_CLIPPINGS} clippings per request'}), 400
+
+    # Validate everything up front so a bad item never leaves a partial batch
+    errors = []
+    for index, item in enumerate(items):
+        error = validate_clipping_data(item)
+        if error:
+            errors.append({'index': index, 'error': error})
+    if errors:
+        return jsonify({'error': 'Invalid clippings', 'details': errors}), 400
+
+    start_time = time.time()
+    try:
+        created = insert_clippings(items)
+        metrics.DB_OPERATION_DURATION.labels(operation='bulk_create').observe(time.time() - start_time)
+    except Exception as e:
+        db.session.rollback()
+        logging.error(f"Error creating clippings in bulk: {str(e)}")
+        return jsonify({'error': str(e)}), 500
+
+    return jsonify([c.to_dict() for c in created]), 201
+
+# Categories editors use in the input document; headings are matched against these
+CLIPPING_CATEGORIES = [
+    "Foreign Politics",
+    "Domestic Politics",
+    "Economy, Energy, Climate & Agriculture",
+    "Verschiedenes",
+    "Cartoon"
+]
+DEFAULT_IMPORT_CATEGORY = "Verschiedenes"
+URL_PATTERN = re.compile(r'(?:https?://|www\.)[^\s<>"\']+', re.IGNORECASE)
+# HTTP-only scrapes run this many at a time; browser scrapes are limited to
+# the browser capacity so queued scrapes do not spend their deadline waiting
+IMPORT_SCRAPE_WORKERS = int(os.getenv('IMPORT_SCRAPE_WORKERS', '6'))
+IMPORT_BROWSER_CAPACITY = int(os.getenv('IMPORT_BROWSER_CAPACITY', str(browser_tabs.MAX_TABS)))
+_import_browser_slots = threading.BoundedSemaphore(IMPORT_BROWSER_CAPACITY)
+
+def match_import_category(text):
+    """Return the category a heading names, matching the fixed categories case-insensitively"""
+    name = text.strip().rstrip(':').strip()
+    for category in CLIPPING_CATEGORIES:
+        if name.lower() == category.lower():
+            return category
+    return name
+
+def is_category_heading(paragraph, text):
+    """Treat heading styles, known category names and short all-bold lines as category headings"""
+    style = paragraph.style.name if paragraph.style is not None else ''
+    if style.startswith(('Heading', 'Title')):
+        return True
+    if match_import_category(text) in CLIPPING_CATEGORIES:
+        return True
+    runs = [run for run in paragraph.runs if run.text.strip()]
+    return len(text) <= 80 and bool(runs) and all(run.bold for run in runs)
+
+def paragraph_urls(paragraph):
+    """Return the URLs in a paragraph: hyperlink targets first, then URLs typed as text"""
+    urls = []
+    for hyperlink in paragraph._p.xpath('.//w:hyperlink'):
+        rel_id = hyperlink.get(docx.oxml.shared.qn('r:id'))
+        rel = paragraph.part.rels.get(rel_id) if rel_id else None
+        if rel is not None and rel.is_external:
+            urls.append(rel.target_ref)
+    for match in URL_PATTERN.findall(paragraph.text):
+        urls.append(match.rstrip('.,;:!?)]}'))
+    return urls
+
+def iter_docx_paragraphs(document):
+    """Yield body paragraphs in document order, including those inside tables"""
+    for block in document.element.body.iterchildren():
+        if block.tag == docx.oxml.shared.qn('w:p'):
+            yield DocxParagraph(block, document)
+        elif block.tag == docx.oxml.shared.qn('w:tbl'):
+            for row in DocxTable(block, document).rows:
+                for cell in row.cells:
+                    yield from cell.paragraphs
+
+def parse_import_docx(file_stream):
+    """Return [{'url', 'category'}] in document order from an input Word file"""
+    document = DocxDocument(file_stream)
+    category = DEFAULT_IMPORT_CATEGORY
+    entries = []
+    seen = set()
+    for paragraph in iter_docx_paragraphs(document):
+        text = paragraph.text.strip()
+        urls = paragraph_urls(paragraph)
+        if not urls:
+            if text and is_category_heading(paragraph, text):
+                category = match_import_category(text)
+            continue
+        for url in urls:
+            if not url.lower().startswith(('http://', 'https://')):
+                url = 'https://' + url
+            if url not in seen:
+                seen.add(url)
+                entries.append({'url': url, 'category': category})
+    return entries
+
+def needs_browser(url):
+    """Return True if scrape_url will drive the browser for this URL"""
+    domain = urlparse(url).netloc
+    if 'pressreader.com' in domain:
+        return True
+    return 'news24.com' in domain and not extract_title_from_url(url)
+
+def scrape_import_entry(entry):
+    """Scrape one imported URL into a clipping payload"""
+    url = entry['url']
+    try:
+        if needs_browser(url):
+            # Take a browser slot before scrape_url starts its deadline
+            with _import_browser_slots:
+                result = scrape_url(url)
+        else:
+            result = scrape_url(url)
+        error = None
+    except Exception as e:
+        logger.warning(f"Import scrape of {url} failed: {str(e)}")
+        result = {'headline': '', 'source': get_clean_source_name(urlparse(url).netloc), 'content': ''}
+        error = str(e)
+    clipping = {
+        'headline': result.get('headline') or '',
+        'source': result.get('source') or get_clean_source_name(urlparse(url).netloc),
+        'category': entry['category'],
+        'content': result.get('content') or '',
+        'url': url
+    }
+    return clipping, error
+
+def arrange_in_document_order(saved):
+    """Give imported clippings, saved in the order their scrapes finished, the document's order.
+
+    saved maps each link's position in the document to its clipping id. The
+    clippings swap the order values they already hold, so anything added
+    around them meanwhile keeps its place.
+    """
+    lock_clippings_for_write()
+    clippings = {c.id: c for c in Clipping.query.filter(Clipping.id.in_(saved.values()))}
+    # Clippings deleted during the import drop out
+    in_document_order = [clippings[saved[index]] for index in sorted(saved) if saved[index] in clippings]
+    orders = sorted(c.order or 0 for c in in_document_order)
+    moved = []
+    for clipping, order in zip(in_document_order, orders):
+        if clipping.order != order:
+            clipping.order = order
+            moved.append({'id': clipping.id, 'order': order})
+    if moved:
+        record_changes('moved', moved)
+    db.session.commit()
+
+def progress_line(**event):
+    return json.dumps(event) + '\n'
+
+@app.route('/api/import/docx', methods=['POST'])
+def import_docx():
+    """Build clippings from an uploaded input document, streaming progress as JSON lines"""
+    upload = request.files.get('file')
+    if upload is None or not upload.filename:
+        return jsonify({'error': 'No file provided'}), 400
+    if not upload.filename.lower().endswith('.docx'):
+        return jsonify({'error': 'Expected a .docx file'}), 400
+    try:
+        entries = parse_import_docx(upload.stream)
+    except Exception as e:
+        logging.warning(f"Could not read import file {upload.filename}: {str(e)}")
+        return jsonify({'error': 'Could not read Word file'}), 400
+    if not entries:
+        return jsonify({'error': 'No links found in the document'}), 400
+    if len(entries) > MAX_BULK_CLIPPINGS:
+        return jsonify({'error': f'At most {MAX_BULK_CLIPPINGS} links per import'}), 400
+
+    logging.info(f"Importing {len(entries)} links from {upload.filename}")
+
+    def generate():
+        yield progress_line(event='start', total=len(entries))
+        start_time = time.time()
+        # Each clipping is appended as its scrape finishes, so a worker
+        # timeout only loses the scrapes still running
+        saved = {}
+        failed = 0
+        workers = max(1, min(IMPORT_SCRAPE_WORKERS, len(entries)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='import') as executor:
+            futures = {
+                executor.submit(contextvars.copy_context().run, scrape_import_entry, entry): index
+                for index, entry in enumerate(entries)
+            }
+            for done, future in enumerate(as_completed(futures), 1):
+                index = futures[future]
+                clipping, error = future.result()
+                if error or not clipping['headline']:
+                    failed += 1
+                try:
+                    inserted = insert_clippings([clipping])[0]
+                    saved[index] = inserted.id
+                    created = inserted.to_dict()
+                except Exception as e:
+                    db.session.rollback()
+                    logging.error(f"Error saving imported clipping {clipping['url']}: {str(e)}")
+                    created = None
+                    error = f'Could not save: {e}'
+                yield progress_line(event='scraped', done=done, total=len(entries), index=index,
+                                    url=clipping['url'], headline=clipping['headline'],
+                                    category=clipping['category'], error=error, clipping=created)
+
+        try:
+            arrange_in_document_order(saved)
+        except Exception as e:
+            db.session.rollback()
+            logging.error(f"Could not put imported clippings in document order: {str(e)}")
+        logging.info(f"Imported {len(saved)} clippings in {time.time() - start_time:.1f} seconds ({failed} without a headline)")
+        yield progress_line(event='done', saved=len(saved), failed=failed)
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    # Let nginx pass each progress line through as soon as it is written
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-cache'
+    return response
+
+def fetch_image_bytes(url):
+    """Download an image, refusing anything that is not an image or is too large"""
+    with requests.get(url, headers=REQUEST_HEADERS, timeout=15, stream=True) as response:
+        response.raise_for_status()
+        content_type = response.headers.get('Content-Type', '')
+        if not content_type.startswith('image/'):
+            raise clipping_images.ImageError(f'URL is not an image ({content_type or "no content type"})')
+        data = bytearray()
+        for chunk in response.iter_content(65536):
+            data.extend(chunk)
+            if len(data) > clipping_images.MAX_SOURCE_BYTES:
+                raise clipping_images.ImageError('Image is larger than 20 MB')
+    return bytes(data)
+
+@app.route('/api/clippings/image', methods=['POST'])
+def create_image_clipping():
+    """Add an image clipping from an uploaded file or an image URL"""
+    upload = request.files.get('file')
+    image_url = (request.form.get('image_url') or '').strip()
+    if (upload is None or not upload.filename) and not image_url:
+        return jsonify({'error': 'Provide an image file or image_url'}), 400
+
+    try:
+        if upload is not None and upload.filename:
+            data = upload.read(clipping_images.MAX_SOURCE_BYTES + 1)
+            source = request.form.get('source') or 'Cartoon'
+        else:
+            if not image_url.startswith(('http://', 'https://')):
+                return jsonify({'error': 'image_url must be an http(s) URL'}), 400
+            data = fetch_image_bytes(image_url)
+            source = request.form.get('source') or get_clean_source_name(urlparse(image_url).netloc)
+        with metrics.DB_OPERATION_DURATION.labels(operation='store_image').time():
+            image = clipping_images.store_image(data)
+    except clipping_images.ImageError as e:
+        return jsonify({'error': str(e)}), 400
+    except requests.RequestException as e:
+        return jsonify({'error': f'Could not fetch image: {e}'}), 400
+
+    clipping = Clipping(
+        headline=request.form.get('headline', ''),
+        source=source,
+        category=request.form.get('category') or 'Cartoon',
+        content=request.form.get('content', ''),
+        url=request.form.get('url') or image_url or None,
+        image=image
+    )
+    with metrics.DB_OPERATION_DURATION.labels(operation='create').time():
+        lock_clippings_for_write()
+        clipping.order = next_clipping_order()
         db.session.add(clipping)
+        db.session.flush()
+        index_near_duplicates([clipping])
+        record_changes('created', [clipping.to_dict()])
         db.session.commit()
-        return jsonify(clipping.to_dict())
-    
-    clippings = Clipping.query.order_by(Clipping.order).all()
-    return jsonify([c.to_dict() for c in clippings])
+    return jsonify(clipping.to_dict()), 201
+
+@app.route('/api/images/<name>')
+def clipping_image(name):
+    path = clipping_images.image_path(name)
+    if path is None:
+        return jsonify({'error': 'Not Found'}), 404
+    # Names are content hashes, so a name always means the same bytes
+    return send_file(os.path.abspath(path), max_age=365 * 24 * 3600)
 
 @app.route('/api/clippings/reorder', methods=['POST'])
 def reorder_clippings():
     new_order = request.json
-    for item in new_order:
-        clipping = Clipping.query.get(item['id'])
-        if clipping:
-            clipping.order = item['order']
-    db.session.commit()
+    with metrics.DB_OPERATION_DURATION.labels(operation='reorder').time():
+        moved = []
+        for item in new_order:
+            clipping = Clipping.query.get(item['id'])
+            if clipping and clipping.order != item['order']:
+                clipping.order = item['order']
+                moved.append({'id': clipping.id, 'order': clipping.order})
+        # Only the clippings whose position changed are sent to other clients
+        record_changes('moved', moved)
+        db.session.commit()
     return '', 204
 
+# Headline matches outrank source matches, which outrank body matches
+SEARCH_COLUMN_WEIGHTS = (5.0, 1.0, 2.0)
+# A common word matches most of the archive and bm25 would score every
+# match; only the newest matches are ranked, which is where a story that
+# has already been clipped will be
+SEARCH_CANDIDATES = int(os.getenv('SEARCH_CANDIDATES', '2000'))
+SEARCH_SNIPPET_WORDS = 16
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+def parse_search(text):
+    """Split what an editor typed into terms: (tokens, is_prefix) for each word or quoted phrase"""
+    terms = []
+    for phrase, word in re.findall(r'"([^"]*)"?|(\S+)', text):
+        tokens = re.findall(r'\w+', phrase or word)
+        if tokens:
+            # A one-letter prefix would match most of the index
+            terms.append((tokens, bool(word) and len(tokens[-1]) > 1))
+    return terms
+
+def fts_query(terms):
+    """FTS5 query requiring every term, with bare words matched as prefixes"""
+    return ' '.join('"' + ' '.join(tokens) + '"' + ('*' if prefix else '') for tokens, prefix in terms)
+
+def search_pattern(terms):
+    """Regex finding the terms in text, for highlighting"""
+    alternatives = []
+    for tokens, prefix in terms:
+        pattern = r'\W+'.join(re.escape(fold_diacritics(token)) for token in tokens)
+        alternatives.append(rf'\b{pattern}' + (r'\w*' if prefix else r'\b'))
+    return re.compile('|'.join(alternatives), re.IGNORECASE)
+
+def fold_diacritics(text):
+    """Strip accents character by character, so offsets still line up with the original"""
+    if text.isascii():
+        return text
+    return ''.join(unicodedata.normalize('NFD', char)[0] for char in text)
+
+def marked_html(text, pattern):
+    """Escape text for HTML with the matches wrapped in <mark>"""
+    parts = []
+    position = 0
+    # The index ignores diacritics (remove_diacritics 2), so highlighting does too
+    for match in pattern.finditer(fold_diacritics(text)):
+        parts.append(html.escape(text[position:match.start()]))
+        parts.append(f'<mark>{html.escape(text[match.start():match.end()])}</mark>')
+        position = match.end()
+    parts.append(html.escape(text[position:]))
+    return ''.join(parts)
+
+def search_snippet(text, pattern):
+    """The words of text around its first match, or its opening words"""
+    words = text.split()
+    match = pattern.search(fold_diacritics(text))
+    first = len(text[:match.start()].split()) if match else 0
+    start = max(0, first - SEARCH_SNIPPET_WORDS // 3)
+    window = words[start:start + SEARCH_SNIPPET_WORDS]
+    snippet = ' '.join(window)
+    if start > 0:
+        snippet = '…' + snippet
+    if start + SEARCH_SNIPPET_WORDS < len(words):
+        snippet += '…'
+    return snippet
+
+@app.route('/api/clippings/search')
+def search_clippings():
+    """Rank clippings against ?q= and return them with highlighted headlines and snippets"""
+    terms = parse_search(request.args.get('q', ''))
+    if not terms:
+        return jsonify({'error': 'q must contain at least one word'}), 400
+    limit = request.args.get('limit', DEFAULT_SEARCH_LIMIT, type=int)
+    if not 1 <= limit <= MAX_SEARCH_LIMIT:
+        return jsonify({'error': f'limit must be between 1 and {MAX_SEARCH_LIMIT}'}), 400
+
+    query = fts_query(terms)
+    weights = ', '.join(str(weight) for weight in SEARCH_COLUMN_WEIGHTS)
+    # FTS5 walks matches newest first and stops after SEARCH_CANDIDATES,
+    # so only those are scored
+    statement = sqlalchemy.text(f"""
+        SELECT rowid FROM (
+            SELECT rowid, bm25({SEARCH_TABLE}, {weights}) AS score
+            FROM {SEARCH_TABLE} WHERE {SEARCH_TABLE} MATCH :query
+            ORDER BY rowid DESC LIMIT :candidates
+        ) ORDER BY score LIMIT :limit
+    """)
+    with metrics.DB_OPERATION_DURATION.labels(operation='search').time():
+        try:
+            ids = db.session.execute(statement, {
+                'query': query, 'candidates': SEARCH_CANDIDATES, 'limit': limit + 1
+            }).scalars().all()
+        except sqlalchemy.exc.OperationalError as e:
+            logger.warning(f"Search for {query!r} failed: {e}")
+            return jsonify({'error': 'Full-text search is unavailable'}), 503
+        has_more = len(ids) > limit
+        ids = ids[:limit]
+        clippings = {c.id: c for c in Clipping.query.filter(Clipping.id.in_(ids)).all()}
+
+    # FTS5's own highlight() and snippet() would look every term up in the
+    # index again for each row; the page is small enough to mark up here
+    pattern = search_pattern(terms)
+    results = []
+    for clipping_id in ids:
+        clipping = clippings.get(clipping_id)
+        if clipping is None:
+            continue
+        result = clipping.to_dict()
+        result['headline_html'] = marked_html(clipping.headline or '', pattern)
+        result['snippet_html'] = marked_html(search_snippet(clipping.content or '', pattern), pattern)
+        results.append(result)
+    return jsonify({'query': query, 'results': results, 'has_more': has_more})
+
+@app.route('/api/clippings/duplicates')
+def clipping_duplicates():
+    """Return groups of clippings in the list that are likely the same story.
+
+    With ?ids=1,2,3 only those clippings are looked up, and each group holds
+    one of them and its twins; the page uses this after a change instead of
+    grouping the whole list again.
+    """
+    looked_up = None
+    if request.args.get('ids'):
+        try:
+            looked_up = [int(i) for i in request.args['ids'].split(',') if i.strip()]
+        except ValueError:
+            return jsonify({'error': 'ids must be a comma-separated list of clipping ids'}), 400
+
+    with metrics.DB_OPERATION_DURATION.labels(operation='near_duplicates').time():
+        first = aliased(ClippingBucket)
+        second = aliased(ClippingBucket)
+        if looked_up is None:
+            pairs = db.session.query(first.clipping_id, second.clipping_id).join(
+                second, db.and_(first.key == second.key, first.clipping_id < second.clipping_id)
+            ).distinct().all()
+        else:
+            pairs = db.session.query(first.clipping_id, second.clipping_id).join(
+                second, db.and_(first.key == second.key, first.clipping_id != second.clipping_id)
+            ).filter(first.clipping_id.in_(looked_up)).distinct().all()
+        ids = {clipping_id for pair in pairs for clipping_id in pair}
+        signatures = {
+            clipping_id: near_duplicates.unpack(packed)
+            for clipping_id, packed in db.session.query(ClippingSignature.clipping_id, ClippingSignature.signature)
+            .filter(ClippingSignature.clipping_id.in_(ids))
+        }
+
+    # Candidates sharing a bucket are checked, then joined into groups
+    group_of = {}
+    twins_of = {}
+    for a, b in pairs:
+        if near_duplicates.similarity(signatures[a], signatures[b]) < near_duplicates.THRESHOLD:
+            continue
+        if looked_up is not None:
+            twins_of.setdefault(a, {a}).add(b)
+            continue
+        group = group_of.get(a, {a}) | group_of.get(b, {b})
+        for clipping_id in group:
+            group_of[clipping_id] = group
+    if looked_up is not None:
+        return jsonify({'groups': sorted(sorted(group) for group in twins_of.values())})
+    groups = {id(group): sorted(group) for group in group_of.values()}
+    return jsonify({'groups': sorted(groups.values())})
+
+@app.route('/api/clippings/changes')
+def clipping_changes():
+    """Return what changed after ?since=<version>, compacted to each clipping's current state"""
+    since = request.args.get('since', type=int)
+    if since is None or since < 0:
+        return jsonify({'error': 'since must be a non-negative integer version'}), 400
+
+    with metrics.DB_OPERATION_DURATION.labels(operation='changes').time():
+        version = get_collection_version()
+        if since > version or since < change_log_floor():
+            # The log cannot bridge the gap; the client reloads the whole list
+            return jsonify({'version': version, 'reset': True})
+
+        cleared = False
+        last_kind = {}
+        for change_version, kind, items in changes_since(since):
+            if change_version > version:
+                break
+            if kind == 'cleared':
+                # Nothing from before the clear survives it
+                cleared = True
+                last_kind = {}
+            for item in items:
+                last_kind[item['id']] = kind
+        deleted = sorted(clipping_id for clipping_id, kind in last_kind.items() if kind == 'deleted')
+        changed_ids = [clipping_id for clipping_id, kind in last_kind.items() if kind != 'deleted']
+        upserted = []
+        if changed_ids:
+            upserted = Clipping.query.filter(Clipping.id.in_(changed_ids)).order_by(Clipping.order, Clipping.id).all()
+
+    return jsonify({
+        'version': version,
+        'reset': False,
+        'cleared': cleared,
+        'upserted': [c.to_dict() for c in upserted],
+        'deleted': deleted
+    })
+
+# How long one change stream stays open. A sync worker cannot be held for it,
+# so there the stream sends what has changed and closes; the browser
+# reconnects after SSE_RETRY_MS. Threaded workers hold it open and push
+# changes as they are committed.
+SSE_HOLD_SECONDS = float(os.getenv('SSE_HOLD_SECONDS', '25' if os.getenv('GUNICORN_PROFILE') == 'io' else '0'))
+SSE_RETRY_MS = int(os.getenv('SSE_RETRY_MS', '3000'))
+SSE_POLL_SECONDS = 1
+SSE_HEARTBEAT_SECONDS = 15
+# Streams a worker holds open at once; gunicorn_config adds this many threads
+# on top of the request threads. Streams over the cap answer like a sync
+# worker's (send what changed and close), so pages poll instead of starving
+# scrapes of threads.
+SSE_MAX_STREAMS = int(os.getenv('SSE_MAX_STREAMS', '8'))
+_held_streams = threading.BoundedSemaphore(SSE_MAX_STREAMS)
+
+def sse_message(event=None, event_id=None, data=None):
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    if event:
+        lines.append(f'event: {event}')
+    if data is not None:
+        lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+@app.route('/api/clippings/stream')
+def stream_clippings():
+    # EventSource resends the last id it saw when it reconnects. Event ids are
+    # "<desk>:<version>", since versions from different desks are unrelated;
+    # ?since= from X-Collection-Version is a bare version of the current desk.
+    desk = g.get('desk') or ''
+    since = request.headers.get('Last-Event-ID') or request.args.get('since')
+    since_desk = desk
+    if since and ':' in since:
+        since_desk, since = since.rsplit(':', 1)
+    try:
+        since = int(since) if since not in (None, '') else None
+    except ValueError:
+        return jsonify({'error': 'since must be an integer version'}), 400
+
+    def event_id(version):
+        return f'{desk}:{version}'
+
+    def generate():
+        last = since
+        current = get_collection_version()
+        yield f'retry: {SSE_RETRY_MS}\n\n'
+        if last is None:
+            # No position yet: start from now
+            last = current
+            yield sse_message(event_id=event_id(last))
+        elif since_desk != desk or last > current or last < change_log_floor():
+            # Another desk's version, one this database never had, or one older
+            # than the change log goes back; the client must reload
+            last = current
+            yield sse_message('reset', event_id(last), {'version': last})
+        held = SSE_HOLD_SECONDS > 0 and _held_streams.acquire(blocking=False)
+        expires = time.monotonic() + (SSE_HOLD_SECONDS if held else 0)
+        next_heartbeat = time.monotonic() + SSE_HEARTBEAT_SECONDS
+        try:
+            while True:
+                current = get_collection_version()
+                if current > last:
+                    for version, kind, items in changes_since(last):
+                        if version <= current:
+                            yield sse_message(kind, event_id(version), {'version': version, 'items': items})
+                    last = current
+                # Hand the connection back to the pool between polls
+                db.session.close()
+                now = time.monotonic()
+                if now >= expires:
+                    return
+                if now >= next_heartbeat:
+                    next_heartbeat = now + SSE_HEARTBEAT_SECONDS
+                    yield ': keep-alive\n\n'
+                time.sleep(SSE_POLL_SECONDS)
+        finally:
+            if held:
+                _held_streams.release()
+
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['X-Accel-Buffering'] = 'no'
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['Vary'] = DESK_VARY
+    return response
+
 @app.route('/api/clippings/<int:clipping_id>', methods=['PUT', 'DELETE'])
 def handle_clipping(clipping_id):
     clipping = Clipping.query.get_or_404(clipping_id)
     
     if request.method == 'DELETE':
-        db.session.delete(clipping)
-        db.session.commit()
+        with metrics.DB_OPERATION_DURATION.labels(operation='delete').time():
+            db.session.delete(clipping)
+            record_changes('deleted', [{'id': clipping_id}])
+            db.session.commit()
         return '', 204
     elif request.method == 'PUT':
         data = request.json
-        for key, value in data.items():
-            setattr(clipping, key, value)
-        db.session.commit()
+        with metrics.DB_OPERATION_DURATION.labels(operation='update').time():
+            for key, value in data.items():
+                setattr(clipping, key, value)
+            if 'headline' in data or 'content' in data:
+                index_near_duplicates([clipping])
+            record_changes('updated', [clipping.to_dict()])
+            db.session.commit()
         return jsonify(clipping.to_dict())
 
+def timed_export(export_format, generator, clippings):
+    """Run an export generator, recording its duration and failures"""
+    try:
+        with metrics.EXPORT_DURATION.labels(format=export_format).time():
+            return generator(clippings)
+    except Exception:
+        metrics.EXPORT_FAILURES.labels(format=export_format).inc()
+        raise
+
 @app.route('/api/export/pdf')
+@profiling.profiled('export_pdf')
 def export_pdf():
-    clippings = Clipping.query.order_by(Clipping.order).all()
-    pdf_path = generate_pdf(clippings)
+    with metrics.DB_OPERATION_DURATION.labels(operation='export_query').time():
+        clippings = Clipping.query.order_by(Clipping.order).all()
+    pdf_path = timed_export('pdf', generate_pdf, clippings)
     
     return send_file(
         pdf_path,
@@ -1370,9 +3120,11 @@ def export_pdf():
     )
 
 @app.route('/api/export/docx')
+@profiling.profiled('export_docx')
 def export_docx():
-    clippings = Clipping.query.order_by(Clipping.order).all()
-    docx_path = generate_docx(clippings)
+    with metrics.DB_OPERATION_DURATION.labels(operation='export_query').time():
+        clippings = Clipping.query.order_by(Clipping.order).all()
+    docx_path = timed_export('docx', generate_docx, clippings)
     
     return send_file(
         docx_path,
@@ -1384,18 +3136,60 @@ def export_docx():
 @app.route('/api/clippings/delete-all', methods=['DELETE'])
 def delete_all_clippings():
     try:
-        Clipping.query.delete()
-        db.session.commit()
+        with metrics.DB_OPERATION_DURATION.labels(operation='delete_all').time():
+            Clipping.query.delete()
+            record_changes('cleared', [])
+            db.session.commit()
         return '', 204
     except Exception as e:
         logging.error(f"Error deleting all clippings: {str(e)}")
         return jsonify({'error': str(e)}), 500
 
+def require_admin_token():
+    """Return an error response unless the request carries ADMIN_TOKEN"""
+    admin_token = os.getenv('ADMIN_TOKEN')
+    if not admin_token:
+        return jsonify({'error': 'Admin endpoints are disabled; set ADMIN_TOKEN'}), 403
+    if request.headers.get('X-Admin-Token') != admin_token:
+        return jsonify({'error': 'Invalid admin token'}), 403
+    return None
+
+@app.route('/admin/profile', methods=['GET', 'POST'])
+def admin_profile():
+    error = require_admin_token()
+    if error:
+        return error
+
+    if request.method == 'POST':
+        data = request.get_json(silent=True) or {}
+        try:
+            requests_to_profile = int(data.get('requests', 1))
+        except (TypeError, ValueError):
+            return jsonify({'error': 'requests must be an integer'}), 400
+        profiling.arm(requests_to_profile)
+
+    return jsonify({
+        'armed_requests': profiling.armed_remaining(),
+        'slow_request_seconds': profiling.SLOW_REQUEST_SECONDS,
+        'profile_dir': profiling.PROFILE_DIR,
+        'profiles': profiling.list_profiles()
+    })
+
+@app.route('/api/circuit-breakers')
+def circuit_breaker_states():
+    return jsonify(circuit_breaker.get_states())
+
+@app.route('/metrics')
+def metrics_endpoint():
+    body, content_type = metrics.render_metrics()
+    return body, 200, {'Content-Type': content_type}
+
 @app.route('/health')
 def health_check():
     return jsonify({
         'status': 'healthy',
-        'timestamp': datetime.now().isoformat()
+        'timestamp': datetime.now().isoformat(),
+        'browser_tabs': browser_tab_pool.stats()
     })
 
 if __name__ == '__main__':
@@ -0,0 +1,47 @@
+"""Time POST /api/clippings/bulk against one POST /api/clippings per item.
+
+Each batch size is inserted both ways into a fresh SQLite file through the
+Flask test client, with --content characters of body text per item (near
+duplicate signing and the search index triggers included, as in the app).
+Run from the repository root:
+
+    python benchmarks/bulk_insert.py [--sizes 10,100,1000] [--content 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default='10,100,1000')
+    parser.add_argument('--content', type=int, default=500)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='bulk-bench-'), 'clippings.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    import app
+
+    client = app.app.test_client()
+    for size in [int(s) for s in args.sizes.split(',')]:
+        items = [
+            {'headline': f'Headline {i}', 'source': 'Bench', 'category': 'News', 'content': (f'word{i} ' * args.content)[:args.content]}
+            for i in range(size)
+        ]
+        start = time.perf_counter()
+        response = client.post('/api/clippings/bulk', json=items)
+        bulk = time.perf_counter() - start
+        assert response.status_code == 201 and len(response.get_json()) == size, response.get_data(as_text=True)
+
+        start = time.perf_counter()
+        for item in items:
+            client.post('/api/clippings', json=item)
+        single = time.perf_counter() - start
+        print(f'{size:6d} items: bulk {bulk * 1000:8.0f} ms, one POST per item {single * 1000:9.0f} ms')
+
+if __name__ == '__main__':
+    main()
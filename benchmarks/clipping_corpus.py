@@ -0,0 +1,44 @@
+"""Synthetic clippings for the search and near-duplicate benchmarks.
+
+Headlines of 6-14 words and bodies of 150-450 words are drawn from a
+Zipf-like vocabulary of about 34,000 made-up words. The vocabulary is led
+by twenty common news words, so some terms match nearly every row and
+others only a handful, as in a real archive. Seeded, so every run builds
+the same corpus.
+"""
+import random
+
+SEED = 7
+SYLLABLES = ['ka', 'mo', 'ri', 'ten', 'sa', 'lo', 'pre', 'dent', 'ma', 'zu', 'ne', 'tor', 'vi', 'ga', 'pol', 'ic', 'da', 'ber', 'an', 'cou']
+NEWS_WORDS = ['president', 'minister', 'parliament', 'election', 'budget', 'court', 'police', 'economy', 'water', 'electricity',
+              'eskom', 'ramaphosa', 'pretoria', 'africa', 'trade', 'health', 'school', 'strike', 'rand', 'mining']
+SOURCES = ['Daily Maverick', 'News24', 'Mail & Guardian', 'Business Day', 'Sowetan', 'The Citizen', 'Beeld', 'City Press']
+CATEGORIES = ['Politics', 'Economy', 'Cartoon', 'World']
+
+INSERT = 'INSERT INTO clipping(headline, source, category, content, url, date, "order") VALUES (?, ?, ?, ?, ?, ?, ?)'
+
+class Corpus:
+    def __init__(self, seed=SEED):
+        self.random = random.Random(seed)
+        made_up = sorted({
+            ''.join(self.random.choice(SYLLABLES) for _ in range(self.random.randint(1, 4)))
+            for _ in range(40000)
+        })
+        self.vocabulary = NEWS_WORDS + made_up
+        self.weights = [1 / (rank + 1) ** 1.05 for rank in range(len(self.vocabulary))]
+
+    def text(self, words):
+        return ' '.join(self.random.choices(self.vocabulary, self.weights, k=words))
+
+    def rows(self, count):
+        """Clipping rows in INSERT's column order"""
+        for i in range(count):
+            yield (
+                self.text(self.random.randint(6, 14)).title(),
+                self.random.choice(SOURCES),
+                self.random.choice(CATEGORIES),
+                self.text(self.random.randint(150, 450)),
+                f'https://example.co.za/{i}',
+                '2026-10-01 00:00:00',
+                i
+            )
@@ -0,0 +1,100 @@
+"""Time the steps before a browser scrape gets its first Chrome.
+
+Always measured, in a scratch directory so the real drivers/ is untouched:
+local chromedriver resolution (env var, drivers/, PATH, system directories
+and the webdriver_manager cache), the cached-path lookup, the first copy of
+chromedriver to drivers/patched/ and its reuse. Without an installed
+chromedriver a stub executable stands in, which is enough for these steps.
+
+--wdm also times webdriver_manager's lookup, a network round trip.
+--chrome times launch_chrome end to end with a real Chrome: the first launch
+(new patched copy, new profile), a second launch reusing both, and
+undetected_chromedriver's own download-and-patch with a throwaway profile,
+as every launch did before. Run from the repository root:
+
+    python benchmarks/driver_startup.py [--runs 20] [--wdm] [--chrome]
+"""
+import argparse
+import os
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def timed(func, runs=1):
+    """Median milliseconds of func over runs, and its last result"""
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times), result
+
+def chrome_options(uc):
+    options = uc.ChromeOptions()
+    for flag in ('--headless', '--no-sandbox', '--disable-dev-shm-usage'):
+        options.add_argument(flag)
+    options.page_load_strategy = 'none'
+    return options
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=20)
+    parser.add_argument('--wdm', action='store_true', help="also time webdriver_manager's lookup")
+    parser.add_argument('--chrome', action='store_true', help='time real Chrome launches')
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='driver-bench-')
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(workdir, 'clippings.db')
+    os.environ['PATCHED_CHROMEDRIVER_DIR'] = os.path.join(workdir, 'drivers', 'patched')
+    os.environ['BROWSER_PROFILE_DIR'] = os.path.join(workdir, 'drivers', 'profiles')
+    if not args.chrome and not shutil.which('chromedriver') and not os.getenv('CHROMEDRIVER_PATH'):
+        stub = os.path.join(workdir, 'chromedriver')
+        with open(stub, 'w') as f:
+            f.write('#!/bin/sh\nexit 0\n')
+        os.chmod(stub, 0o755)
+        os.environ['CHROMEDRIVER_PATH'] = stub
+        print(f'no chromedriver installed, using a stub at {stub}')
+    os.chdir(workdir)
+    import app
+
+    took, path = timed(lambda: app.find_local_driver('chrome'), args.runs)
+    print(f'local resolution:        {took:8.2f} ms  {path}')
+    app.get_cached_driver_path('chrome')
+    took, _ = timed(lambda: app.get_cached_driver_path('chrome'), args.runs)
+    print(f'cached path lookup:      {took:8.3f} ms')
+    took, patched = timed(app.get_patched_chromedriver)
+    print(f'first patched copy:      {took:8.2f} ms  {patched}')
+    took, _ = timed(app.get_patched_chromedriver, args.runs)
+    print(f'patched copy reused:     {took:8.3f} ms')
+
+    if args.wdm:
+        from webdriver_manager.chrome import ChromeDriverManager
+        start = time.perf_counter()
+        try:
+            ChromeDriverManager().install()
+            print(f'webdriver_manager:       {(time.perf_counter() - start) * 1000:8.0f} ms')
+        except Exception as e:
+            print(f'webdriver_manager failed after {(time.perf_counter() - start) * 1000:.0f} ms: {type(e).__name__}: {e}')
+
+    if args.chrome:
+        import undetected_chromedriver as uc
+        shutil.rmtree(os.environ['PATCHED_CHROMEDRIVER_DIR'], ignore_errors=True)
+        for label in ('first launch_chrome', 'second launch_chrome'):
+            start = time.perf_counter()
+            driver = app.launch_chrome(chrome_options(uc))
+            print(f'{label + ":":24s} {(time.perf_counter() - start) * 1000:8.0f} ms')
+            driver.quit()
+        profile = tempfile.mkdtemp(prefix='driver-bench-profile-')
+        start = time.perf_counter()
+        driver = uc.Chrome(options=chrome_options(uc), user_data_dir=profile)
+        print(f'uc download and patch:   {(time.perf_counter() - start) * 1000:8.0f} ms')
+        driver.quit()
+        shutil.rmtree(profile, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
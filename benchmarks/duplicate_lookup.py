@@ -0,0 +1,107 @@
+"""Time near-duplicate signing, backfill and lookup on a large synthetic archive.
+
+Loads --rows clippings (see clipping_corpus.py) into a fresh database and
+signs them with the start-up backfill. It then looks up edited copies of
+random clippings (headline changed, 10% of the words replaced), compares
+that with a pairwise scan of every signature, and times grouping the whole
+list. Finally it compares the MinHash estimate with the exact Jaccard
+similarity of the shingle sets; with 64 slots its standard error is
+sqrt(J(1 - J) / 64), at most 0.0625. Run from the repository root:
+
+    python benchmarks/duplicate_lookup.py [--rows 100000] [--lookups 200]
+"""
+import argparse
+import os
+import random
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from clipping_corpus import INSERT, Corpus  # noqa: E402
+
+def edited(text, rng, share=0.1):
+    words = text.split()
+    for i in rng.sample(range(len(words)), int(len(words) * share)):
+        words[i] = 'edited'
+    return ' '.join(words)
+
+def percentile(values, share):
+    return sorted(values)[max(0, int(len(values) * share) - 1)]
+
+def estimate_errors(near_duplicates, corpus, rng, pairs=1000):
+    """Gap between estimated and exact similarity for random pairs, grouped by exact similarity in steps of 0.2"""
+    errors = {}
+    for _ in range(pairs):
+        words = corpus.text(400).split()
+        keep = rng.random()
+        other = [word if rng.random() < keep else corpus.text(1) for word in words]
+        a, b = ' '.join(words), ' '.join(other)
+        shingles_a, shingles_b = near_duplicates.shingles(a), near_duplicates.shingles(b)
+        exact = len(shingles_a & shingles_b) / len(shingles_a | shingles_b)
+        estimate = near_duplicates.similarity(near_duplicates.signature(a), near_duplicates.signature(b))
+        errors.setdefault(min(int(exact * 5), 4) / 5, []).append(abs(estimate - exact))
+    return errors
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    path = os.path.join(tempfile.mkdtemp(prefix='duplicate-bench-'), 'clippings.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{path}'
+    import app
+    import near_duplicates
+
+    raw = sqlite3.connect(path)
+    # The search index's insert cost is measured by search.py; leave it out of the load
+    raw.execute('DROP TRIGGER clipping_search_insert')
+    raw.executemany(INSERT, Corpus().rows(args.rows))
+    raw.commit()
+
+    with app.app.app_context():
+        start = time.time()
+        app.create_duplicate_index(app.db.engine)
+        took = time.time() - start
+        print(f'backfill of {args.rows} clippings: {took:.1f} s ({took / args.rows * 1000:.2f} ms each)')
+
+        rng = random.Random(3)
+        rows = raw.execute('SELECT id, headline, content FROM clipping ORDER BY random() LIMIT ?', (args.lookups,)).fetchall()
+        found = 0
+        times = []
+        for clipping_id, headline, content in rows:
+            headline, content = 'Late: ' + headline, edited(content, rng)
+            start = time.perf_counter()
+            twins = app.find_near_duplicates(headline, content)
+            times.append((time.perf_counter() - start) * 1000)
+            found += any(twin['id'] == clipping_id for twin in twins)
+        print(f'lookup of an edited copy: original found {found}/{len(rows)}, '
+              f'median {statistics.median(times):.2f} ms, p95 {percentile(times, 0.95):.2f} ms')
+
+        text = app.duplicate_text(headline, content)
+        start = time.perf_counter()
+        for _ in range(200):
+            sig = near_duplicates.signature(text)
+        print(f'signing a {len(text.split())}-word article: {(time.perf_counter() - start) / 200 * 1000:.3f} ms')
+
+        start = time.perf_counter()
+        signatures = raw.execute('SELECT clipping_id, signature FROM clipping_signature').fetchall()
+        max(signatures, key=lambda row: near_duplicates.similarity(sig, near_duplicates.unpack(row[1])))
+        print(f'pairwise scan of {len(signatures)} signatures for one lookup: {(time.perf_counter() - start) * 1000:.0f} ms')
+
+        start = time.perf_counter()
+        groups = app.app.test_client().get('/api/clippings/duplicates').get_json()['groups']
+        print(f'grouping the whole list: {(time.perf_counter() - start) * 1000:.0f} ms, {len(groups)} groups')
+
+    errors = estimate_errors(near_duplicates, Corpus(seed=11), random.Random(5))
+    print('estimate error by exact similarity (mean / p95 / max):')
+    for band, gaps in sorted(errors.items()):
+        print(f'  {band:.1f}-{band + 0.2:.1f}: {statistics.mean(gaps):.3f} / {percentile(gaps, 0.95):.3f} / {max(gaps):.3f} over {len(gaps)} pairs')
+
+if __name__ == '__main__':
+    main()
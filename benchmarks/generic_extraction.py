@@ -0,0 +1,78 @@
+"""Time generic-page extraction and check what it finds.
+
+Compares the readability title lookup that generic pages used before with
+extract_article in full and fast mode, on the pages in fixtures/generic
+(see make_generic_fixtures.py). Run from the repository root:
+
+    python benchmarks/generic_extraction.py [--rounds 20]
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import warnings
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from readability import Document  # noqa: E402
+
+from app import extract_article  # noqa: E402
+
+FIXTURES = os.path.join(HERE, 'fixtures', 'generic')
+
+def load_pages():
+    with open(os.path.join(FIXTURES, 'expected.json')) as f:
+        expected = json.load(f)
+    pages = []
+    for entry in expected:
+        with open(os.path.join(FIXTURES, entry['file'])) as f:
+            pages.append((entry, f.read()))
+    return pages
+
+def readability_title(html):
+    # As the old code did: title() twice, no paragraphs
+    doc = Document(html)
+    return {'headline': doc.title() if doc.title() else '', 'paragraphs': []}
+
+def article(fast):
+    return lambda html: extract_article(html, 'https://example.co.za/a', fast=fast)[1]
+
+def site_suffix_removed(headline):
+    for sep in (' | ', ' - '):
+        if sep in headline:
+            headline = headline.rsplit(sep, 1)[0]
+    return headline.strip()
+
+def score(extract, pages):
+    headlines = paragraphs = 0
+    for entry, html in pages:
+        result = extract(html)
+        headlines += site_suffix_removed(result['headline']) == entry['headline']
+        paragraphs += sum(1 for got, want in zip(result['paragraphs'], entry['paragraphs']) if got == want)
+    return headlines, paragraphs
+
+def ms_per_page(extract, pages, rounds):
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for _, html in pages:
+            extract(html)
+    return (time.perf_counter() - start) / (rounds * len(pages)) * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rounds', type=int, default=20)
+    args = parser.parse_args()
+    warnings.simplefilter('ignore')
+    pages = load_pages()
+    for name, extract in [('readability title', readability_title),
+                          ('extract_article full', article(False)),
+                          ('extract_article fast', article(True))]:
+        extract(pages[0][1])
+        headlines, paragraphs = score(extract, pages)
+        print(f"{name:22s} {ms_per_page(extract, pages, args.rounds):7.2f} ms/page  "
+              f"headlines {headlines}/{len(pages)}  paragraphs {paragraphs:2d}/{2 * len(pages)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+"""Compare a full page fetch with headline_stream.fetch_headline.
+
+A local server sends four ~900 KB pages at about 20 MB/s: og:title in the
+head, a JSON-LD @graph headline, a bare <title>, and a page with no </head>
+at all. The full fetch is the old requests.get + BeautifulSoup path.
+Run from the repository root:
+
+    python benchmarks/headline_stream.py [--runs 5]
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests  # noqa: E402
+from bs4 import BeautifulSoup  # noqa: E402
+
+import headline_stream  # noqa: E402
+
+HEAD = '<meta charset="utf-8"><script>' + 'var a=1;' * 3000 + '</script>'
+GRAPH = json.dumps({'@graph': [{'@type': 'WebPage'}, {'@type': 'NewsArticle', 'headline': 'Ëskom &amp; load shedding'}]})
+PAGES = {
+    '/og': (f'<html><head>{HEAD}<meta property="og:title" content="Rand firms as Minister speaks | Site"><title>T</title></head>'
+            '<body><script>' + 'x=1;' * 200000 + '</script><p>body</p></body></html>'),
+    '/ld': (f'<html><head><title>Fallback title</title>{HEAD}<script type="application/ld+json">{GRAPH}</script></head>'
+            '<body>' + 'y' * 900000 + '</body></html>'),
+    '/title': f'<html><head><title>Plain title only</title>{HEAD}</head><body>' + 'z' * 900000 + '</body></html>',
+    '/nohead': '<html>' + '<div>' * 10 + 'q' * 900000 + '<title>late</title></html>',
+}
+CHUNK = 65536
+CHUNK_DELAY = 0.003
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):
+        body = PAGES[self.path].encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        try:
+            for i in range(0, len(body), CHUNK):
+                self.wfile.write(body[i:i + CHUNK])
+                time.sleep(CHUNK_DELAY)
+        except (BrokenPipeError, ConnectionResetError):
+            # fetch_headline hangs up once it has what it needs
+            pass
+
+    def log_message(self, *args):
+        pass
+
+def full_fetch(url):
+    response = requests.get(url, timeout=10)
+    soup = BeautifulSoup(response.text, 'lxml')
+    tag = soup.find('meta', attrs={'property': 'og:title'})
+    headline = tag['content'] if tag else (soup.title.string if soup.title else '')
+    return headline, len(response.content)
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    args = parser.parse_args()
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f'http://127.0.0.1:{server.server_address[1]}'
+    print(f"{'page':8s} {'full fetch':>17s}   {'streamed':>15s}")
+    try:
+        for path in PAGES:
+            full_times, stream_times = [], []
+            for _ in range(args.runs):
+                start = time.perf_counter()
+                _, full_bytes = full_fetch(base + path)
+                full_times.append(time.perf_counter() - start)
+                start = time.perf_counter()
+                headline, source, stream_bytes = headline_stream.fetch_headline(base + path)
+                stream_times.append(time.perf_counter() - start)
+            print(f"{path:8s} {full_bytes / 1024:5.0f} KB {statistics.median(full_times) * 1000:5.0f} ms   "
+                  f"{stream_bytes / 1024:4.0f} KB {statistics.median(stream_times) * 1000:4.0f} ms  {source}: {headline!r}")
+    finally:
+        server.shutdown()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+"""Write the news pages that generic_extraction.py reads.
+
+Six pages of 11-66 KB, one per layout: an article tag, a div layout,
+itemprop="articleBody", a page padded with adverts, a paywall teaser and
+JSON-LD metadata. expected.json holds each page's headline and first two
+paragraphs. The output is deterministic; the committed fixtures were
+written by this script.
+"""
+import json
+import os
+import random
+
+OUT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures', 'generic')
+
+random.seed(1)
+words = ("government minister economy energy climate agriculture parliament policy budget reform "
+         "election trade export growth inflation rand investment").split()
+
+def para(n=40):
+    return ' '.join(random.choice(words) for _ in range(n)).capitalize() + '.'
+
+def nav(n=60):
+    return '<nav><ul>' + ''.join(f'<li><a href="/s/{i}">Section {i} {random.choice(words)}</a></li>' for i in range(n)) + '</ul></nav>'
+
+def related(n=20):
+    return '<aside class="related">' + ''.join(
+        f'<div class="teaser"><a href="/a/{i}"><p>Related story about {random.choice(words)} {random.choice(words)}</p></a></div>'
+        for i in range(n)
+    ) + '</aside>'
+
+def comments(n=40):
+    return '<section id="comments">' + ''.join(f'<div class="comment"><p>{para(25)}</p></div>' for i in range(n)) + '</section>'
+
+def main():
+    os.makedirs(OUT, exist_ok=True)
+    fixtures = []
+    for i in range(6):
+        h = f"Minister announces {random.choice(words)} {random.choice(words)} plan for {2025 + i}"
+        ps = [para() for _ in range(6)]
+        body_ps = ''.join(f'<p>{p}</p>' for p in ps)
+        head_common = '<meta charset="utf-8"><script>' + 'var x=1;' * 200 + '</script><style>' + '.a{color:red}' * 200 + '</style>'
+        if i == 0:
+            html = (f'<html><head><title>{h} | Daily Maverick</title><meta property="og:title" content="{h}">'
+                    f'<meta name="author" content="Jane Dlamini"><meta property="article:published_time" content="2025-03-0{i + 1}T08:00:00Z">'
+                    f'{head_common}</head><body>{nav()}<article><h1>{h}</h1><figure><img src="a.jpg"><figcaption>Photo: file</figcaption></figure>'
+                    f'<p class="byline">By Jane Dlamini</p>{body_ps}</article>{related()}{comments()}</body></html>')
+        elif i == 1:
+            html = (f'<html><head><title>{h} - Businesstech</title><meta name="author" content="Sipho Nkosi">{head_common}</head>'
+                    f'<body>{nav()}<div id="main"><div class="story"><h1>{h}</h1><div class="meta">Sipho Nkosi, 4 March 2025</div>'
+                    f'<div class="text">{body_ps}</div></div></div>{related()}<footer>{nav(30)}</footer></body></html>')
+        elif i == 2:
+            html = (f'<html><head><title>{h} | IOL</title>{head_common}</head><body>{nav()}<main><h1>{h}</h1>'
+                    f'<div itemprop="articleBody"><meta itemprop="datePublished" content="2025-03-05"><p>Short.</p>{body_ps}</div></main>'
+                    f'{comments(80)}</body></html>')
+        elif i == 3:
+            big = ''.join(f'<div class="ad"><p>Advertisement {k} {para(10)}</p></div>' for k in range(150))
+            html = (f'<html><head><title>{h}</title><meta property="og:title" content="{h}"><meta name="twitter:title" content="{h}">'
+                    f'{head_common}</head><body>{nav(200)}{big}<article><header><h1>{h}</h1><a rel="author" href="/a">Thabo Mokoena</a>'
+                    f'<time datetime="2025-03-06T10:00">6 March</time></header>{body_ps}</article>{related(60)}{comments(100)}</body></html>')
+        elif i == 4:
+            leak = ''.join(f'<p>{p}</p>' for p in ps[1:])
+            html = (f'<html><head><title>{h} | Sunday Times</title><meta property="og:title" content="{h}">{head_common}</head>'
+                    f'<body>{nav()}<article><h1>{h}</h1><p>{ps[0]}</p><div class="paywall">Subscribe to read more</div></article>'
+                    f'<div class="leak">{leak}</div>{related()}</body></html>')
+        else:
+            ld = json.dumps({"@type": "NewsArticle", "headline": h, "author": {"@type": "Person", "name": "Lerato Khumalo"}, "datePublished": "2025-03-08"})
+            html = (f'<html><head><title>{h} | Mail &amp; Guardian</title><script type="application/ld+json">{ld}</script>{head_common}</head>'
+                    f'<body>{nav()}<div class="content"><h1 class="entry-title">{h}</h1><div class="entry-content">{body_ps}</div></div>'
+                    f'{related()}{comments(30)}</body></html>')
+        fixtures.append({'file': f'f{i}.html', 'headline': h, 'paragraphs': ps[:2]})
+        with open(os.path.join(OUT, f'f{i}.html'), 'w') as f:
+            f.write(html)
+    with open(os.path.join(OUT, 'expected.json'), 'w') as f:
+        json.dump(fixtures, f)
+
+if __name__ == '__main__':
+    main()
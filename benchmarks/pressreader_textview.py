@@ -0,0 +1,95 @@
+"""Time and size the PressReader text view fetch over plain HTTP.
+
+A local server stands in for www.pressreader.com as an HTTP proxy and
+answers with the recorded text view in tests/fixtures/pressreader, after
+--latency seconds. fetch_pressreader_http is timed over --runs fetches,
+with the peak Python allocation (tracemalloc) and the process RSS before
+and after; the lxml extraction is also timed on its own. The browser path
+it replaces needs Chrome and is not timed here. Run from the repository root:
+
+    python benchmarks/pressreader_textview.py [--runs 200] [--latency 0]
+"""
+import argparse
+import http.server
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from urllib.parse import urlsplit
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+FIXTURE = os.path.join(ROOT, 'tests', 'fixtures', 'pressreader', 'textview.html')
+ARTICLE_URL = 'http://www.pressreader.com/south-africa/the-star-early-edition/20240115/article/281500000000001'
+
+def serve_pressreader(latency):
+    with open(FIXTURE, 'rb') as f:
+        page = f.read()
+
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            if '/textview/' not in urlsplit(self.path).path:
+                self.send_response(404)
+                self.end_headers()
+                return
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(page)))
+            self.end_headers()
+            self.wfile.write(page)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=200)
+    parser.add_argument('--latency', type=float, default=0.0, help='seconds the stand-in server waits per page')
+    args = parser.parse_args()
+
+    os.environ['HTTP_PROXY'] = serve_pressreader(args.latency)
+    os.environ.pop('NO_PROXY', None)
+    os.environ.pop('no_proxy', None)
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='textview-bench-'), 'clippings.db')
+    import app
+
+    publication = app.get_pressreader_source(ARTICLE_URL)
+    path, result = app.fetch_pressreader_http(ARTICLE_URL, publication)
+    print(f'{path}: {result["headline"]!r}, {len(result["content"])} characters of content')
+
+    process = psutil.Process()
+    rss_before = process.memory_info().rss
+    times = []
+    tracemalloc.start()
+    for _ in range(args.runs):
+        start = time.perf_counter()
+        app.fetch_pressreader_http(ARTICLE_URL, publication)
+        times.append((time.perf_counter() - start) * 1000)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    rss_after = process.memory_info().rss
+    print(f'fetch and parse over {args.runs} runs: median {statistics.median(times):.1f} ms, '
+          f'p95 {sorted(times)[int(args.runs * 0.95) - 1]:.1f} ms')
+    print(f'peak Python allocation {peak / 1024:.0f} KB, process RSS {rss_before / 2**20:.0f} -> {rss_after / 2**20:.0f} MB, '
+          f'{len(process.children(recursive=True))} child processes')
+
+    with open(FIXTURE, encoding='utf-8') as f:
+        html = f.read()
+    start = time.perf_counter()
+    for _ in range(args.runs):
+        app.extract_pressreader_markup(html)
+    print(f'lxml extraction alone: {(time.perf_counter() - start) / args.runs * 1000:.2f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Time /api/clippings/search on a large synthetic archive.
+
+Loads --rows clippings (see clipping_corpus.py) into a fresh database with
+the FTS5 index and its triggers, and the same rows into a plain table, then
+times searches end to end through the Flask test client. Each query is
+compared with a LIKE scan for its last word on the plain table.
+Run from the repository root; the default 100k rows take a few minutes:
+
+    python benchmarks/search.py [--rows 100000] [--runs 30]
+"""
+import argparse
+import os
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from clipping_corpus import INSERT, Corpus  # noqa: E402
+
+# From a word in nearly every row down to no match at all
+QUERIES = ['ramaphosa', 'eskom strike', 'pres', 'maverick budget', 'kamo', 'kamopre', '"kamopre ma"', 'zzzzqq']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--rows', type=int, default=100_000)
+    parser.add_argument('--runs', type=int, default=30)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='search-bench-')
+    indexed_path = os.path.join(workdir, 'indexed.db')
+    plain_path = os.path.join(workdir, 'plain.db')
+    os.environ['DATABASE_URL'] = f'sqlite:///{indexed_path}'
+    import app  # creates the schema, the search index and its triggers
+
+    indexed = sqlite3.connect(indexed_path)
+    start = time.time()
+    indexed.executemany(INSERT, Corpus().rows(args.rows))
+    indexed.commit()
+    print(f'insert {args.rows} rows with the index triggers: {time.time() - start:.1f} s')
+
+    plain = sqlite3.connect(plain_path)
+    plain.execute('CREATE TABLE clipping(id INTEGER PRIMARY KEY, headline, source, category, content, url, date, "order")')
+    start = time.time()
+    plain.executemany(INSERT, Corpus().rows(args.rows))
+    plain.commit()
+    print(f'insert {args.rows} rows without an index: {time.time() - start:.1f} s')
+    print(f'database size {os.path.getsize(indexed_path) // 2**20} MB, {os.path.getsize(plain_path) // 2**20} MB without the index')
+
+    client = app.app.test_client()
+    for query in QUERIES:
+        times = []
+        for _ in range(args.runs):
+            start = time.perf_counter()
+            response = client.get('/api/clippings/search', query_string={'q': query})
+            times.append((time.perf_counter() - start) * 1000)
+        results = response.get_json()['results']
+        matches = indexed.execute(
+            f'SELECT count(*) FROM {app.SEARCH_TABLE} WHERE {app.SEARCH_TABLE} MATCH ?',
+            (app.fts_query(app.parse_search(query)),)
+        ).fetchone()[0]
+        word = query.strip('"').split()[-1]
+        start = time.perf_counter()
+        plain.execute(
+            'SELECT id FROM clipping WHERE headline LIKE ? OR content LIKE ? OR source LIKE ? LIMIT 21', (f'%{word}%',) * 3
+        ).fetchall()
+        like_ms = (time.perf_counter() - start) * 1000
+        print(f'{query!r:18s} matches {matches:6d}  results {len(results):2d}  '
+              f'median {statistics.median(times):5.1f} ms  p95 {sorted(times)[int(len(times) * 0.95) - 1]:5.1f} ms  LIKE {like_ms:6.1f} ms')
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,158 @@
+"""Load-test the sync and io gunicorn profiles on scrape traffic.
+
+A local site answers every page after --latency seconds. For each profile,
+gunicorn is started with gunicorn_config.py in a scratch directory (its own
+database, logs and circuit breaker state). --requests POST /api/scrape
+calls for distinct pages on that site are then sent, --concurrency at a
+time. Throughput, latency and the peak PSS of the gunicorn process tree are
+reported. No browser is involved, so this measures the HTTP scrape path
+only. Run from the repository root with gunicorn installed (Linux):
+
+    python benchmarks/serving_profiles.py [--profiles sync,io] [--requests 48] [--concurrency 16]
+"""
+import argparse
+import http.server
+import json
+import os
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+import psutil
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PAGE = (
+    '<html><head><title>Load test story | Site</title></head><body><article><h1>Load test story</h1>'
+    + ('<p>' + 'Paragraph text that is long enough to count as article content here. ' * 3 + '</p>') * 5
+    + '</article></body></html>'
+).encode()
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+def serve_slow_site(latency):
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            time.sleep(latency)
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.send_header('Content-Length', str(len(PAGE)))
+            self.end_headers()
+            self.wfile.write(PAGE)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}'
+
+def wait_for(url, timeout=60):
+    until = time.time() + timeout
+    while time.time() < until:
+        try:
+            urllib.request.urlopen(url, timeout=2).close()
+            return
+        except urllib.error.HTTPError:
+            # Up, though unhealthy (no browser here, say)
+            return
+        except OSError:
+            time.sleep(0.5)
+    raise RuntimeError(f'{url} did not come up within {timeout} s')
+
+def tree_pss_mb(root):
+    total = 0
+    for process in [root] + root.children(recursive=True):
+        try:
+            total += process.memory_full_info().pss
+        except psutil.Error:
+            pass
+    return total / 2**20
+
+def load(base_url, site, args, server):
+    def scrape(i):
+        request = urllib.request.Request(
+            f'{base_url}/api/scrape',
+            data=json.dumps({'url': f'{site}/story/{i}-{time.time()}'}).encode(),
+            headers={'Content-Type': 'application/json'}
+        )
+        start = time.time()
+        with urllib.request.urlopen(request, timeout=120) as response:
+            body = json.load(response)
+        return time.time() - start, bool(body.get('headline'))
+
+    scrape(-1)  # the first request in a worker imports and warms up lazily loaded code
+    peak = [tree_pss_mb(server)]
+    stop = threading.Event()
+
+    def watch():
+        while not stop.wait(0.5):
+            peak[0] = max(peak[0], tree_pss_mb(server))
+
+    threading.Thread(target=watch, daemon=True).start()
+    start = time.time()
+    with ThreadPoolExecutor(args.concurrency) as executor:
+        results = list(executor.map(scrape, range(args.requests)))
+    took = time.time() - start
+    stop.set()
+    latencies = sorted(latency for latency, _ in results)
+    return {
+        'rate': len(results) / took,
+        'p50': latencies[len(latencies) // 2],
+        'p95': latencies[int(len(latencies) * 0.95) - 1],
+        'ok': sum(ok for _, ok in results),
+        'processes': 1 + len(server.children(recursive=True)),
+        'pss': peak[0],
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--profiles', default='sync,io')
+    parser.add_argument('--requests', type=int, default=48)
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--latency', type=float, default=1.0, help='seconds the local site takes per page')
+    args = parser.parse_args()
+
+    site = serve_slow_site(args.latency)
+    print(f'{psutil.cpu_count()} CPU, {psutil.virtual_memory().total / 2**30:.1f} GB RAM; '
+          f'{args.requests} scrapes, {args.concurrency} at a time, site latency {args.latency:.1f} s')
+    for profile in args.profiles.split(','):
+        workdir = tempfile.mkdtemp(prefix=f'serving-bench-{profile}-')
+        port = free_port()
+        env = dict(
+            os.environ,
+            GUNICORN_PROFILE=profile,
+            DATABASE_URL='sqlite:///' + os.path.join(workdir, 'clippings.db'),
+            PYTHONPATH=os.pathsep.join(filter(None, [ROOT, os.environ.get('PYTHONPATH')])),
+        )
+        env.pop('PROMETHEUS_MULTIPROC_DIR', None)
+        server = subprocess.Popen(
+            [sys.executable, '-m', 'gunicorn', '-c', os.path.join(ROOT, 'gunicorn_config.py'),
+             '-b', f'127.0.0.1:{port}', 'wsgi:app'],
+            cwd=workdir, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+        )
+        try:
+            base_url = f'http://127.0.0.1:{port}'
+            wait_for(f'{base_url}/health')
+            result = load(base_url, site, args, psutil.Process(server.pid))
+        finally:
+            server.terminate()
+            server.wait(30)
+            shutil.rmtree(workdir, ignore_errors=True)
+        print(f"{profile:5s} {result['processes']} processes: {result['rate']:6.2f} req/s, "
+              f"p50 {result['p50']:.2f} s, p95 {result['p95']:.2f} s, {result['ok']}/{args.requests} with a headline, "
+              f"peak {result['pss']:.0f} MB PSS")
+
+if __name__ == '__main__':
+    main()
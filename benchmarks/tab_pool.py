@@ -0,0 +1,261 @@
+"""Concurrent browser scrapes in leased tabs of one Chrome.
+
+By default the tab pool runs against a fake driver: every page load takes
+--load seconds, and the real News24 scrape code (with its fixed waits) runs
+in each leased tab. The fake driver checks that every element call runs in
+its own window and that at most one driver command is in flight at a time.
+This measures how much the tabs overlap, not Chrome itself.
+
+With --chrome, a real headless Chrome is started instead, and the memory of
+N leased tabs in one Chrome is compared with N separate Chromes, each on a
+local article page. Memory is the PSS of the process trees, so pages that
+Chrome processes share are not counted twice. This needs Chrome installed.
+Run from the repository root:
+
+    python benchmarks/tab_pool.py [--scrapes 8] [--tabs 1,4] [--load 1.0]
+    python benchmarks/tab_pool.py --chrome [--tabs 4]
+"""
+import argparse
+import http.server
+import itertools
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(HERE))
+
+from selenium.webdriver.remote.webelement import WebElement  # noqa: E402
+
+ARTICLE = (
+    '<html><head><title>Minister announces the new water budget | News24</title></head>'
+    '<body><article><h1 class="article__title">Minister announces the new water budget</h1>'
+    + '<p>Paragraph of the article body with enough text to lay out.</p>' * 40
+    + '</article></body></html>'
+).encode()
+
+class FakeElement(WebElement):
+    def __init__(self, driver, window):
+        self._driver, self._window = driver, window
+
+    @property
+    def text(self):
+        assert self._driver.current == self._window, 'element used from another window'
+        return f'Headline for {self._driver.urls[self._window]}'
+
+    def find_element(self, by, value):
+        return FakeElement(self._driver, self._window)
+
+    def find_elements(self, by, value):
+        return []
+
+class FakeSwitch:
+    def __init__(self, driver):
+        self._driver = driver
+
+    def window(self, handle):
+        assert handle in self._driver.windows
+        self._driver.current = handle
+
+    def new_window(self, kind):
+        handle = f'W{next(self._driver.ids)}'
+        self._driver.windows.add(handle)
+        self._driver.current = handle
+
+class FakeDriver:
+    """Answers the commands a News24 scrape sends; page loads take load_seconds"""
+    def __init__(self, load_seconds):
+        self.load_seconds = load_seconds
+        self.ids = itertools.count()
+        self.windows = {'BASE'}
+        self.current = 'BASE'
+        self.urls = {}
+        self.loaded_at = {}
+        self.markers = {}
+        self.contexts = set()
+        self.switch_to = FakeSwitch(self)
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    current_window_handle = property(lambda self: self.current)
+    window_handles = property(lambda self: list(self.windows))
+
+    def _command(self):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.005)
+        with self._lock:
+            self.in_flight -= 1
+
+    def execute_cdp_cmd(self, cmd, args):
+        self._command()
+        if cmd == 'Target.createBrowserContext':
+            context = f'C{next(self.ids)}'
+            self.contexts.add(context)
+            return {'browserContextId': context}
+        if cmd == 'Target.createTarget':
+            assert args['browserContextId'] in self.contexts
+            handle = f'T{next(self.ids)}'
+            self.windows.add(handle)
+            return {'targetId': handle}
+        if cmd == 'Target.disposeBrowserContext':
+            self.contexts.discard(args['browserContextId'])
+        return {}
+
+    def get(self, url):
+        self._command()
+        self.urls[self.current] = url
+        self.markers.pop(self.current, None)
+        self.loaded_at[self.current] = time.monotonic() + self.load_seconds
+
+    def execute_script(self, script, *args):
+        self._command()
+        if '__tabMarker = arguments[0]' in script:
+            self.markers[self.current] = args[0]
+        elif 'readyState' in script:
+            if args and self.markers.get(self.current) == args[0]:
+                return 'previous'
+            return 'complete' if time.monotonic() >= self.loaded_at.get(self.current, 0) else 'loading'
+
+    @property
+    def title(self):
+        self._command()
+        return f'{self.urls[self.current]} | News24'
+
+    @property
+    def page_source(self):
+        self._command()
+        return ARTICLE.decode()
+
+    def find_element(self, by, value):
+        self._command()
+        return FakeElement(self, self.current)
+
+    def find_elements(self, by, value):
+        self._command()
+        return [FakeElement(self, self.current)]
+
+    def close(self):
+        self._command()
+        self.windows.discard(self.current)
+
+def fake_throughput(app, browser_tabs, args):
+    for tabs in [int(t) for t in args.tabs.split(',')]:
+        driver = FakeDriver(args.load)
+        pool = browser_tabs.TabPool(lambda: driver, tabs)
+
+        def scrape(i):
+            url = f'https://www.news24.com/news24/bench/story-{i}'
+            with pool.lease() as tab:
+                return app.news24_tab_scrape(tab, url, None)
+
+        start = time.time()
+        with ThreadPoolExecutor(args.scrapes) as executor:
+            results = list(executor.map(scrape, range(args.scrapes)))
+        took = time.time() - start
+        assert all(result[1]['headline'] for result in results), results
+        assert driver.windows == {'BASE'} and not driver.contexts, 'tabs or contexts left open'
+        print(f'{args.scrapes} News24 browser scrapes, {tabs} tab(s): {took:5.1f} s '
+              f'(at most {driver.max_in_flight} driver command in flight)')
+
+def serve_article():
+    class Handler(http.server.BaseHTTPRequestHandler):
+        def do_GET(self):
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/html; charset=utf-8')
+            self.end_headers()
+            self.wfile.write(ARTICLE)
+
+        def log_message(self, *args):
+            pass
+
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return f'http://127.0.0.1:{server.server_port}/article'
+
+def tree_pss_mb(browser_watchdog, drivers):
+    total = 0
+    for driver in drivers:
+        for process in browser_watchdog.tree_processes(browser_watchdog.driver_root_pids(driver)):
+            try:
+                total += process.memory_full_info().pss
+            except Exception:
+                pass
+    return total / 2**20
+
+def chrome_memory(app, browser_watchdog, args):
+    import undetected_chromedriver as uc
+
+    tabs = max(int(t) for t in args.tabs.split(','))
+    url = serve_article()
+
+    # N tabs leased at once in the app's shared Chrome
+    ready = threading.Barrier(tabs + 1)
+    done = threading.Event()
+
+    def hold_tab():
+        with app.browser_tab_pool.lease() as tab:
+            tab.get(url)
+            ready.wait()
+            done.wait()
+
+    threads = [threading.Thread(target=hold_tab) for _ in range(tabs)]
+    for thread in threads:
+        thread.start()
+    ready.wait(timeout=120)
+    time.sleep(2)
+    shared = tree_pss_mb(browser_watchdog, [app.get_selenium_driver()])
+    done.set()
+    for thread in threads:
+        thread.join()
+    app.cleanup()
+
+    # N separate Chromes, each with its own profile, as before the tab pool
+    drivers = []
+    profiles = []
+    try:
+        for _ in range(tabs):
+            options = uc.ChromeOptions()
+            for flag in ('--headless', '--no-sandbox', '--disable-dev-shm-usage'):
+                options.add_argument(flag)
+            profiles.append(tempfile.mkdtemp(prefix='tab-bench-profile-'))
+            driver = uc.Chrome(options=options, driver_executable_path=app.get_patched_chromedriver(), user_data_dir=profiles[-1])
+            driver.get(url)
+            drivers.append(driver)
+        time.sleep(2)
+        separate = tree_pss_mb(browser_watchdog, drivers)
+    finally:
+        for driver in drivers:
+            driver.quit()
+        for profile in profiles:
+            shutil.rmtree(profile, ignore_errors=True)
+
+    print(f'{tabs} pages in leased tabs of one Chrome: {shared:6.0f} MB PSS')
+    print(f'{tabs} pages in {tabs} separate Chromes:     {separate:6.0f} MB PSS')
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--scrapes', type=int, default=8)
+    parser.add_argument('--tabs', default='1,4')
+    parser.add_argument('--load', type=float, default=1.0, help='seconds each fake page load takes')
+    parser.add_argument('--chrome', action='store_true', help='measure memory with a real Chrome')
+    args = parser.parse_args()
+
+    os.environ['DATABASE_URL'] = 'sqlite:///' + os.path.join(tempfile.mkdtemp(prefix='tab-bench-'), 'clippings.db')
+    import app
+    import browser_tabs
+    import browser_watchdog
+
+    if args.chrome:
+        chrome_memory(app, browser_watchdog, args)
+    else:
+        fake_throughput(app, browser_tabs, args)
+
+if __name__ == '__main__':
+    main()
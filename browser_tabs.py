@@ -0,0 +1,265 @@
+"""Concurrent scrapes in leased tabs of one shared Chrome process.
+
+A separate Chrome per concurrent scrape costs hundreds of MB each. Instead,
+each browser scrape leases a tab in the shared driver, up to
+BROWSER_MAX_TABS at a time. Each tab gets its own browser context (like an
+incognito window), so cookies and storage are not shared between scrapes.
+
+One WebDriver session can only address one window at a time, so every
+command takes the session's command lock and switches to its tab first.
+Commands are short. The slow parts of a scrape are page loads and the
+fixed waits, and those run without the lock. The driver is started with
+pageLoadStrategy 'none', so navigation returns at once, and the tab polls
+document.readyState until the page has loaded.
+"""
+import contextlib
+import logging
+import os
+import threading
+import time
+import uuid
+
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.remote.webelement import WebElement
+
+import deadline
+
+MAX_TABS = int(os.getenv('BROWSER_MAX_TABS', '4'))
+# How long cancel() waits for the command lock before calling the driver wedged
+CANCEL_LOCK_SECONDS = 2
+ISOLATE_TABS = os.getenv('BROWSER_ISOLATE_TABS', '1') == '1'
+LOAD_POLL_SECONDS = 0.1
+DEFAULT_PAGE_LOAD_TIMEOUT = 30
+
+class _Locked:
+    """Proxy that runs every driver or element call inside its tab"""
+    def __init__(self, target, tab):
+        self._target = target
+        self._tab = tab
+
+    def __getattr__(self, name):
+        if name.startswith('_'):
+            raise AttributeError(name)
+        # Properties such as .title and .text are driver commands too
+        with self._tab.active():
+            value = getattr(self._target, name)
+        if not callable(value):
+            return self._tab.wrap(value)
+
+        def call(*args, **kwargs):
+            with self._tab.active():
+                return self._tab.wrap(value(*args, **kwargs))
+        return call
+
+class Tab(_Locked):
+    """A leased tab; used in place of the driver by the scrape functions"""
+    def __init__(self, pool, handle, context_id=None):
+        super().__init__(pool.driver, self)
+        self._pool = pool
+        self.handle = handle
+        self.context_id = context_id
+        self.page_load_timeout = DEFAULT_PAGE_LOAD_TIMEOUT
+        self.closed = False
+
+    @contextlib.contextmanager
+    def active(self):
+        with self._pool.command_lock:
+            if self.closed:
+                # The watchdog closed it when the scrape overran
+                raise deadline.DeadlineExceeded('Browser tab was closed at the scrape deadline')
+            self._pool.switch_to(self.handle)
+            yield
+
+    def wrap(self, value):
+        if isinstance(value, WebElement):
+            return _Locked(value, self)
+        if isinstance(value, list):
+            return [self.wrap(item) for item in value]
+        return value
+
+    def set_page_load_timeout(self, seconds):
+        # The session-wide timeout would apply to every tab; keep it per tab
+        self.page_load_timeout = seconds
+
+    def get(self, url):
+        """Navigate and wait for the load without holding the command lock"""
+        driver = self._target
+        # With pageLoadStrategy 'none' the first polls can still see the
+        # previous document (a new tab's about:blank is already 'complete'),
+        # so it is marked and the load only counts once it has been replaced
+        marker = uuid.uuid4().hex
+        with self.active():
+            try:
+                driver.execute_script('document.__tabMarker = arguments[0]', marker)
+            except WebDriverException:
+                pass
+            driver.get(url)
+            self._pool.pages += 1
+        expires = time.monotonic() + self.page_load_timeout
+        while True:
+            time.sleep(LOAD_POLL_SECONDS)
+            try:
+                with self.active():
+                    state = driver.execute_script(
+                        "return document.__tabMarker === arguments[0] ? 'previous' : document.readyState", marker
+                    )
+            except WebDriverException:
+                # The old document can go away between navigation and the new one's first script
+                state = 'loading'
+            if state == 'complete':
+                return
+            if time.monotonic() >= expires:
+                # Stop loading so this tab's page does not keep the renderer busy
+                with self.active():
+                    driver.execute_script('window.stop()')
+                raise TimeoutException(f"Page load of {url} timed out after {self.page_load_timeout:.0f}s")
+
+class TabPool:
+    """Leases isolated tabs of the driver returned by get_driver"""
+    def __init__(self, get_driver, max_tabs=MAX_TABS, recycle_reason=None, retire=None):
+        self._get_driver = get_driver
+        self._slots = threading.BoundedSemaphore(max_tabs)
+        self.max_tabs = max_tabs
+        self.command_lock = threading.RLock()
+        self._idle = threading.Condition(self.command_lock)
+        # recycle_reason(driver, pages) says when a driver is due for replacement;
+        # retire(driver, reason, pages) quits it once no tab is leased
+        self._recycle_reason = recycle_reason
+        self._retire = retire
+        self.pages = 0
+        self.driver = None
+        self._base_handle = None
+        self._current_handle = None
+        self._isolate = ISOLATE_TABS
+        self._leased = 0
+
+    def switch_to(self, handle):
+        if handle != self._current_handle:
+            self.driver.switch_to.window(handle)
+            self._current_handle = handle
+
+    def _attach(self):
+        """Pick up the current driver, starting over if it was relaunched"""
+        driver = self._get_driver()
+        if driver is not self.driver:
+            self.driver = driver
+            self.pages = 0
+            # The window the driver opened with is never leased; CDP commands
+            # that are not about a page run from it
+            self._base_handle = driver.current_window_handle
+            self._current_handle = self._base_handle
+
+    def _open_tab(self):
+        driver = self.driver
+        if self._isolate:
+            try:
+                self.switch_to(self._base_handle)
+                context_id = driver.execute_cdp_cmd('Target.createBrowserContext', {'disposeOnDetach': False})['browserContextId']
+                target_id = driver.execute_cdp_cmd(
+                    'Target.createTarget', {'url': 'about:blank', 'browserContextId': context_id}
+                )['targetId']
+                # chromedriver names windows by their DevTools target ID
+                if target_id in driver.window_handles:
+                    return Tab(self, target_id, context_id)
+                driver.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': context_id})
+                raise RuntimeError('driver does not see windows in new browser contexts')
+            except Exception as e:
+                logging.warning(f"Isolated browser contexts unavailable, tabs will share cookies: {e}")
+                self._isolate = False
+        self.switch_to(self._base_handle)
+        driver.switch_to.new_window('tab')
+        self._current_handle = driver.current_window_handle
+        return Tab(self, self._current_handle)
+
+    def _close_tab(self, tab):
+        if tab._target is not self.driver or tab.closed:
+            return
+        tab.closed = True
+        try:
+            self.switch_to(tab.handle)
+            self.driver.close()
+            self._current_handle = None
+            self.switch_to(self._base_handle)
+            if tab.context_id:
+                self.driver.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': tab.context_id})
+        except Exception as e:
+            logging.warning(f"Could not close browser tab: {e}")
+            self._current_handle = None
+
+    def _recycle_if_due(self):
+        """Retire the driver once it is due and its leased tabs have finished"""
+        driver = self.driver
+        if driver is None or self._recycle_reason is None:
+            return
+        reason = self._recycle_reason(driver, self.pages)
+        if not reason:
+            return
+        # New leases queue here, so the pool drains even under constant load
+        left = deadline.remaining()
+        self._idle.wait_for(lambda: self._leased == 0, timeout=None if left is None else max(0, left))
+        # Another lease may have retired it (and started a new driver) while this one waited
+        if self._leased == 0 and self.driver is driver:
+            self.driver = None
+            self._retire(driver, reason, self.pages)
+
+    def cancel(self, tab):
+        """Close an overrunning lease's tab and browser context, leaving the other tabs running.
+
+        Returns False when the command lock stays held (a driver call is stuck)
+        or the close fails; only then does the whole driver need killing.
+        """
+        if not self.command_lock.acquire(timeout=CANCEL_LOCK_SECONDS):
+            return False
+        try:
+            if tab._target is not self.driver or tab.closed:
+                return True
+            tab.closed = True
+            self.switch_to(self._base_handle)
+            # The scrape's next command in this tab fails with "no such window"
+            self.driver.execute_cdp_cmd('Target.closeTarget', {'targetId': tab.handle})
+            if tab.context_id:
+                self.driver.execute_cdp_cmd('Target.disposeBrowserContext', {'browserContextId': tab.context_id})
+            return True
+        except Exception as e:
+            logging.warning(f"Could not cancel browser tab: {e}")
+            return False
+        finally:
+            self.command_lock.release()
+
+    def prewarm(self):
+        """Start the driver before the first lease needs it"""
+        with self.command_lock:
+            self._attach()
+
+    @contextlib.contextmanager
+    def lease(self):
+        """Lease a tab for one scrape, waiting at most until the scrape deadline"""
+        left = deadline.remaining()
+        if not self._slots.acquire(timeout=None if left is None else max(0, left)):
+            deadline.check('tab_lease')
+            raise deadline.DeadlineExceeded('No browser tab became free before the scrape deadline')
+        try:
+            with self.command_lock:
+                self._recycle_if_due()
+                self._attach()
+                tab = self._open_tab()
+                self._leased += 1
+            # The scrape's watchdog closes this tab if the scrape overruns
+            holder = deadline.current()
+            if holder is not None:
+                holder.hold(tab)
+            try:
+                yield tab
+            finally:
+                if holder is not None:
+                    holder.release(tab)
+                with self.command_lock:
+                    self._leased -= 1
+                    self._close_tab(tab)
+                    self._idle.notify_all()
+        finally:
+            self._slots.release()
+
+    def stats(self):
+        """Tab usage for the health check"""
+        return {'max_tabs': self.max_tabs, 'leased': self._leased, 'isolated': self._isolate, 'pages': self.pages}
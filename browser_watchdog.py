@@ -0,0 +1,264 @@
+"""Memory watchdog, recycling and orphan reaping for browser drivers.
+
+Long-lived Chrome and Firefox instances grow with every navigation, so a
+driver is recycled once it has served DRIVER_MAX_PAGES pages or its process
+tree (driver service plus browser) goes above DRIVER_MAX_RSS_MB.
+
+A gunicorn worker that is killed on timeout never runs its atexit cleanup,
+which leaves its chromedriver/geckodriver and browser processes running.
+Every driver is therefore recorded in a registry file together with the
+worker that owns it. reap_orphans() kills the processes of drivers whose
+worker has gone. It also kills stray headless browsers that were
+re-parented to init and are not in the registry, but only ones this app
+started: Chrome with one of its profiles as --user-data-dir, or its
+patched chromedriver. What was recycled and
+reaped is kept in the registry file for ``manage.py status``.
+"""
+import json
+import logging
+import os
+import threading
+import time
+
+import psutil
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single waitress process
+    fcntl = None
+
+import metrics
+
+MAX_PAGES = int(os.getenv('DRIVER_MAX_PAGES', '200'))
+MAX_RSS_MB = float(os.getenv('DRIVER_MAX_RSS_MB', '1500'))
+# Walking the process tree is not free; check each driver's RSS at most this often
+RSS_CHECK_SECONDS = 30
+REGISTRY_FILE = os.getenv('BROWSER_REGISTRY_FILE', os.path.join('logs', 'browser_processes.json'))
+# Unregistered strays younger than this may belong to a driver that is still starting
+STRAY_MIN_AGE_SECONDS = 120
+BROWSER_PROCESS_NAMES = ('chrome', 'chromium', 'chromedriver', 'undetected_chromedriver', 'firefox', 'geckodriver')
+# Where the app keeps its Chrome profiles and patched chromedriver; they mark
+# a stray process as one of ours rather than another user's or service's
+PROFILE_DIR = os.getenv('BROWSER_PROFILE_DIR', os.path.join('drivers', 'profiles'))
+PATCHED_DRIVER_DIR = os.getenv('PATCHED_CHROMEDRIVER_DIR', os.path.join('drivers', 'patched'))
+RECENT_EVENTS = 20
+
+_registry_lock = threading.Lock()
+_rss_checked = {}
+
+def _update_registry(update):
+    """Read, update and write the shared registry under a lock; returns update's result"""
+    os.makedirs(os.path.dirname(REGISTRY_FILE) or '.', exist_ok=True)
+    with _registry_lock, open(REGISTRY_FILE, 'a+') as f:
+        if fcntl:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            f.seek(0)
+            try:
+                registry = json.loads(f.read() or '{}')
+            except ValueError:
+                registry = {}
+            registry.setdefault('drivers', {})
+            registry.setdefault('reclaimed', {'recycled': 0, 'recycled_mb': 0.0, 'orphans_killed': 0, 'orphan_mb': 0.0})
+            registry.setdefault('events', [])
+            result = update(registry)
+            f.seek(0)
+            f.truncate()
+            f.write(json.dumps(registry, indent=1))
+            return result
+        finally:
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def read_registry():
+    """Return the registry without changing it (empty if it does not exist yet)"""
+    if not os.path.exists(REGISTRY_FILE):
+        return {'drivers': {}, 'reclaimed': {}, 'events': []}
+    return _update_registry(lambda registry: registry)
+
+def _add_event(registry, **event):
+    event['time'] = time.strftime('%Y-%m-%d %H:%M:%S')
+    registry['events'] = (registry['events'] + [event])[-RECENT_EVENTS:]
+
+def driver_root_pids(driver):
+    """Return the driver service pid and, for undetected_chromedriver, the detached browser pid"""
+    pids = []
+    try:
+        pids.append(driver.service.process.pid)
+    except Exception:
+        pass
+    browser_pid = getattr(driver, 'browser_pid', None)
+    if browser_pid:
+        pids.append(browser_pid)
+    return pids
+
+def tree_processes(pids):
+    """Return the live processes rooted at pids, children first"""
+    processes = []
+    for pid in pids:
+        try:
+            root = psutil.Process(pid)
+            processes.extend(root.children(recursive=True) + [root])
+        except psutil.Error:
+            continue
+    return processes
+
+def tree_rss_mb(pids):
+    total = 0
+    for process in tree_processes(pids):
+        try:
+            total += process.memory_info().rss
+        except psutil.Error:
+            pass
+    return total / (1024 * 1024)
+
+def kill_tree(pids):
+    """Kill every process rooted at pids; returns the RSS (MB) freed"""
+    processes = tree_processes(pids)
+    freed = 0
+    for process in processes:
+        try:
+            freed += process.memory_info().rss
+            process.kill()
+        except psutil.Error:
+            pass
+    psutil.wait_procs(processes, timeout=3)
+    return freed / (1024 * 1024)
+
+def register(driver, browser):
+    """Record a newly launched driver as owned by this worker process"""
+    pids = driver_root_pids(driver)
+    if not pids:
+        return
+    worker = psutil.Process()
+
+    def update(registry):
+        registry['drivers'][str(pids[0])] = {
+            'browser': browser,
+            'pids': pids,
+            'worker': worker.pid,
+            'worker_started': worker.create_time(),
+            'started': time.time()
+        }
+    try:
+        _update_registry(update)
+    except OSError as e:
+        logging.warning(f"Could not register {browser} driver: {e}")
+
+def unregister(driver):
+    pids = driver_root_pids(driver)
+    if pids:
+        try:
+            _update_registry(lambda registry: registry['drivers'].pop(str(pids[0]), None))
+        except OSError as e:
+            logging.warning(f"Could not unregister driver: {e}")
+
+def recycle_reason(driver, pages):
+    """Return 'pages' or 'rss' if a driver should be recycled, else None"""
+    if pages >= MAX_PAGES:
+        return 'pages'
+    pids = driver_root_pids(driver)
+    now = time.monotonic()
+    key = tuple(pids)
+    if not pids or now - _rss_checked.get(key, 0) < RSS_CHECK_SECONDS:
+        return None
+    _rss_checked[key] = now
+    if tree_rss_mb(pids) >= MAX_RSS_MB:
+        return 'rss'
+    return None
+
+def record_recycle(driver, browser, reason, pages):
+    """Note a recycled driver's size before it is quit"""
+    pids = driver_root_pids(driver)
+    rss = tree_rss_mb(pids)
+    _rss_checked.pop(tuple(pids), None)
+    metrics.BROWSER_RECYCLES.labels(browser=browser, reason=reason).inc()
+    logging.info(f"Recycling {browser} driver after {pages} pages at {rss:.0f} MB ({reason})")
+
+    def update(registry):
+        if pids:
+            registry['drivers'].pop(str(pids[0]), None)
+        registry['reclaimed']['recycled'] += 1
+        registry['reclaimed']['recycled_mb'] += round(rss, 1)
+        _add_event(registry, action='recycled', browser=browser, reason=reason, pages=pages, mb=round(rss, 1))
+    try:
+        _update_registry(update)
+    except OSError as e:
+        logging.warning(f"Could not record driver recycle: {e}")
+
+def worker_alive(entry):
+    try:
+        worker = psutil.Process(entry['worker'])
+        # A reused pid belongs to a different process with a different start time
+        return abs(worker.create_time() - entry['worker_started']) < 1
+    except psutil.Error:
+        return False
+
+def _launched_here(cmdline):
+    """Whether a browser or driver command line is one this app started"""
+    if not cmdline:
+        return False
+    profile_arg = '--user-data-dir=' + os.path.abspath(PROFILE_DIR) + os.sep
+    driver_dir = os.path.abspath(PATCHED_DRIVER_DIR) + os.sep
+    return cmdline[0].startswith(driver_dir) or any(arg.startswith(profile_arg) for arg in cmdline[1:])
+
+def _stray_browsers(registered_pids):
+    """Headless browser and driver processes this app launched, re-parented to init and unregistered"""
+    if os.name == 'nt':
+        return []
+    uid = os.getuid()
+    now = time.time()
+    strays = []
+    for process in psutil.process_iter(['pid', 'ppid', 'name', 'cmdline', 'uids', 'create_time']):
+        info = process.info
+        name = (info['name'] or '').lower()
+        if info['ppid'] != 1 or info['pid'] in registered_pids:
+            continue
+        if not any(name.startswith(browser) for browser in BROWSER_PROCESS_NAMES):
+            continue
+        if info['uids'] and info['uids'].real != uid:
+            continue
+        if not _launched_here(info['cmdline']):
+            continue
+        if now - (info['create_time'] or now) < STRAY_MIN_AGE_SECONDS:
+            continue
+        strays.append(info['pid'])
+    return strays
+
+def reap_orphans():
+    """Kill drivers whose worker has exited and stray headless browsers; returns the number killed"""
+    def update(registry):
+        killed = 0
+        freed = 0.0
+        for key, entry in list(registry['drivers'].items()):
+            processes = tree_processes(entry['pids'])
+            if processes and worker_alive(entry):
+                continue
+            # Either the owner is gone or the driver already exited without unregistering
+            del registry['drivers'][key]
+            if processes:
+                mb = kill_tree(entry['pids'])
+                killed += 1
+                freed += mb
+                _add_event(registry, action='orphan_killed', browser=entry['browser'], worker=entry['worker'], mb=round(mb, 1))
+
+        registered = {pid for entry in registry['drivers'].values() for pid in entry['pids']}
+        for pid in _stray_browsers(registered):
+            mb = kill_tree([pid])
+            killed += 1
+            freed += mb
+            _add_event(registry, action='stray_killed', pid=pid, mb=round(mb, 1))
+
+        registry['reclaimed']['orphans_killed'] += killed
+        registry['reclaimed']['orphan_mb'] += round(freed, 1)
+        registry['reclaimed']['last_reap'] = time.strftime('%Y-%m-%d %H:%M:%S')
+        return killed, freed
+    try:
+        killed, freed = _update_registry(update)
+    except OSError as e:
+        logging.warning(f"Orphan browser reap failed: {e}")
+        return 0
+    if killed:
+        metrics.BROWSER_ORPHANS_KILLED.inc(killed)
+        logging.warning(f"Killed {killed} orphaned browser process trees, freeing {freed:.0f} MB")
+    return killed
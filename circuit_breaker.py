@@ -0,0 +1,188 @@
+"""Per-host circuit breakers shared by all worker processes.
+
+State lives in a small SQLite file so every gunicorn worker sees the same
+breaker. A breaker counts calls, failures and slow calls over a rolling
+window; once enough calls have been seen and the share of bad calls (failed,
+slow, or both, each call counted once) reaches the threshold it opens. While open, callers get
+an immediate degraded result instead of waiting on the host. After
+CIRCUIT_OPEN_SECONDS one trial call is let through (half-open): success
+closes the breaker, failure opens it again.
+"""
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+STATE_FILE = os.getenv('CIRCUIT_STATE_FILE', os.path.join('logs', 'circuit_breakers.db'))
+FAILURE_RATE = float(os.getenv('CIRCUIT_FAILURE_RATE', '0.5'))
+MIN_CALLS = int(os.getenv('CIRCUIT_MIN_CALLS', '4'))
+WINDOW_SECONDS = float(os.getenv('CIRCUIT_WINDOW_SECONDS', '300'))
+OPEN_SECONDS = float(os.getenv('CIRCUIT_OPEN_SECONDS', '120'))
+SLOW_CALL_SECONDS = float(os.getenv('CIRCUIT_SLOW_CALL_SECONDS', '20'))
+
+_local = threading.local()
+
+def _connect():
+    """Get this thread's connection to the shared state file"""
+    conn = getattr(_local, 'conn', None)
+    if conn is None:
+        os.makedirs(os.path.dirname(STATE_FILE) or '.', exist_ok=True)
+        conn = sqlite3.connect(STATE_FILE, timeout=5, isolation_level=None)
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute("""
+            CREATE TABLE IF NOT EXISTS circuit_breakers (
+                host TEXT PRIMARY KEY,
+                state TEXT NOT NULL,
+                window_start REAL NOT NULL,
+                calls INTEGER NOT NULL,
+                failures INTEGER NOT NULL,
+                slow_calls INTEGER NOT NULL,
+                bad_calls INTEGER NOT NULL DEFAULT 0,
+                opened_at REAL,
+                trial_started REAL,
+                last_failure REAL
+            )
+        """)
+        columns = {row[1] for row in conn.execute('PRAGMA table_info(circuit_breakers)')}
+        if 'bad_calls' not in columns:
+            # State files from before bad_calls; the next window starts counting it
+            conn.execute('ALTER TABLE circuit_breakers ADD COLUMN bad_calls INTEGER NOT NULL DEFAULT 0')
+        _local.conn = conn
+    return conn
+
+def _load(conn, host, now):
+    row = conn.execute(
+        'SELECT state, window_start, calls, failures, slow_calls, bad_calls, opened_at, trial_started, last_failure '
+        'FROM circuit_breakers WHERE host = ?', (host,)
+    ).fetchone()
+    if row is None:
+        return {'state': CLOSED, 'window_start': now, 'calls': 0, 'failures': 0, 'slow_calls': 0, 'bad_calls': 0,
+                'opened_at': None, 'trial_started': None, 'last_failure': None}
+    keys = ('state', 'window_start', 'calls', 'failures', 'slow_calls', 'bad_calls', 'opened_at', 'trial_started', 'last_failure')
+    return dict(zip(keys, row))
+
+def _save(conn, host, breaker):
+    conn.execute(
+        'INSERT OR REPLACE INTO circuit_breakers '
+        '(host, state, window_start, calls, failures, slow_calls, bad_calls, opened_at, trial_started, last_failure) '
+        'VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)',
+        (host, breaker['state'], breaker['window_start'], breaker['calls'], breaker['failures'],
+         breaker['slow_calls'], breaker['bad_calls'], breaker['opened_at'], breaker['trial_started'],
+         breaker['last_failure'])
+    )
+
+def _transaction(host, update):
+    """Apply update(breaker, now) to a host's breaker atomically across processes"""
+    conn = _connect()
+    now = time.time()
+    conn.execute('BEGIN IMMEDIATE')
+    try:
+        breaker = _load(conn, host, now)
+        before = dict(breaker)
+        result = update(breaker, now)
+        if breaker != before:
+            _save(conn, host, breaker)
+        conn.execute('COMMIT')
+        return result
+    except Exception:
+        conn.execute('ROLLBACK')
+        raise
+
+def allow(host):
+    """Return True if a call to host may proceed"""
+    def update(breaker, now):
+        if breaker['state'] == CLOSED:
+            return True
+        if breaker['state'] == OPEN and now - breaker['opened_at'] >= OPEN_SECONDS:
+            breaker['state'] = HALF_OPEN
+            breaker['trial_started'] = None
+        if breaker['state'] == HALF_OPEN:
+            # Let exactly one trial through; retry if that trial never reported back
+            if breaker['trial_started'] is None or now - breaker['trial_started'] >= OPEN_SECONDS:
+                breaker['trial_started'] = now
+                return True
+        return False
+    try:
+        # Fast path without a write lock: closed breakers are the common case
+        row = _connect().execute('SELECT state FROM circuit_breakers WHERE host = ?', (host,)).fetchone()
+        if row is None or row[0] == CLOSED:
+            return True
+        return _transaction(host, update)
+    except sqlite3.Error as e:
+        logging.warning(f"Circuit breaker check failed for {host}: {e}")
+        return True
+
+def record(host, success, duration):
+    """Record the outcome of a call to host; returns the breaker's new state"""
+    slow = duration >= SLOW_CALL_SECONDS
+
+    def update(breaker, now):
+        # A call that both fails and is slow is still one bad call
+        bad = not success or slow
+        if breaker['state'] == HALF_OPEN:
+            if bad:
+                breaker.update(state=OPEN, opened_at=now, trial_started=None, last_failure=now)
+            else:
+                breaker.update(state=CLOSED, window_start=now, calls=0, failures=0, slow_calls=0, bad_calls=0,
+                               opened_at=None, trial_started=None)
+            return breaker['state']
+
+        if now - breaker['window_start'] >= WINDOW_SECONDS:
+            breaker.update(window_start=now, calls=0, failures=0, slow_calls=0, bad_calls=0)
+        breaker['calls'] += 1
+        if not success:
+            breaker['failures'] += 1
+        if slow:
+            breaker['slow_calls'] += 1
+        if bad:
+            breaker['bad_calls'] += 1
+            breaker['last_failure'] = now
+
+        if breaker['state'] == CLOSED and breaker['calls'] >= MIN_CALLS:
+            failure_rate = breaker['bad_calls'] / breaker['calls']
+            if failure_rate >= FAILURE_RATE:
+                breaker.update(state=OPEN, opened_at=now, trial_started=None)
+                logging.warning(f"Circuit opened for {host}: failure rate {failure_rate:.0%} over {breaker['calls']} calls")
+        return breaker['state']
+    try:
+        return _transaction(host, update)
+    except sqlite3.Error as e:
+        logging.warning(f"Could not record circuit breaker outcome for {host}: {e}")
+        return None
+
+def get_states():
+    """Return every known breaker for monitoring"""
+    try:
+        rows = _connect().execute(
+            'SELECT host, state, window_start, calls, failures, slow_calls, opened_at, last_failure '
+            'FROM circuit_breakers ORDER BY host'
+        ).fetchall()
+    except sqlite3.Error as e:
+        logging.warning(f"Could not read circuit breaker state: {e}")
+        return []
+    now = time.time()
+    states = []
+    for host, state, window_start, calls, failures, slow_calls, opened_at, last_failure in rows:
+        if state == OPEN and opened_at and now - opened_at >= OPEN_SECONDS:
+            state = HALF_OPEN
+        states.append({
+            'host': host,
+            'state': state,
+            'calls': calls,
+            'failures': failures,
+            'slow_calls': slow_calls,
+            'window_age_seconds': round(now - window_start, 1),
+            'open_for_seconds': round(now - opened_at, 1) if opened_at and state != CLOSED else None,
+            'last_failure': last_failure
+        })
+    return states
+
+def reset(host):
+    """Force a host's breaker closed"""
+    conn = _connect()
+    conn.execute('DELETE FROM circuit_breakers WHERE host = ?', (host,))
@@ -0,0 +1,142 @@
+"""Image clippings (cartoons, photos) stored once as print-ready derivatives.
+
+An uploaded or fetched image is decoded once and reduced to fit the printed
+column at PRINT_DPI:
+- JPEG for photos;
+- PNG for images with transparency or few colours, such as line-art
+  cartoons.
+The derivative is named after the hash of the original bytes plus its pixel
+size. The same image is therefore stored once, and a repeat upload is found
+without being decoded. Exports embed the derivative and size it from its
+name, so an export never decodes the original.
+"""
+import hashlib
+import io
+import logging
+import os
+import re
+import time
+
+from PIL import Image, ImageOps
+
+import metrics
+
+IMAGE_DIR = os.getenv('CLIPPING_IMAGE_DIR', 'images')
+# nginx accepts request bodies up to 20 MB
+MAX_SOURCE_BYTES = 20 * 1024 * 1024
+# Refuse decompression bombs well before they exhaust a worker's memory
+Image.MAX_IMAGE_PIXELS = 60_000_000
+PRINT_DPI = 150
+# A4 with 2 cm margins leaves a 17 cm column; keep an image within most of a page
+MAX_PRINT_WIDTH_CM = 17
+MAX_PRINT_HEIGHT_CM = 20
+JPEG_QUALITY = 85
+# Images with at most this many colours are kept lossless as PNG
+PNG_MAX_COLOURS = 256
+# Unreferenced derivatives younger than this may belong to an upload still being saved
+ORPHAN_GRACE_SECONDS = 24 * 3600
+
+NAME_PATTERN = re.compile(r'^([0-9a-f]{32})_(\d+)x(\d+)\.(jpg|png)$')
+
+class ImageError(ValueError):
+    """Raised for data that is not a usable image"""
+
+def _max_pixels():
+    return (
+        round(MAX_PRINT_WIDTH_CM / 2.54 * PRINT_DPI),
+        round(MAX_PRINT_HEIGHT_CM / 2.54 * PRINT_DPI)
+    )
+
+def _find_existing(digest):
+    if not os.path.isdir(IMAGE_DIR):
+        return None
+    for name in os.listdir(IMAGE_DIR):
+        if name.startswith(digest + '_') and NAME_PATTERN.match(name):
+            return name
+    return None
+
+def _few_colours(image):
+    if image.mode in ('1', 'L', 'P'):
+        return True
+    return image.getcolors(PNG_MAX_COLOURS) is not None
+
+def store_image(data):
+    """Store the print derivative of an image's bytes; returns its file name"""
+    if len(data) > MAX_SOURCE_BYTES:
+        raise ImageError(f'Image is larger than {MAX_SOURCE_BYTES // (1024 * 1024)} MB')
+    digest = hashlib.sha256(data).hexdigest()[:32]
+    existing = _find_existing(digest)
+    metrics.record_cache('clipping_image', existing is not None)
+    if existing:
+        # Keeps a re-used derivative clear of remove_unreferenced()'s grace period
+        os.utime(os.path.join(IMAGE_DIR, existing))
+        return existing
+
+    start_time = time.time()
+    max_size = _max_pixels()
+    try:
+        image = Image.open(io.BytesIO(data))
+        # JPEGs can be decoded straight at a reduced scale
+        image.draft('RGB', max_size)
+        image = ImageOps.exif_transpose(image)
+        has_alpha = image.mode in ('RGBA', 'LA') or (image.mode == 'P' and 'transparency' in image.info)
+        # Judge line art before resampling adds in-between shades
+        lossless = has_alpha or _few_colours(image)
+        image.thumbnail(max_size, Image.LANCZOS)
+    except (OSError, Image.DecompressionBombError) as e:
+        raise ImageError(f'Not a usable image: {e}')
+
+    if lossless:
+        extension = 'png'
+        if image.mode not in ('1', 'L', 'P', 'RGB', 'RGBA'):
+            image = image.convert('RGBA' if has_alpha else 'RGB')
+        if image.mode == 'RGB':
+            # A palette keeps the anti-aliased edges and is a fraction of the size
+            image = image.quantize(PNG_MAX_COLOURS)
+    else:
+        extension = 'jpg'
+        image = image.convert('RGB')
+
+    name = f'{digest}_{image.width}x{image.height}.{extension}'
+    os.makedirs(IMAGE_DIR, exist_ok=True)
+    path = os.path.join(IMAGE_DIR, name)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    if extension == 'png':
+        image.save(temp_path, 'PNG', optimize=True)
+    else:
+        image.save(temp_path, 'JPEG', quality=JPEG_QUALITY, optimize=True, progressive=True)
+    os.replace(temp_path, path)
+    logging.info(f"Stored image {name} ({len(data)} -> {os.path.getsize(path)} bytes) in {time.time() - start_time:.2f} seconds")
+    return name
+
+def image_path(name):
+    """Return the path of a stored derivative, or None for an unknown name"""
+    if not name or not NAME_PATTERN.match(name):
+        return None
+    path = os.path.join(IMAGE_DIR, name)
+    return path if os.path.exists(path) else None
+
+def print_size_cm(name, max_width_cm=MAX_PRINT_WIDTH_CM, max_height_cm=MAX_PRINT_HEIGHT_CM):
+    """Return the (width, height) in cm to print a derivative at, from its name alone"""
+    match = NAME_PATTERN.match(name)
+    width, height = int(match.group(2)), int(match.group(3))
+    width_cm = width / PRINT_DPI * 2.54
+    height_cm = height / PRINT_DPI * 2.54
+    scale = min(1, max_width_cm / width_cm, max_height_cm / height_cm)
+    return width_cm * scale, height_cm * scale
+
+def remove_unreferenced(referenced):
+    """Delete derivatives no clipping refers to any more; returns how many were removed"""
+    if not os.path.isdir(IMAGE_DIR):
+        return 0
+    cutoff = time.time() - ORPHAN_GRACE_SECONDS
+    removed = 0
+    for name in os.listdir(IMAGE_DIR):
+        path = os.path.join(IMAGE_DIR, name)
+        try:
+            if name not in referenced and os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass
+    return removed
@@ -22,9 +22,27 @@ SCRAPING_CONFIG = {
     'timeout': 30,
     'max_retries': 3,
     'retry_delay': 5,
-    'max_paragraphs': 2
+    'max_paragraphs': 2,
+    # Shorter paragraphs are usually captions, bylines or share prompts
+    'min_paragraph_length': 50
 }
 
+# Hedged scraping: race a plain HTTP fetch against the browser for these domains.
+# Only sites scraped with a browser can be hedged: news24.com (the page head
+# is streamed for its headline) and pressreader.com (the text view is fetched;
+# hedged, it races the browser instead of running before it).
+#   mode 'race'    - start both at once
+#   mode 'delayed' - start HTTP, and the browser only if HTTP has no good
+#                    headline after browser_delay seconds
+#   mode 'off'     - no hedging
+HEDGE_CONFIG = {
+    'news24.com': {'mode': 'delayed', 'browser_delay': 1.5},
+    'pressreader.com': {'mode': 'off'},
+}
+
+# Sites whose browser cookies and localStorage are saved and reused across scrapes
+COOKIE_JAR_SITES = ('pressreader.com', 'news24.com')
+
 LOGGING_CONFIG = {
     'version': 1,
     'disable_existing_loggers': False,
@@ -0,0 +1,198 @@
+"""Per-site browser sessions kept on disk and reused across scrapes.
+
+A fresh browser context has no cookies, so PressReader and News24 show
+consent walls, redirects and bot checks on the first navigations. After a
+successful browser scrape the site's cookies and the page's localStorage
+are saved to an encrypted jar. The next tab that visits the site gets them
+before it navigates. The plain HTTP fetches send the same cookies.
+
+Jars are Fernet-encrypted with COOKIE_JAR_KEY, or else a key derived from
+SECRET_KEY. Without either key, sessions are not persisted. A session
+refreshes itself in three ways:
+- expired cookies are dropped when a jar is loaded;
+- a jar older than COOKIE_JAR_MAX_AGE_HOURS is ignored;
+- each successful scrape replaces the jar, and a failed one discards it,
+  so the next visit starts a clean session.
+"""
+import base64
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import requests
+from cryptography.fernet import Fernet, InvalidToken
+
+import metrics
+from config import COOKIE_JAR_SITES
+
+JAR_DIR = os.getenv('COOKIE_JAR_DIR', 'sessions')
+MAX_AGE_SECONDS = float(os.getenv('COOKIE_JAR_MAX_AGE_HOURS', '24')) * 3600
+# localStorage can hold whole cached API responses; only small stores are kept
+MAX_STORAGE_BYTES = 64 * 1024
+# Keys Network.setCookies accepts from what Network.getAllCookies returns
+COOKIE_PARAM_KEYS = ('name', 'value', 'domain', 'path', 'secure', 'httpOnly', 'sameSite', 'expires')
+
+_jars = {}
+_jars_lock = threading.Lock()
+_fernet = None
+_warned_no_key = False
+
+def _get_fernet():
+    """Return the jar cipher, or None when no key is configured"""
+    global _fernet, _warned_no_key
+    if _fernet is None:
+        key = os.getenv('COOKIE_JAR_KEY')
+        secret = os.getenv('SECRET_KEY')
+        if key:
+            _fernet = Fernet(key.encode())
+        elif secret:
+            _fernet = Fernet(base64.urlsafe_b64encode(hashlib.sha256(secret.encode()).digest()))
+        elif not _warned_no_key:
+            _warned_no_key = True
+            logging.warning("Neither COOKIE_JAR_KEY nor SECRET_KEY is set; browser sessions will not be persisted")
+    return _fernet
+
+def site_for(url):
+    """Return the configured site a URL belongs to, or None"""
+    host = (urlparse(url).hostname or '').lower()
+    for site in COOKIE_JAR_SITES:
+        if host == site or host.endswith('.' + site):
+            return site
+    return None
+
+def _jar_path(site):
+    return os.path.join(JAR_DIR, f'{site}.jar')
+
+def _live_cookies(cookies, now):
+    # Session cookies (expires -1) only live as long as the jar itself
+    return [cookie for cookie in cookies if cookie.get('expires', -1) <= 0 or cookie['expires'] > now]
+
+def load(site):
+    """Return the site's saved session ({'saved', 'cookies', 'storage'}) or None"""
+    fernet = _get_fernet()
+    path = _jar_path(site)
+    if fernet is None or not os.path.exists(path):
+        metrics.record_cache('cookie_jar', False)
+        return None
+    mtime = os.path.getmtime(path)
+    with _jars_lock:
+        cached = _jars.get(site)
+    if cached and cached[0] == mtime:
+        jar = cached[1]
+    else:
+        try:
+            with open(path, 'rb') as f:
+                jar = json.loads(fernet.decrypt(f.read()))
+        except (OSError, ValueError, InvalidToken) as e:
+            # InvalidToken usually means the key changed; the jar is rebuilt on the next scrape
+            logging.warning(f"Could not read cookie jar for {site}: {e}")
+            metrics.record_cache('cookie_jar', False)
+            return None
+        with _jars_lock:
+            _jars[site] = (mtime, jar)
+
+    now = time.time()
+    cookies = _live_cookies(jar['cookies'], now)
+    if now - jar['saved'] > MAX_AGE_SECONDS or not cookies:
+        metrics.record_cache('cookie_jar', False)
+        return None
+    metrics.record_cache('cookie_jar', True)
+    return dict(jar, cookies=cookies)
+
+def save(site, cookies, storage):
+    """Encrypt and replace the site's jar"""
+    fernet = _get_fernet()
+    if fernet is None:
+        return
+    jar = {'saved': time.time(), 'cookies': cookies, 'storage': storage}
+    os.makedirs(JAR_DIR, exist_ok=True)
+    path = _jar_path(site)
+    # Write then rename so a concurrent reader never sees half a jar
+    temp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+    with open(temp_path, 'wb') as f:
+        f.write(fernet.encrypt(json.dumps(jar).encode()))
+    os.replace(temp_path, path)
+    with _jars_lock:
+        _jars[site] = (os.path.getmtime(path), jar)
+
+def discard(url):
+    """Drop the jar for a URL's site so the next visit starts a new session"""
+    site = site_for(url)
+    if not site:
+        return
+    with _jars_lock:
+        _jars.pop(site, None)
+    try:
+        os.remove(_jar_path(site))
+        logging.info(f"Discarded saved session for {site}")
+    except FileNotFoundError:
+        pass
+
+def restore(tab, url):
+    """Load the URL's saved session into a leased tab before it navigates; returns True if there was one"""
+    site = site_for(url)
+    jar = load(site) if site else None
+    if not jar:
+        return False
+    try:
+        # CDP commands run in the tab's own target, so its browser context gets the cookies
+        tab.execute_cdp_cmd('Network.enable', {})
+        tab.execute_cdp_cmd('Network.setCookies', {'cookies': jar['cookies']})
+        if jar['storage']:
+            # localStorage belongs to an origin, so it is written once the page's document exists
+            script = (
+                '(function(origins) {'
+                ' const items = origins[location.origin]; if (!items) return;'
+                ' try { for (const [k, v] of Object.entries(items)) if (localStorage.getItem(k) === null) localStorage.setItem(k, v); }'
+                ' catch (e) {}'
+                f'}})({json.dumps(jar["storage"])});'
+            )
+            tab.execute_cdp_cmd('Page.addScriptToEvaluateOnNewDocument', {'source': script})
+    except Exception as e:
+        logging.warning(f"Could not restore saved session for {site}: {e}")
+        return False
+    return True
+
+def capture(tab, url):
+    """Save the cookies and localStorage a tab holds for the URL's site"""
+    site = site_for(url)
+    if not site or _get_fernet() is None:
+        return
+    try:
+        all_cookies = tab.execute_cdp_cmd('Network.getAllCookies', {})['cookies']
+        origin, items = tab.execute_script('return [location.origin, Object.assign({}, localStorage)]')
+    except Exception as e:
+        logging.warning(f"Could not capture session for {site}: {e}")
+        return
+    cookies = [
+        {key: cookie[key] for key in COOKIE_PARAM_KEYS if key in cookie}
+        for cookie in all_cookies
+        if cookie['domain'].lstrip('.') == site or cookie['domain'].endswith('.' + site)
+    ]
+    storage = {}
+    if items and site_for(origin) and len(json.dumps(items)) <= MAX_STORAGE_BYTES:
+        storage[origin] = items
+    if cookies:
+        save(site, cookies, storage)
+
+def requests_cookies(url):
+    """Return the URL's saved cookies as a jar for requests, or None"""
+    site = site_for(url)
+    jar = load(site) if site else None
+    if not jar:
+        return None
+    cookie_jar = requests.cookies.RequestsCookieJar()
+    for cookie in jar['cookies']:
+        cookie_jar.set_cookie(requests.cookies.create_cookie(
+            cookie['name'], cookie['value'],
+            domain=cookie['domain'],
+            path=cookie.get('path', '/'),
+            secure=cookie.get('secure', False),
+            expires=int(cookie['expires']) if cookie.get('expires', -1) > 0 else None,
+            rest={'HttpOnly': None} if cookie.get('httpOnly') else {}
+        ))
+    return cookie_jar
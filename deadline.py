@@ -0,0 +1,149 @@
+"""End-to-end deadlines for scrapes.
+
+scrape_url starts a deadline for the whole scrape. Every stage checks it and
+caps its own timeout (page loads, HTTP requests, fixed sleeps) to the time
+that is left, so a scrape finishes inside SCRAPE_DEADLINE_SECONDS instead of
+running into the gunicorn/nginx timeouts. Browser calls that ignore their
+timeouts are cut off by a watchdog that closes the browser tabs the scrape
+holds (see hold()), or kills the driver if it no longer answers.
+"""
+import contextlib
+import contextvars
+import os
+import threading
+import time
+
+SCRAPE_DEADLINE_SECONDS = float(os.getenv('SCRAPE_DEADLINE_SECONDS', '90'))
+# How long past the deadline a stuck browser call may run before the driver is killed
+KILL_GRACE_SECONDS = float(os.getenv('SCRAPE_KILL_GRACE_SECONDS', '5'))
+# Smallest timeout handed to a stage; below this the stage is not worth starting
+MIN_STAGE_SECONDS = 0.5
+
+_current = contextvars.ContextVar('scrape_deadline', default=None)
+
+class DeadlineExceeded(Exception):
+    """Raised when a scrape stage starts after the deadline has passed"""
+
+class Deadline:
+    def __init__(self, seconds, parent=None):
+        self.seconds = seconds
+        self.expires = time.monotonic() + seconds
+        self.exceeded_at = None
+        self.parent = parent
+        # Browser tabs leased under this deadline, for the watchdog to close
+        self.tabs = set()
+        # HTTP responses open under this deadline, closed when it is cancelled
+        self.responses = set()
+
+    def hold(self, tab):
+        """Record a leased tab here and on every enclosing deadline"""
+        deadline = self
+        while deadline is not None:
+            deadline.tabs.add(tab)
+            deadline = deadline.parent
+
+    def release(self, tab):
+        deadline = self
+        while deadline is not None:
+            deadline.tabs.discard(tab)
+            deadline = deadline.parent
+
+    def remaining(self):
+        return self.expires - time.monotonic()
+
+    def expired(self):
+        return self.remaining() <= 0
+
+    def cancel(self):
+        """Expire now so the work holding this deadline stops at its next check"""
+        self.expires = time.monotonic()
+        if self.exceeded_at is None:
+            self.exceeded_at = 'cancelled'
+        for response in list(self.responses):
+            try:
+                response.close()
+            except Exception:
+                pass
+
+def start(seconds=None):
+    """Start a deadline unless one is already active; returns (deadline, token)"""
+    active = _current.get()
+    if active is not None:
+        return active, None
+    deadline = Deadline(SCRAPE_DEADLINE_SECONDS if seconds is None else seconds)
+    return deadline, _current.set(deadline)
+
+def child():
+    """Create a deadline that ends with the active one but can be cancelled on its own"""
+    active = _current.get()
+    return Deadline(SCRAPE_DEADLINE_SECONDS if active is None else max(0, active.remaining()), parent=active)
+
+def activate(deadline):
+    """Make a deadline the active one in this context; returns a token for finish()"""
+    return _current.set(deadline)
+
+def finish(token):
+    if token is not None:
+        _current.reset(token)
+
+def current():
+    return _current.get()
+
+def remaining():
+    """Seconds left on the active deadline, or None without one"""
+    active = _current.get()
+    return None if active is None else active.remaining()
+
+def check(stage):
+    """Raise DeadlineExceeded if there is not enough time left to start a stage"""
+    active = _current.get()
+    if active is not None and active.remaining() < MIN_STAGE_SECONDS:
+        if active.exceeded_at is None:
+            active.exceeded_at = stage
+        raise DeadlineExceeded(f"Scrape deadline of {active.seconds:.0f}s exceeded before {stage}")
+
+@contextlib.contextmanager
+def closing_on_cancel(response):
+    """Close a streamed HTTP response if the active deadline is cancelled while it is read"""
+    active = _current.get()
+    if active is None:
+        yield response
+        return
+    active.responses.add(response)
+    try:
+        yield response
+    finally:
+        active.responses.discard(response)
+
+def cap(timeout):
+    """Cap a stage timeout to the time left on the active deadline"""
+    left = remaining()
+    if left is None:
+        return timeout
+    return max(MIN_STAGE_SECONDS, min(timeout, left))
+
+def sleep(seconds):
+    """Sleep for at most the time left on the active deadline"""
+    left = remaining()
+    if left is not None:
+        seconds = min(seconds, max(0, left))
+    if seconds > 0:
+        time.sleep(seconds)
+
+class Watchdog:
+    """Calls on_expire if the work has not finished by deadline + grace"""
+    def __init__(self, deadline, on_expire):
+        self.fired = False
+        self._on_expire = on_expire
+        self._timer = threading.Timer(max(0, deadline.remaining()) + KILL_GRACE_SECONDS, self._fire)
+        self._timer.daemon = True
+
+    def _fire(self):
+        self.fired = True
+        self._on_expire()
+
+    def start(self):
+        self._timer.start()
+
+    def cancel(self):
+        self._timer.cancel()
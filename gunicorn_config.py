@@ -6,10 +6,38 @@ import platform
 if not os.path.exists('logs'):
     os.makedirs('logs')
 
+# Workers write Prometheus samples here so /metrics can aggregate all of them.
+# Must be set before the app (and prometheus_client) is imported.
+prometheus_dir = os.environ.setdefault(
+    'PROMETHEUS_MULTIPROC_DIR', os.path.join('logs', 'prometheus_multiproc')
+)
+# The io profile imports the browser settings, and with them metrics, below
+os.makedirs(prometheus_dir, exist_ok=True)
+
 # Server socket
 bind = "127.0.0.1:8000"
 backlog = 2048
 
+# Serving profiles (GUNICORN_PROFILE):
+#   sync - one request per process, 2*cpu+1 processes (default)
+#   io   - threaded workers for scrape-heavy traffic. A request waiting on a
+#          remote site or a browser tab holds a thread instead of a process.
+#          Every worker runs one Chrome, so the worker count is what the
+#          memory set aside for browsers can hold.
+SERVING_PROFILE = os.getenv('GUNICORN_PROFILE', 'sync')
+# Share of RAM the workers' browsers may use between them in the io profile
+BROWSER_MEMORY_FRACTION = float(os.getenv('BROWSER_MEMORY_FRACTION', '0.5'))
+# Request threads per browser tab: most scrapes never need the browser
+THREADS_PER_TAB = 4
+
+def browser_worker_capacity():
+    """How many workers' browsers fit in the browser memory budget"""
+    import psutil
+    from browser_watchdog import MAX_RSS_MB
+    # A browser is recycled at MAX_RSS_MB, so that is the most one can hold
+    budget_mb = psutil.virtual_memory().total / (1024 * 1024) * BROWSER_MEMORY_FRACTION
+    return max(1, int(budget_mb // MAX_RSS_MB))
+
 # Worker processes - adjust for Windows
 if platform.system().lower() == 'windows':
     # Windows performs better with fewer workers
@@ -17,6 +45,14 @@ if platform.system().lower() == 'windows':
     # Use threads on Windows instead of processes
     worker_class = 'gthread'
     threads = multiprocessing.cpu_count() * 2
+elif SERVING_PROFILE == 'io':
+    from browser_tabs import MAX_TABS
+    workers = int(os.getenv('GUNICORN_WORKERS', min(multiprocessing.cpu_count(), browser_worker_capacity())))
+    worker_class = 'gthread'
+    # Held change streams get their own threads (app.SSE_MAX_STREAMS) so open
+    # pages cannot take the threads scrapes need
+    sse_streams = int(os.getenv('SSE_MAX_STREAMS', '8'))
+    threads = int(os.getenv('GUNICORN_THREADS', MAX_TABS * THREADS_PER_TAB + sse_streams))
 else:
     workers = multiprocessing.cpu_count() * 2 + 1
     worker_class = 'sync'
@@ -60,4 +96,28 @@ else:
 # Security
 limit_request_line = 4096
 limit_request_fields = 100
-limit_request_field_size = 8190
\ No newline at end of file
+limit_request_field_size = 8190
+
+# Server hooks
+def on_starting(server):
+    # Clear samples left over from a previous run
+    import shutil
+    shutil.rmtree(prometheus_dir, ignore_errors=True)
+    os.makedirs(prometheus_dir, exist_ok=True)
+    # Let PROFILE_NEXT_REQUESTS re-arm profiling on every (re)start
+    armed_file = os.path.join(os.getenv('PROFILE_DIR', os.path.join('logs', 'profiles')), 'armed.json')
+    if os.path.exists(armed_file):
+        os.remove(armed_file)
+
+def child_exit(server, worker):
+    from metrics import mark_process_dead
+    mark_process_dead(worker.pid)
+    # A worker killed on timeout never ran its atexit cleanup; kill the browsers it left behind
+    from browser_watchdog import reap_orphans
+    reap_orphans()
+
+def post_worker_init(worker):
+    # Start each worker's Chrome now rather than on its first browser scrape
+    if os.getenv('BROWSER_PREWARM', '0') == '1':
+        from app import prewarm_browser
+        prewarm_browser()
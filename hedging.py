@@ -0,0 +1,112 @@
+"""Hedged scraping: race a cheap HTTP fetch against the browser.
+
+Both sides return ``(extraction path, result)``. The first side whose
+result passes ``is_good`` wins. Each side runs under its own child
+deadline, and the loser's is cancelled: a browser side stops at its next
+stage check, and an HTTP side has its streamed response closed (see
+deadline.closing_on_cancel). How often each side wins and the estimated time
+saved are recorded in the metrics registry.
+"""
+import contextvars
+import logging
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import deadline
+import metrics
+import tracing
+
+_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix='hedge')
+
+# Moving average of each side's latency per domain, used to estimate the
+# time saved when the other side wins before this one finishes
+_latency_averages = {}
+_latency_lock = threading.Lock()
+LATENCY_SMOOTHING = 0.2
+
+def _record_latency(domain, side, seconds):
+    with _latency_lock:
+        average = _latency_averages.get((domain, side))
+        _latency_averages[(domain, side)] = seconds if average is None else (
+            average + LATENCY_SMOOTHING * (seconds - average)
+        )
+
+def _average_latency(domain, side):
+    with _latency_lock:
+        return _latency_averages.get((domain, side))
+
+def _submit(domain, side, func, side_deadline=None):
+    """Run func on the hedge pool with the caller's trace and deadline context"""
+    context = contextvars.copy_context()
+
+    def run():
+        token = deadline.activate(side_deadline) if side_deadline else None
+        started = time.monotonic()
+        try:
+            with tracing.span(f'hedge_{side}'):
+                return func()
+        finally:
+            deadline.finish(token)
+            # A cancelled side's time says nothing about how long it normally takes
+            if side_deadline is None or side_deadline.exceeded_at != 'cancelled':
+                _record_latency(domain, side, time.monotonic() - started)
+
+    return _executor.submit(context.run, run)
+
+def race(domain, http_func, browser_func, is_good, mode='race', browser_delay=0.0):
+    """Return (winner, path, result) from the first side with a good result.
+
+    winner is 'http', 'browser' or None when neither side produced a good
+    result, in which case the browser's (or else HTTP's) result is returned.
+    """
+    started = time.monotonic()
+    side_deadlines = {'http': deadline.child(), 'browser': deadline.child()}
+    sides = {_submit(domain, 'http', http_func, side_deadlines['http']): 'http'}
+    if mode == 'race':
+        sides[_submit(domain, 'browser', browser_func, side_deadlines['browser'])] = 'browser'
+
+    results = {}
+    pending = set(sides)
+    while pending:
+        browser_started = 'browser' in sides.values()
+        timeout = None if browser_started else max(0, browser_delay - (time.monotonic() - started))
+        remaining = deadline.remaining()
+        if remaining is not None:
+            timeout = remaining if timeout is None else min(timeout, remaining)
+        done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+
+        for future in done:
+            side = sides[future]
+            try:
+                results[side] = future.result()
+            except Exception as e:
+                logging.warning(f"Hedged {side} fetch for {domain} failed: {e}")
+                results[side] = None
+            if results[side] and is_good(*results[side]):
+                elapsed = time.monotonic() - started
+                loser = 'browser' if side == 'http' else 'http'
+                side_deadlines[loser].cancel()
+                for other in pending:
+                    other.cancel()
+                metrics.HEDGE_WINS.labels(domain=domain, winner=side).inc()
+                loser_average = _average_latency(domain, loser)
+                if loser not in results and loser_average is not None:
+                    metrics.HEDGE_LATENCY_SAVED.labels(domain=domain).observe(max(0, loser_average - elapsed))
+                return (side,) + tuple(results[side])
+
+        if remaining is not None and deadline.remaining() <= 0:
+            break
+        # Start the browser once HTTP has failed or the hedge delay has passed
+        if not browser_started and ('http' in results or time.monotonic() - started >= browser_delay):
+            browser_future = _submit(domain, 'browser', browser_func, side_deadlines['browser'])
+            sides[browser_future] = 'browser'
+            pending.add(browser_future)
+
+    for side_deadline in side_deadlines.values():
+        side_deadline.cancel()
+    metrics.HEDGE_WINS.labels(domain=domain, winner='none').inc()
+    fallback = results.get('browser') or results.get('http')
+    if fallback:
+        return (None,) + tuple(fallback)
+    return None, None, None
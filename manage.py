@@ -11,6 +11,7 @@ import subprocess
 from dotenv import load_dotenv
 from waitress import serve
 from wsgi import app
+import browser_watchdog
 
 load_dotenv()
 
@@ -103,14 +104,34 @@ def restart_service():
     time.sleep(1)
     return start_service()
 
+def report_browsers():
+    registry = browser_watchdog.read_registry()
+    drivers = registry['drivers']
+    print(f"Browser drivers: {len(drivers)} running")
+    for entry in drivers.values():
+        rss = browser_watchdog.tree_rss_mb(entry['pids'])
+        age = (time.time() - entry['started']) / 60
+        owner = f"worker {entry['worker']}" if browser_watchdog.worker_alive(entry) else "orphaned, reaped at next check"
+        print(f"  {entry['browser']} (PID {entry['pids'][0]}, {owner}): {rss:.0f} MB, up {age:.0f} min")
+    reclaimed = registry['reclaimed']
+    if reclaimed:
+        print(f"Recycled: {reclaimed.get('recycled', 0)} drivers ({reclaimed.get('recycled_mb', 0):.0f} MB)")
+        print(f"Orphans killed: {reclaimed.get('orphans_killed', 0)} ({reclaimed.get('orphan_mb', 0):.0f} MB), "
+              f"last reap {reclaimed.get('last_reap', 'never')}")
+    for event in registry['events'][-5:]:
+        details = ', '.join(f"{key}={value}" for key, value in event.items() if key not in ('time', 'action'))
+        print(f"  {event['time']} {event['action']} {details}")
+
 def check_status():
     proc = find_server_process()
     if proc:
         server_type = "Waitress" if is_windows() else "Gunicorn"
         print(f"{server_type} server is running (PID: {proc.info['pid']})")
+        report_browsers()
         return True
     else:
         print("Service is not running")
+        report_browsers()
         return False
 
 def main():
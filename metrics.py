@@ -0,0 +1,132 @@
+"""Prometheus metrics for the press clippings service.
+
+Under gunicorn every worker is a separate process, so when
+PROMETHEUS_MULTIPROC_DIR is set (gunicorn_config.py does this) each worker
+writes its samples to files in that directory and /metrics aggregates them.
+The variable must be set before prometheus_client is first imported.
+"""
+import os
+from prometheus_client import (
+    CollectorRegistry, Counter, Histogram, CONTENT_TYPE_LATEST, REGISTRY, generate_latest
+)
+from prometheus_client import multiprocess
+
+# Scrapes range from an instant URL-slug headline to 30+ second browser sessions
+SCRAPE_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 15, 20, 30, 45, 60, 90, 120)
+
+SCRAPE_DURATION = Histogram(
+    'press_clippings_scrape_duration_seconds',
+    'Time taken by scrape_url',
+    ['domain', 'path'],
+    buckets=SCRAPE_BUCKETS
+)
+
+EXPORT_DURATION = Histogram(
+    'press_clippings_export_duration_seconds',
+    'Time taken to generate an export',
+    ['format']
+)
+
+EXPORT_FAILURES = Counter(
+    'press_clippings_export_failures_total',
+    'Exports that raised an error',
+    ['format']
+)
+
+DB_OPERATION_DURATION = Histogram(
+    'press_clippings_db_operation_duration_seconds',
+    'Time taken by database operations',
+    ['operation'],
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+)
+
+FUNCTION_DURATION = Histogram(
+    'press_clippings_function_duration_seconds',
+    'Time taken by functions decorated with log_performance',
+    ['function'],
+    buckets=SCRAPE_BUCKETS
+)
+
+CACHE_HITS = Counter(
+    'press_clippings_cache_hits_total',
+    'Cache lookups that were served from cache',
+    ['cache']
+)
+
+CACHE_MISSES = Counter(
+    'press_clippings_cache_misses_total',
+    'Cache lookups that had to do the work',
+    ['cache']
+)
+
+BROWSER_LAUNCHES = Counter(
+    'press_clippings_browser_launches_total',
+    'Browser driver instances started',
+    ['browser']
+)
+
+BROWSER_CRASHES = Counter(
+    'press_clippings_browser_crashes_total',
+    'Browser driver instances found dead or failing to start',
+    ['browser']
+)
+
+BROWSER_RECYCLES = Counter(
+    'press_clippings_browser_recycles_total',
+    'Browser drivers quit and replaced after too many pages or too much memory',
+    ['browser', 'reason']
+)
+
+BROWSER_ORPHANS_KILLED = Counter(
+    'press_clippings_browser_orphans_killed_total',
+    'Orphaned browser/driver process trees killed by the reaper'
+)
+
+HEDGE_WINS = Counter(
+    'press_clippings_hedge_wins_total',
+    'Hedged scrapes by the side that produced the result (none if neither did)',
+    ['domain', 'winner']
+)
+
+HEDGE_LATENCY_SAVED = Histogram(
+    'press_clippings_hedge_latency_saved_seconds',
+    'Estimated time saved by taking the winning side of a hedged scrape',
+    ['domain'],
+    buckets=SCRAPE_BUCKETS
+)
+
+SCRAPES_COALESCED = Counter(
+    'press_clippings_scrapes_coalesced_total',
+    'Scrapes answered by an identical scrape already in flight (scope: process or worker)',
+    ['scope']
+)
+
+SCRAPES_STOPPED_LOCALLY = Counter(
+    'press_clippings_scrapes_stopped_locally_total',
+    'Failed scrapes left out of the circuit breaker because no tab was free (tab_lease) or our own deadline ran out (deadline)',
+    ['domain', 'cause']
+)
+
+HEADLINE_FETCH_BYTES = Histogram(
+    'press_clippings_headline_fetch_bytes',
+    'Bytes read by streaming headline-only fetches before they stopped',
+    buckets=(4096, 8192, 16384, 32768, 65536, 131072, 262144, 524288)
+)
+
+def record_cache(cache, hit):
+    """Count a cache hit or miss"""
+    (CACHE_HITS if hit else CACHE_MISSES).labels(cache=cache).inc()
+
+def render_metrics():
+    """Return (body, content_type) for the /metrics endpoint"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = REGISTRY
+    return generate_latest(registry), CONTENT_TYPE_LATEST
+
+def mark_process_dead(pid):
+    """Drop a dead worker's live samples; called from gunicorn's child_exit hook"""
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        multiprocess.mark_process_dead(pid)
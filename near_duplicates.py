@@ -0,0 +1,90 @@
+"""Near-duplicate detection for clippings with MinHash signatures and LSH buckets.
+
+The same wire story appears in several editions and outlets, usually with a
+different headline and a trimmed or re-ordered body. Each clipping's
+headline and text are reduced to word-pair shingles, and a MinHash signature
+estimates how many shingles two clippings share (their Jaccard similarity).
+
+Classic MinHash hashes every shingle once per signature slot. In pure Python
+that takes milliseconds per article. This module uses one-permutation
+hashing instead: each shingle is hashed once, and the hash picks the slot
+it competes for. Empty slots borrow the value of the next filled slot. A
+signature takes well under a millisecond to compute.
+
+Locality-sensitive hashing avoids comparing a clipping with every other one.
+The signature is split into BANDS bands, and each band is hashed to a
+bucket key. Clippings that share any bucket are candidates, and only
+candidates have their signatures compared. With 16 bands of 4 slots, a pair
+with a similarity of 0.5 shares a bucket 64% of the time; at 0.7 that rises
+to 99.6%, and at 0.2 it falls to 2.5%.
+"""
+import os
+import re
+import struct
+import unicodedata
+import zlib
+
+SLOTS = 64
+BANDS = 16
+ROWS_PER_BAND = SLOTS // BANDS
+SHINGLE_WORDS = 2
+# Fewer shingles than this (a bare headline such as "Cartoon") say too little to compare
+MIN_SHINGLES = 4
+THRESHOLD = float(os.getenv('NEAR_DUPLICATE_THRESHOLD', '0.5'))
+
+_SLOT_BITS = SLOTS.bit_length() - 1
+_VALUE_BITS = 32 - _SLOT_BITS
+_EMPTY = 1 << _VALUE_BITS
+_PACK = struct.Struct(f'<{SLOTS}Q')
+
+def _words(text):
+    if not text.isascii():
+        text = ''.join(char for char in unicodedata.normalize('NFKD', text) if not unicodedata.combining(char))
+    return re.findall(r'\w+', text.lower())
+
+def shingles(text):
+    """The set of word pairs in text"""
+    words = _words(text)
+    return {' '.join(words[i:i + SHINGLE_WORDS]) for i in range(len(words) - SHINGLE_WORDS + 1)}
+
+def signature(text):
+    """Return the MinHash signature of text as a tuple of SLOTS ints, or None if it is too short"""
+    pieces = shingles(text)
+    if len(pieces) < MIN_SHINGLES:
+        return None
+    slots = [_EMPTY] * SLOTS
+    for piece in pieces:
+        hashed = zlib.crc32(piece.encode())
+        slot = hashed & (SLOTS - 1)
+        value = hashed >> _SLOT_BITS
+        if value < slots[slot]:
+            slots[slot] = value
+    # Densify: an empty slot takes the next filled slot's value, offset by the
+    # distance so it cannot collide with a real minimum
+    minimums = list(slots)
+    for i in range(SLOTS):
+        if minimums[i] == _EMPTY:
+            distance = 1
+            while minimums[(i + distance) % SLOTS] == _EMPTY:
+                distance += 1
+            slots[i] = minimums[(i + distance) % SLOTS] + (distance << (_VALUE_BITS + 1))
+    return tuple(slots)
+
+def band_keys(sig):
+    """One bucket key per band; clippings sharing any key are candidate duplicates"""
+    keys = []
+    for band in range(BANDS):
+        rows = sig[band * ROWS_PER_BAND:(band + 1) * ROWS_PER_BAND]
+        # The band number keeps equal rows in different bands apart
+        keys.append(band << 32 | zlib.crc32(struct.pack(f'<{ROWS_PER_BAND}Q', *rows)))
+    return keys
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the texts behind two signatures"""
+    return sum(x == y for x, y in zip(a, b)) / SLOTS
+
+def pack(sig):
+    return _PACK.pack(*sig)
+
+def unpack(data):
+    return _PACK.unpack(data)
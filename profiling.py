@@ -0,0 +1,203 @@
+"""On-demand profiling for slow scrape and export requests.
+
+Two independent triggers:
+
+* Armed profiling: ``POST /admin/profile`` (or PROFILE_NEXT_REQUESTS at
+  startup) arms cProfile for the next N profiled requests. The counter
+  lives in a file so every gunicorn worker draws from the same budget.
+  Each profiled request is written to PROFILE_DIR as a ``.pstats`` file.
+* Slow-request sampling: with PROFILE_SLOW_REQUEST_SECONDS set, a sampler
+  thread records the request thread's stack every PROFILE_SAMPLE_INTERVAL
+  seconds. The samples are written as collapsed stacks (flamegraph.pl /
+  speedscope format) only if the request ends up slower than the threshold.
+
+Only the newest PROFILE_RETENTION profiles are kept.
+"""
+import cProfile
+import json
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from functools import wraps
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single waitress process
+    fcntl = None
+
+PROFILE_DIR = os.getenv('PROFILE_DIR', os.path.join('logs', 'profiles'))
+SLOW_REQUEST_SECONDS = float(os.getenv('PROFILE_SLOW_REQUEST_SECONDS', '0'))
+SAMPLE_INTERVAL = float(os.getenv('PROFILE_SAMPLE_INTERVAL', '0.01'))
+RETENTION = int(os.getenv('PROFILE_RETENTION', '50'))
+
+ARMED_FILE = os.path.join(PROFILE_DIR, 'armed.json')
+
+_armed_lock = threading.Lock()
+# Only one cProfile can be active per process; threaded workers profile one request at a time
+_cprofile_lock = threading.Lock()
+
+def _open_armed_locked():
+    """Open and lock the counter file, retrying if another process removed it meanwhile"""
+    while True:
+        f = open(ARMED_FILE, 'a+')
+        if not fcntl:
+            return f
+        fcntl.flock(f, fcntl.LOCK_EX)
+        try:
+            if os.stat(ARMED_FILE).st_ino == os.fstat(f.fileno()).st_ino:
+                return f
+        except FileNotFoundError:
+            pass
+        f.close()
+
+def _update_armed(update):
+    """Read, update and write the shared armed-request counter under a lock.
+
+    The file is removed once the counter reaches 0, so an idle deployment
+    has no armed.json and the check before every profiled request is a stat.
+    """
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    with _armed_lock, _open_armed_locked() as f:
+        try:
+            f.seek(0)
+            try:
+                remaining = int(json.loads(f.read() or '{}').get('remaining', 0))
+            except ValueError:
+                remaining = 0
+            new_remaining, result = update(remaining)
+            if new_remaining <= 0:
+                try:
+                    os.remove(ARMED_FILE)
+                except OSError:
+                    # Windows cannot remove an open file; the 0 written instead means the same
+                    f.seek(0)
+                    f.truncate()
+                    f.write(json.dumps({'remaining': 0}))
+            elif new_remaining != remaining:
+                f.seek(0)
+                f.truncate()
+                f.write(json.dumps({'remaining': new_remaining}))
+            return result
+        finally:
+            # The next process to take the lock must read what was written here
+            f.flush()
+            if fcntl:
+                fcntl.flock(f, fcntl.LOCK_UN)
+
+def arm(requests):
+    """Profile the next ``requests`` profiled requests with cProfile"""
+    requests = max(0, int(requests))
+    return _update_armed(lambda remaining: (requests, requests))
+
+def armed_remaining():
+    """Return how many armed profiles are still pending"""
+    if not os.path.exists(ARMED_FILE):
+        return 0
+    return _update_armed(lambda remaining: (remaining, remaining))
+
+def _take_armed():
+    """Consume one armed profile if any are pending"""
+    if not os.path.exists(ARMED_FILE):
+        return False
+    return _update_armed(lambda remaining: (remaining - 1, True) if remaining > 0 else (0, False))
+
+def _profile_path(name, duration, extension):
+    stamp = time.strftime('%Y%m%d-%H%M%S')
+    return os.path.join(PROFILE_DIR, f"{stamp}_{os.getpid()}_{name}_{int(duration * 1000)}ms.{extension}")
+
+def _enforce_retention():
+    """Delete the oldest profiles beyond the retention cap"""
+    try:
+        profiles = [
+            os.path.join(PROFILE_DIR, f) for f in os.listdir(PROFILE_DIR)
+            if f.endswith(('.pstats', '.collapsed'))
+        ]
+        profiles.sort(key=os.path.getmtime, reverse=True)
+        for path in profiles[RETENTION:]:
+            os.remove(path)
+    except OSError as e:
+        logging.warning(f"Could not apply profile retention: {e}")
+
+def list_profiles():
+    """Return the stored profiles, newest first"""
+    if not os.path.isdir(PROFILE_DIR):
+        return []
+    profiles = [f for f in os.listdir(PROFILE_DIR) if f.endswith(('.pstats', '.collapsed'))]
+    return sorted(profiles, key=lambda f: os.path.getmtime(os.path.join(PROFILE_DIR, f)), reverse=True)
+
+class StackSampler(threading.Thread):
+    """Samples one thread's Python stack at a fixed interval"""
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop_event = threading.Event()
+
+    def run(self):
+        while not self._stop_event.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}:{frame.f_lineno}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self._stop_event.set()
+        self.join()
+
+    def write(self, path):
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+def profiled(name):
+    """Decorator enabling armed cProfile runs and slow-request stack sampling"""
+    def decorator(func):
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _cprofile_lock.acquire(blocking=False):
+                try:
+                    if _take_armed():
+                        profiler = cProfile.Profile()
+                        start_time = time.time()
+                        try:
+                            return profiler.runcall(func, *args, **kwargs)
+                        finally:
+                            path = _profile_path(name, time.time() - start_time, 'pstats')
+                            profiler.dump_stats(path)
+                            logging.info(f"Wrote profile {path}")
+                            _enforce_retention()
+                finally:
+                    _cprofile_lock.release()
+
+            if SLOW_REQUEST_SECONDS <= 0:
+                return func(*args, **kwargs)
+
+            sampler = StackSampler(threading.get_ident(), SAMPLE_INTERVAL)
+            sampler.start()
+            start_time = time.time()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                duration = time.time() - start_time
+                sampler.stop()
+                if duration >= SLOW_REQUEST_SECONDS and sampler.samples:
+                    os.makedirs(PROFILE_DIR, exist_ok=True)
+                    path = _profile_path(name, duration, 'collapsed')
+                    sampler.write(path)
+                    logging.info(f"Slow {name} request took {duration:.2f} seconds, wrote {path}")
+                    _enforce_retention()
+        return wrapper
+    return decorator
+
+# Arm profiling from the environment once per boot; the first worker to import
+# this creates the counter file and later workers share it
+if os.getenv('PROFILE_NEXT_REQUESTS') and not os.path.exists(ARMED_FILE):
+    arm(os.getenv('PROFILE_NEXT_REQUESTS'))
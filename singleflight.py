@@ -0,0 +1,174 @@
+"""Coalesce identical scrapes that are in flight at the same time.
+
+A double-clicked "scrape" button or two editors pasting the same story used
+to start two full browser navigations of one URL. Calls are keyed on the
+canonical URL. The first call in a process runs the scrape, and later
+callers in that process wait for its result.
+
+Other gunicorn workers are kept out by an flock on a per-URL lock file. A
+worker that cannot take the lock waits for it. The worker holding the lock
+writes its result next to the lock file, and the waiting worker reuses it.
+If that worker died without writing a result, the waiting worker runs the
+scrape itself. Waiting never outlasts the caller's scrape deadline, which
+scrape_url starts before it gets here.
+"""
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single waitress process
+    fcntl = None
+
+import deadline
+import metrics
+
+LOCK_DIR = os.getenv('SINGLEFLIGHT_DIR', os.path.join('logs', 'singleflight'))
+# A published result only answers callers that were already waiting for it
+RESULT_TTL_SECONDS = 30
+LOCK_POLL_SECONDS = 0.1
+# Lock and result files untouched for this long are removed by cleanup()
+STALE_FILE_SECONDS = 3600
+# Query parameters that only track where a click came from
+TRACKING_PARAMS = ('fbclid', 'gclid', 'mc_cid', 'mc_eid')
+
+class _Call:
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+_calls = {}
+_calls_lock = threading.Lock()
+
+def canonical_url(url):
+    """Normalise a URL so trivially different spellings of one page share a key"""
+    parts = urlsplit(url.strip())
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in (80, 443):
+        host = f'{host}:{parts.port}'
+    query = sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not key.lower().startswith('utm_') and key.lower() not in TRACKING_PARAMS
+    )
+    path = parts.path.rstrip('/') or '/'
+    return urlunsplit(('https' if parts.scheme in ('http', 'https') else parts.scheme, host, path, urlencode(query), ''))
+
+def _paths(key):
+    name = hashlib.sha1(key.encode()).hexdigest()
+    return os.path.join(LOCK_DIR, f'{name}.lock'), os.path.join(LOCK_DIR, f'{name}.json')
+
+def _wait_seconds():
+    left = deadline.remaining()
+    if left is not None:
+        return max(0, left)
+    return deadline.SCRAPE_DEADLINE_SECONDS + deadline.KILL_GRACE_SECONDS
+
+def _read_result(result_path, since):
+    try:
+        if os.path.getmtime(result_path) < since - 1:
+            return None
+        with open(result_path) as f:
+            published = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if published['time'] < since or time.time() - published['time'] > RESULT_TTL_SECONDS:
+        return None
+    return published['result']
+
+def _publish(result_path, result):
+    temp_path = f'{result_path}.{os.getpid()}.tmp'
+    try:
+        with open(temp_path, 'w') as f:
+            json.dump({'time': time.time(), 'result': result}, f)
+        os.replace(temp_path, result_path)
+    except (OSError, TypeError, ValueError) as e:
+        logging.warning(f"Could not publish coalesced scrape result: {e}")
+
+def _run_across_workers(key, func):
+    """Run func unless another worker is already running it, in which case reuse its result"""
+    if fcntl is None:
+        return func()
+    lock_path, result_path = _paths(key)
+    os.makedirs(LOCK_DIR, exist_ok=True)
+    with open(lock_path, 'a') as lock_file:
+        try:
+            fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            since = time.time()
+            expires = time.monotonic() + _wait_seconds()
+            while True:
+                time.sleep(LOCK_POLL_SECONDS)
+                try:
+                    fcntl.flock(lock_file, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except OSError:
+                    if time.monotonic() >= expires:
+                        # Still running elsewhere; scraping again beats failing the caller
+                        return func()
+            result = _read_result(result_path, since)
+            if result is not None:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+                metrics.SCRAPES_COALESCED.labels(scope='worker').inc()
+                logging.info(f"Reused another worker's scrape of {key}")
+                return result
+        # Keeps cleanup() away from lock files that are in use
+        os.utime(lock_path)
+        try:
+            result = func()
+            _publish(result_path, result)
+            return result
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def _for_caller(result, url):
+    # Callers may edit their result; give each its own copy with the URL it asked for
+    return dict(result, url=url) if isinstance(result, dict) else result
+
+def do(url, func):
+    """Return func()'s result, sharing one run among concurrent callers for the same URL"""
+    key = canonical_url(url)
+    with _calls_lock:
+        call = _calls.get(key)
+        leader = call is None
+        if leader:
+            call = _calls[key] = _Call()
+    if not leader:
+        if not call.done.wait(_wait_seconds()):
+            # Waited out the caller's deadline; func() returns what it can in the time left
+            return func()
+        metrics.SCRAPES_COALESCED.labels(scope='process').inc()
+        if call.error is not None:
+            raise call.error
+        return _for_caller(call.result, url)
+
+    try:
+        call.result = _run_across_workers(key, func)
+        return _for_caller(call.result, url)
+    except Exception as e:
+        call.error = e
+        raise
+    finally:
+        with _calls_lock:
+            _calls.pop(key, None)
+        call.done.set()
+
+def cleanup():
+    """Remove lock and result files nobody has used for a while"""
+    if not os.path.isdir(LOCK_DIR):
+        return
+    cutoff = time.time() - STALE_FILE_SECONDS
+    for name in os.listdir(LOCK_DIR):
+        path = os.path.join(LOCK_DIR, name)
+        try:
+            if os.path.getmtime(path) < cutoff:
+                os.remove(path)
+        except OSError:
+            pass
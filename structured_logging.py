@@ -0,0 +1,183 @@
+"""Non-blocking, structured logging for the press clippings service.
+
+Every log call only puts the record on an in-memory queue; a QueueListener
+thread per process does the formatting and disk writes. File records are
+JSON lines carrying the request ID. Several gunicorn workers share
+logs/app.log, so rotation takes a file lock and workers reopen the file when
+another process has rotated it.
+"""
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import shutil
+import time
+
+try:
+    import fcntl
+except ImportError:  # Windows runs a single waitress process
+    fcntl = None
+
+from flask import g, has_request_context
+
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s'
+
+class RequestIdFilter(logging.Filter):
+    """Attach the current request ID (or '-') to every record"""
+    def filter(self, record):
+        if not hasattr(record, 'request_id'):
+            request_id = None
+            if has_request_context():
+                request_id = g.get('request_id')
+            record.request_id = request_id or '-'
+        return True
+
+class JsonFormatter(logging.Formatter):
+    """Format records as one JSON object per line"""
+    def format(self, record):
+        data = {
+            'ts': time.strftime('%Y-%m-%dT%H:%M:%S', time.gmtime(record.created)) + f'.{int(record.msecs):03d}Z',
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+            'request_id': getattr(record, 'request_id', '-'),
+            'pid': record.process,
+            'thread': record.threadName
+        }
+        if record.exc_info:
+            data['exc_info'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exc_info'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False)
+
+class SafeRotatingFileHandler(logging.handlers.RotatingFileHandler):
+    """RotatingFileHandler that several processes can share.
+
+    Rollover happens under an exclusive lock on ``<file>.lock`` and is skipped
+    when another process has already rotated the file. Before each write the
+    handler reopens its stream if the file on disk is no longer the one it
+    has open.
+    """
+    def __init__(self, filename, **kwargs):
+        super().__init__(filename, **kwargs)
+        self.lock_file = self.baseFilename + '.lock'
+
+    def _stream_is_stale(self):
+        if self.stream is None:
+            return False
+        try:
+            return os.fstat(self.stream.fileno()).st_ino != os.stat(self.baseFilename).st_ino
+        except OSError:
+            return True
+
+    def _reopen(self):
+        if self.stream:
+            self.stream.close()
+        self.stream = self._open()
+
+    def emit(self, record):
+        if self._stream_is_stale():
+            self._reopen()
+        super().emit(record)
+
+    def shouldRollover(self, record):
+        if self.maxBytes <= 0:
+            return False
+        try:
+            return os.stat(self.baseFilename).st_size >= self.maxBytes
+        except OSError:
+            return False
+
+    def doRollover(self):
+        if fcntl is None:
+            return super().doRollover()
+        with open(self.lock_file, 'a') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            try:
+                # Another worker may have rotated while we waited for the lock
+                if self._stream_is_stale() or os.stat(self.baseFilename).st_size < self.maxBytes:
+                    self._reopen()
+                else:
+                    super().doRollover()
+            finally:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+_listeners = []
+_queue_handler = None
+
+def _start_listener(handlers):
+    log_queue = queue.SimpleQueue()
+    listener = logging.handlers.QueueListener(log_queue, *handlers, respect_handler_level=True)
+    listener.start()
+    _listeners.append(listener)
+    return log_queue
+
+def _queued(handlers):
+    """A QueueHandler feeding handlers from a listener thread, restarted in forked children"""
+    queue_handler = logging.handlers.QueueHandler(_start_listener(handlers))
+    # The listener thread does not survive fork (e.g. gunicorn --preload);
+    # give each child its own queue and listener
+    if hasattr(os, 'register_at_fork'):
+        os.register_at_fork(after_in_child=lambda: setattr(queue_handler, 'queue', _start_listener(handlers)))
+    return queue_handler
+
+def configure_logging(log_file, level=logging.INFO, max_bytes=1024*1024, backup_count=5):
+    """Route the root logger through a queue to JSON file and text console handlers"""
+    global _queue_handler
+    if _queue_handler is not None:
+        return _queue_handler
+
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    file_handler = SafeRotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(JsonFormatter())
+    console_handler = logging.StreamHandler()
+    console_handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    handlers = [file_handler, console_handler]
+
+    _queue_handler = _queued(handlers)
+    _queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(_queue_handler)
+    root.setLevel(level)
+    return _queue_handler
+
+def file_logger(name, log_file, max_bytes=1024*1024, backup_count=3, fmt='%(message)s'):
+    """A non-propagating logger that writes only to its own shared, rotating file through the queue"""
+    os.makedirs(os.path.dirname(log_file) or '.', exist_ok=True)
+    file_handler = SafeRotatingFileHandler(log_file, maxBytes=max_bytes, backupCount=backup_count, encoding='utf-8')
+    file_handler.setFormatter(logging.Formatter(fmt))
+    named = logging.getLogger(name)
+    named.propagate = False
+    named.setLevel(logging.INFO)
+    named.addHandler(_queued([file_handler]))
+    return named
+
+def stop_logging():
+    """Flush queued records; call at process exit"""
+    for listener in _listeners:
+        try:
+            listener.stop()
+        except Exception:
+            pass
+
+def cap_log_file(path, max_bytes, backup_count=1):
+    """Copy-truncate a log file another process keeps open once it exceeds max_bytes"""
+    try:
+        if not os.path.exists(path) or os.path.getsize(path) < max_bytes:
+            return False
+        for index in range(backup_count - 1, 0, -1):
+            if os.path.exists(f'{path}.{index}'):
+                os.replace(f'{path}.{index}', f'{path}.{index + 1}')
+        if backup_count > 0:
+            shutil.copyfile(path, f'{path}.1')
+        # Truncate in place: the driver writes with O_APPEND, so it carries on at the new end
+        with open(path, 'r+') as f:
+            f.truncate(0)
+        return True
+    except OSError as e:
+        logging.warning(f"Could not cap log file {path}: {e}")
+        return False
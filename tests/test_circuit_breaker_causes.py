@@ -0,0 +1,47 @@
+"""Only the host's own failures are charged to its circuit breaker."""
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+import app  # noqa: E402
+import browser_tabs  # noqa: E402
+
+@pytest.fixture
+def recorded(monkeypatch):
+    calls = []
+    monkeypatch.setattr(app.circuit_breaker, 'allow', lambda host: True)
+    monkeypatch.setattr(app.circuit_breaker, 'record', lambda host, success, duration: calls.append((host, success)))
+    monkeypatch.setattr(app.deadline, 'SCRAPE_DEADLINE_SECONDS', 1)
+    return calls
+
+def stopped_locally(domain, cause):
+    return app.metrics.SCRAPES_STOPPED_LOCALLY.labels(domain=domain, cause=cause)._value.get()
+
+def test_no_free_tab_is_not_a_host_failure(recorded, monkeypatch):
+    # Every tab is leased by other scrapes, so this one waits out its deadline
+    pool = browser_tabs.TabPool(lambda: None, max_tabs=1)
+    pool._slots.acquire()
+    monkeypatch.setattr(app, 'browser_tab_pool', pool)
+    monkeypatch.setattr(app, 'get_hedge_config', lambda domain: None)
+    monkeypatch.setattr(app, 'extract_title_from_url', lambda url: None)
+    before = stopped_locally('news24.com', 'tab_lease')
+
+    result = app.scrape_url('https://www.news24.com/news24/article-123')
+
+    assert result['partial']
+    assert recorded == []
+    assert stopped_locally('news24.com', 'tab_lease') == before + 1
+
+def test_host_error_is_recorded(recorded, monkeypatch):
+    def refused(*args, **kwargs):
+        raise app.requests.ConnectionError('connection refused')
+    monkeypatch.setattr(app.requests, 'get', refused)
+    monkeypatch.setattr(app, 'GENERIC_EXTRACTION_MODE', 'fast')
+
+    result = app.scrape_url('https://example.com/story')
+
+    assert not result.get('partial')
+    assert recorded == [('example.com', False)]
@@ -0,0 +1,26 @@
+"""Near-duplicate groups for the whole list and for just the clippings that changed."""
+import os
+import tempfile
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+import app  # noqa: E402
+
+STORY = ' '.join(f'word{i} story about the budget and the water minister' for i in range(40))
+OTHER = ' '.join(f'other{i} tale' for i in range(200))
+
+def add(client, headline, content):
+    response = client.post('/api/clippings', json={'headline': headline, 'source': 'Test', 'category': 'News', 'content': content})
+    return response.get_json()['id']
+
+def test_lookup_by_ids_matches_the_full_grouping():
+    client = app.app.test_client()
+    client.delete('/api/clippings/delete-all')
+    first = add(client, 'Budget story', STORY)
+    second = add(client, 'Budget story, updated', STORY)
+    unrelated = add(client, 'Unrelated', OTHER)
+
+    assert client.get('/api/clippings/duplicates').get_json()['groups'] == [[first, second]]
+    assert client.get(f'/api/clippings/duplicates?ids={second}').get_json()['groups'] == [[first, second]]
+    assert client.get(f'/api/clippings/duplicates?ids={unrelated}').get_json()['groups'] == []
+    assert client.get('/api/clippings/duplicates?ids=x').status_code == 400
@@ -0,0 +1,87 @@
+"""Hedged scrapes: which sites race, and what happens to the losing side."""
+import http.server
+import os
+import tempfile
+import threading
+import time
+
+import pytest
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+import app  # noqa: E402
+import deadline  # noqa: E402
+import hedging  # noqa: E402
+import headline_stream  # noqa: E402
+
+PRESSREADER_URL = 'https://www.pressreader.com/south-africa/the-star-early-edition/20240115/article/281500000000001'
+HEADLINE = 'Minister announces the new water budget'
+
+class TrickleHandler(http.server.BaseHTTPRequestHandler):
+    """Sends a page head that never gets to a headline, a few bytes at a time"""
+    closed = threading.Event()
+
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.end_headers()
+        try:
+            self.wfile.write(b'<html><head>')
+            for _ in range(200):
+                self.wfile.write(b'<!-- ' + b'x' * 20000 + b' -->')
+                self.wfile.flush()
+                time.sleep(0.05)
+        except (BrokenPipeError, ConnectionResetError):
+            TrickleHandler.closed.set()
+
+    def log_message(self, *args):
+        pass
+
+@pytest.fixture
+def trickle_url():
+    server = http.server.ThreadingHTTPServer(('127.0.0.1', 0), TrickleHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    TrickleHandler.closed.clear()
+    yield f'http://127.0.0.1:{server.server_port}/story'
+    server.shutdown()
+
+def test_losing_http_fetch_is_closed(trickle_url):
+    def browser():
+        time.sleep(0.3)
+        return 'news24_browser', {'headline': HEADLINE}
+
+    scrape_deadline, token = deadline.start(30)
+    try:
+        winner, path, result = hedging.race(
+            'example.test',
+            lambda: headline_stream.fetch_headline(trickle_url, byte_cap=10 * 2**20),
+            browser,
+            lambda path, result: bool(result.get('headline')),
+        )
+    finally:
+        deadline.finish(token)
+
+    assert (winner, result['headline']) == ('browser', HEADLINE)
+    # Without the close the server would keep streaming for another ten seconds
+    assert TrickleHandler.closed.wait(3)
+
+def test_pressreader_is_hedged_when_configured(monkeypatch):
+    browser_started = threading.Event()
+
+    def browser(url, publication):
+        browser_started.set()
+        time.sleep(0.5)
+        return 'pressreader_browser', {'headline': 'Slower browser headline', 'source': publication, 'content': '', 'url': url}
+
+    monkeypatch.setitem(app.HEDGE_CONFIG, 'pressreader.com', {'mode': 'race'})
+    monkeypatch.setattr(app.circuit_breaker, 'allow', lambda host: True)
+    monkeypatch.setattr(app.circuit_breaker, 'record', lambda host, success, duration: None)
+    monkeypatch.setattr(app, 'fetch_pressreader_http', lambda url, publication: (
+        'pressreader_http', {'headline': HEADLINE, 'source': publication, 'content': 'Text', 'url': url}
+    ))
+    monkeypatch.setattr(app, 'scrape_pressreader_with_browser', browser)
+
+    result = app.scrape_url(PRESSREADER_URL)
+
+    assert result['headline'] == HEADLINE
+    assert browser_started.is_set()
@@ -0,0 +1,51 @@
+"""insert_clippings returns and logs only its own rows, even with another worker writing."""
+import json
+import os
+import sqlite3
+import tempfile
+import threading
+import time
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+import app  # noqa: E402
+
+def other_worker_insert(path, headline, done):
+    """Commit a clipping from a separate connection, as another gunicorn worker would"""
+    conn = sqlite3.connect(path, timeout=10, isolation_level=None)
+    # Like insert_clippings, take the write lock before reading the end of the list
+    conn.execute('BEGIN IMMEDIATE')
+    order = conn.execute('SELECT coalesce(max("order"), -1) + 1 FROM clipping').fetchone()[0]
+    conn.execute(
+        'INSERT INTO clipping(headline, source, category, content, "order") VALUES (?, ?, ?, ?, ?)',
+        (headline, 'Other', 'News', '', order)
+    )
+    conn.execute('COMMIT')
+    conn.close()
+    done.set()
+
+def test_second_writer_between_snapshot_and_insert(monkeypatch):
+    done = threading.Event()
+    real_next_order = app.next_clipping_order
+
+    def next_order_with_interleaved_writer():
+        # The other worker tries to commit right after this request read the end of the list
+        threading.Thread(target=other_worker_insert, args=(path, 'OTHER', done)).start()
+        time.sleep(0.3)
+        return real_next_order()
+
+    with app.app.app_context():
+        path = app.db.engine.url.database
+        monkeypatch.setattr(app, 'next_clipping_order', next_order_with_interleaved_writer)
+        created = app.insert_clippings([{'headline': 'Mine', 'source': 'Test', 'category': 'News'}])
+        monkeypatch.setattr(app, 'next_clipping_order', real_next_order)
+        assert done.wait(10)
+
+        assert [c.headline for c in created] == ['Mine']
+        version = app.get_collection_version()
+        logged = app.ClippingChange.query.filter_by(version=version).all()
+        assert [json.loads(change.data)['headline'] for change in logged] == ['Mine']
+
+        # The other worker waited for the write lock, so it did not reuse this order
+        other = app.Clipping.query.filter_by(headline='OTHER').one()
+        assert other.order == created[0].order + 1
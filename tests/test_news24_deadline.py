@@ -0,0 +1,44 @@
+"""A News24 browser scrape cut short by its deadline keeps the page title it already read."""
+import os
+import tempfile
+import time
+
+from selenium.common.exceptions import NoSuchElementException
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+import app  # noqa: E402
+import deadline  # noqa: E402
+
+class SlowArticle:
+    """An article element whose every lookup takes longer than the scrape has left"""
+    def find_element(self, by, value):
+        time.sleep(0.3)
+        raise NoSuchElementException(value)
+
+    def find_elements(self, by, value):
+        time.sleep(0.3)
+        return []
+
+class SlowPageDriver:
+    title = 'Eskom announces a new load-shedding schedule'
+
+    def set_page_load_timeout(self, seconds):
+        pass
+
+    def get(self, url):
+        pass
+
+    def find_element(self, by, value):
+        return SlowArticle()
+
+def test_page_title_is_kept_at_the_deadline(monkeypatch):
+    monkeypatch.setattr(deadline, 'sleep', lambda seconds: None)
+    scrape_deadline, token = deadline.start(1)
+    try:
+        result = app.get_news24_content(SlowPageDriver(), 'https://www.news24.com/news24/article-123')
+    finally:
+        deadline.finish(token)
+
+    assert scrape_deadline.expired()
+    assert result == {'success': True, 'headline': SlowPageDriver.title, 'content': ''}
@@ -0,0 +1,33 @@
+"""Cursor paging of /api/clippings returns every row exactly once."""
+import os
+import tempfile
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+import app  # noqa: E402
+
+def test_rows_without_an_order_are_not_skipped():
+    client = app.app.test_client()
+    client.delete('/api/clippings/delete-all')
+    with app.app.app_context():
+        for i, order in enumerate([None, 0, None, 1, 2, None, 0]):
+            app.db.session.add(app.Clipping(headline=f'Story {i}', source='Test', category='News', content='', order=order))
+        app.db.session.commit()
+        # No order lists as order 0
+        rows = sorted(app.Clipping.query.all(), key=lambda c: (c.order or 0, c.id))
+        expected = [c.headline for c in rows]
+
+    headlines = []
+    cursor = None
+    while True:
+        query = {'limit': 2}
+        if cursor:
+            query['cursor'] = cursor
+        response = client.get('/api/clippings', query_string=query)
+        headlines += [c['headline'] for c in response.get_json()]
+        cursor = response.headers.get('X-Next-Cursor')
+        if not cursor:
+            break
+
+    assert len(expected) == 7
+    assert headlines == expected
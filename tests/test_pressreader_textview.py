@@ -0,0 +1,90 @@
+"""PressReader text view extraction over plain HTTP, against recorded pages.
+
+textview.html is a full text view, body_only.html has paragraphs but no
+headline element, and spa_shell.html is the script-only page PressReader
+serves when the article has to be rendered by a browser.
+"""
+import os
+import tempfile
+
+import pytest
+
+os.environ.setdefault('DATABASE_URL', 'sqlite:///' + os.path.join(tempfile.mkdtemp(), 'test.db'))
+
+import app  # noqa: E402
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures', 'pressreader')
+ARTICLE_URL = 'https://www.pressreader.com/south-africa/the-star-early-edition/20240115/article/281500000000001'
+
+def fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+class FakeResponse:
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        pass
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise app.requests.HTTPError(f'{self.status_code} error')
+
+@pytest.fixture
+def serve(monkeypatch):
+    """Answer requests.get with a fixture page, recording the URLs asked for"""
+    requested = []
+
+    def use(name, status_code=200):
+        def get(url, **kwargs):
+            requested.append(url)
+            return FakeResponse(fixture(name), status_code)
+        monkeypatch.setattr(app.requests, 'get', get)
+        return requested
+    return use
+
+def test_textview_url():
+    assert app.pressreader_textview_url(ARTICLE_URL).endswith('/20240115/textview/281500000000001')
+
+def test_extract_textview():
+    fields = app.extract_pressreader_markup(fixture('textview.html'))
+    assert fields['headline'] == 'POWER UTILITY SEEKS 36% TARIFF INCREASE'
+    assert not fields['from_title']
+    # The cookie banner, byline and newsletter prompt are dropped
+    assert len(fields['paragraphs']) == 3
+    assert fields['paragraphs'][0].startswith('The power utility has asked')
+    assert 'public hearings next month' in fields['paragraphs'][1]
+
+def test_fetch_textview(serve):
+    requested = serve('textview.html')
+    path, result = app.fetch_pressreader_http(ARTICLE_URL, 'The Star Early Edition')
+    assert path == 'pressreader_http'
+    assert requested == [app.pressreader_textview_url(ARTICLE_URL)]
+    assert result['headline'] == 'Power Utility Seeks 36% Tariff Increase'
+    assert result['source'] == 'The Star Early Edition'
+    paragraphs = result['content'].split('\n\n')
+    assert len(paragraphs) == 2
+    assert paragraphs[1].startswith('Consumer groups said')
+
+def test_fetch_body_only_uses_page_title(serve):
+    serve('body_only.html')
+    path, result = app.fetch_pressreader_http(ARTICLE_URL, 'The Star Late Edition')
+    assert path == 'pressreader_http'
+    assert result['headline'] == 'PressReader - The Star Late Edition - 2024-01-15'
+    assert result['content']
+
+def test_fetch_spa_shell_needs_browser(serve):
+    serve('spa_shell.html')
+    assert app.fetch_pressreader_http(ARTICLE_URL, 'Cape Times') is None
+
+def test_fetch_error_needs_browser(serve):
+    serve('textview.html', status_code=403)
+    assert app.fetch_pressreader_http(ARTICLE_URL, 'The Star Early Edition') is None
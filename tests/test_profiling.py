@@ -0,0 +1,31 @@
+"""The armed-profile counter is shared by every worker and cleaned up once spent."""
+import multiprocessing
+import os
+
+import pytest
+
+import profiling
+
+@pytest.fixture
+def armed_file(tmp_path, monkeypatch):
+    monkeypatch.setattr(profiling, 'PROFILE_DIR', str(tmp_path))
+    monkeypatch.setattr(profiling, 'ARMED_FILE', str(tmp_path / 'armed.json'))
+    return profiling.ARMED_FILE
+
+def take(count):
+    return sum(profiling._take_armed() for _ in range(count))
+
+def test_file_is_removed_when_the_last_profile_is_taken(armed_file):
+    profiling.arm(2)
+    assert [profiling._take_armed() for _ in range(3)] == [True, True, False]
+    assert not os.path.exists(armed_file)
+    assert profiling.armed_remaining() == 0
+    assert not os.path.exists(armed_file)
+
+@pytest.mark.skipif(profiling.fcntl is None, reason='one process on Windows')
+def test_workers_share_the_budget(armed_file):
+    profiling.arm(40)
+    with multiprocessing.get_context('fork').Pool(4) as pool:
+        taken = pool.map(take, [20] * 4)
+    assert sum(taken) == 40
+    assert not os.path.exists(armed_file)
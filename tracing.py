@@ -0,0 +1,126 @@
+"""Lightweight per-request span tracing for scrapes.
+
+A trace is only active for requests that ask for it (``?debug=timing``) or
+that are sampled by SCRAPE_TRACE_SAMPLE_RATE. When no trace is active,
+``span()`` returns a shared no-op context manager, so instrumented code pays
+one context-variable lookup per stage.
+"""
+import contextvars
+import json
+import logging
+import os
+import random
+import threading
+import time
+from functools import wraps
+
+import structured_logging
+
+SAMPLE_RATE = float(os.getenv('SCRAPE_TRACE_SAMPLE_RATE', '0.05'))
+TRACE_LOG_FILE = os.getenv('SCRAPE_TRACE_LOG', os.path.join('logs', 'scrape_traces.log'))
+
+_current_trace = contextvars.ContextVar('scrape_trace', default=None)
+
+_trace_logger = None
+_trace_logger_lock = threading.Lock()
+
+def get_trace_logger():
+    """Get the rolling logger that sampled traces are written to.
+
+    Writes go through a queue like the app log, so a request never waits on
+    the disk, and the file is shared safely by all gunicorn workers.
+    """
+    global _trace_logger
+    if _trace_logger is None:
+        with _trace_logger_lock:
+            if _trace_logger is None:
+                _trace_logger = structured_logging.file_logger('scrape_traces', TRACE_LOG_FILE)
+    return _trace_logger
+
+class Trace:
+    """Collected spans for one request"""
+    def __init__(self, name):
+        self.name = name
+        self.started = time.perf_counter()
+        self.spans = []
+        self.depth = 0
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'total_ms': round((time.perf_counter() - self.started) * 1000, 1),
+            'spans': self.spans
+        }
+
+class _Span:
+    __slots__ = ('trace', 'record', 'started')
+
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.record = {'name': name, 'depth': trace.depth}
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.record['start_ms'] = round((self.started - self.trace.started) * 1000, 1)
+        self.trace.spans.append(self.record)
+        self.trace.depth += 1
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.trace.depth -= 1
+        self.record['duration_ms'] = round((time.perf_counter() - self.started) * 1000, 1)
+        if exc_type is not None:
+            self.record['error'] = exc_type.__name__
+        return False
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        return False
+
+_NOOP_SPAN = _NoopSpan()
+
+def span(name):
+    """Time a stage of the current trace; a no-op when tracing is off"""
+    trace = _current_trace.get()
+    if trace is None:
+        return _NOOP_SPAN
+    return _Span(trace, name)
+
+def traced(name=None):
+    """Decorator that records a span around every call of the function"""
+    def decorator(func):
+        span_name = name or func.__name__
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(span_name):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+def start_trace(name, force=False):
+    """Start a trace when forced or sampled; returns (trace, token) or (None, None)"""
+    if not force and (SAMPLE_RATE <= 0 or random.random() >= SAMPLE_RATE):
+        return None, None
+    trace = Trace(name)
+    return trace, _current_trace.set(trace)
+
+def finish_trace(trace, token, **fields):
+    """Stop the current trace and write it to the rolling trace log"""
+    if trace is None:
+        return None
+    _current_trace.reset(token)
+    data = trace.to_dict()
+    data.update(fields)
+    try:
+        get_trace_logger().info(json.dumps(data))
+    except Exception as e:
+        logging.warning(f"Could not write scrape trace: {e}")
+    return data